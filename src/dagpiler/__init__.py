@@ -1,4 +1,6 @@
 from .core import compile_dag
+from .session import CompileSession
+from .execution.executor import execute_dag
 from .dag.printer import print_dag
 from .dag.plot_dag import plot_dag
 from .init import init
\ No newline at end of file
@@ -2,10 +2,17 @@
 import argparse
 import sys
 
-from core import compile_dag
-from dag.printer import print_dag
-from dag.plot_dag import plot_dag
-from init import init
+from .core import compile_dag
+from .execution.executor import execute_dag, get_run_folder, run_queue_worker, RELEASE_POLICIES
+from .execution.artifact_store import ArtifactStore, get_artifact_folder
+from .execution.journal import RunJournal, get_journal_path
+from .execution.work_queue import WorkQueue
+from .execution.critical_path import CriticalPathPlan
+from .execution.partition import Partition
+from .execution.runtime_history import RuntimeHistory, get_runtime_history_path
+from .dag.printer import print_dag
+from .dag.plot_dag import plot_dag
+from .init import init
 
 def main():
     # Initialize the top-level parser
@@ -15,7 +22,34 @@ def main():
     # Subparser for the 'compile' command
     parser_compile = subparsers.add_parser("compile", help="Compile the specified package, returning a DAG.")
     parser_compile.add_argument("package_name", type=str, help="The name of the package to compile")
+    parser_compile.add_argument("output_path", type=str, nargs="?", default=None, help="Save the compiled DAG to this file, as TOML, JSON or SQLite (.sqlite) by its extension.")
+    parser_compile.add_argument("--target", action="append", dest="targets", help="Only compile what this output needs, formatted as package.runnable.output. Can be repeated.")
+    parser_compile.add_argument("--workers", type=int, default=None, help="Compile the packages in parallel with this many worker processes.")
+    parser_compile.add_argument("--validate-exec", action="store_true", help="Check that the function of each runnable's exec can be imported.")
     
+    # Subparser for the 'run' command
+    parser_run = subparsers.add_parser("run", help="Compile the specified package and run its DAG.")
+    parser_run.add_argument("package_name", type=str, help="The name of the package to run")
+    parser_run.add_argument("--release", choices=RELEASE_POLICIES, default="free", help="What to do with each output after its last consumer has run.")
+    parser_run.add_argument("--workers", type=int, default=None, help="Run the runnables in parallel with this many worker processes.")
+    parser_run.add_argument("--no-cache", action="store_true", help="Run every runnable, rather than loading unchanged outputs from the artifact store.")
+    parser_run.add_argument("--resume", action="store_true", help="Continue the previous run, skipping the runnables that it completed.")
+    parser_run.add_argument("--queue", type=str, default=None, help="Publish the runnables to a work queue in this shared folder, for 'dagpiler worker' processes on any host to run.")
+    parser_run.add_argument("--partitions", type=int, default=None, help="With --queue, split the runnables into this many partitions that exchange few bytes, for workers started with --partition.")
+
+    # Subparser for the 'worker' command
+    parser_worker = subparsers.add_parser("worker", help="Run tasks from the work queue in a shared folder, until the run publishing them has finished.")
+    parser_worker.add_argument("queue", type=str, help="The shared folder of the work queue")
+    parser_worker.add_argument("--partition", type=int, default=None, help="Claim the tasks of this partition first.")
+    parser_worker.add_argument("--lease", type=float, default=None, help="Seconds until a task claimed by this worker can be claimed by another, if this worker stops renewing it.")
+
+    # Subparser for the 'plan' command
+    parser_plan = subparsers.add_parser("plan", help="Compile the specified package and estimate how long its DAG will take to run.")
+    parser_plan.add_argument("package_name", type=str, help="The name of the package to plan")
+    parser_plan.add_argument("--critical-path", action="store_true", help="Show the critical path and the expected makespan, from the runtimes of previous runs.")
+    parser_plan.add_argument("--workers", type=int, default=1, help="The number of worker processes to estimate the makespan for.")
+    parser_plan.add_argument("--partitions", type=int, default=None, help="Split the runnables into this many partitions that exchange few bytes, and show the bytes saved.")
+
     # Subparser for the 'plot' command
     parser_plot = subparsers.add_parser("plot", help="Compile and plot the DAG to the specified path.")
     parser_plot.add_argument("output_path", type=str, help="The path where the plot should be saved")
@@ -32,9 +66,41 @@ def main():
     if args.command == "init":
         init()
         return
-    dag = compile_dag(args.package_name)
+    if args.command == "worker":
+        worker_kwargs = {"lease_seconds": args.lease} if args.lease is not None else {}
+        num_completed = run_queue_worker(args.queue, partition=args.partition, **worker_kwargs)
+        print(f"Completed {num_completed} tasks")
+        return
+    if args.command == "run" and args.partitions is not None and args.queue is None:
+        parser_run.error("--partitions requires --queue")
+    compile_workers = getattr(args, "workers", None) if args.command == "compile" else None
+    # When running, the constant runnables are folded into the artifact store while compiling
+    artifact_store = ArtifactStore(get_artifact_folder()) if args.command == "run" and not args.no_cache else None
+    dag = compile_dag(args.package_name, targets=getattr(args, "targets", None), workers=compile_workers, validate_exec=getattr(args, "validate_exec", False), artifact_store=artifact_store)
     if args.command == "compile":
+        if args.output_path is not None:
+            print_dag(dag, args.output_path)
         return dag
+    elif args.command == "run":
+        journal = RunJournal(get_journal_path(get_run_folder()))
+        runtime_history = RuntimeHistory(get_runtime_history_path())
+        queue = WorkQueue(args.queue) if args.queue is not None else None
+        partitions = Partition(dag, args.partitions, runtime_history).assignments if args.partitions is not None else None
+        result = execute_dag(dag, release=args.release, run_folder=get_run_folder(), workers=args.workers, artifact_store=artifact_store, journal=journal, resume=args.resume, runtime_history=runtime_history, queue=queue, partitions=partitions)
+        if args.resume:
+            print(f"Resumed the previous run, skipping {len(result.resumed_runnables)} completed runnables")
+        if artifact_store is not None:
+            artifact_store.collect_garbage()
+            print(f"Loaded the outputs of {len(result.cached_runnables)} unchanged runnables from the artifact store")
+        print(result.memory_report)
+    elif args.command == "plan":
+        runtime_history = RuntimeHistory(get_runtime_history_path())
+        plan = CriticalPathPlan(dag, runtime_history)
+        print(f"{len(plan.runnables)} runnables")
+        if args.critical_path:
+            print(plan.report(args.workers))
+        if args.partitions is not None:
+            print(Partition(dag, args.partitions, runtime_history).report())
     elif args.command == "plot":
         plot_dag(dag, args.output_path, args.layout)
     elif args.command == "print":
@@ -1,6 +1,7 @@
 
 from base_dag import DAG
 
+from ..dag.indexed_dag import get_nodes_named
 from ..nodes.variables.variable_factory import VARIABLE_FACTORY, get_variable_type
 
 def add_bridges_to_dag(package_name: str, package_bridges_dict: dict, dag: DAG, processed_packages: dict) -> None:
@@ -42,7 +43,7 @@ def add_bridges_to_dag(package_name: str, package_bridges_dict: dict, dag: DAG,
                 else:
                     output_variable = None
 
-                previous_input_variable = [v for v in dag.nodes if v.name == target]
+                previous_input_variable = get_nodes_named(dag, target)
                 if not previous_input_variable:
                     raise ValueError(f"No input variable found for target {target}")
                 previous_input_variable = previous_input_variable[0]                
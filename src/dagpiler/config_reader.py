@@ -1,7 +1,10 @@
 from abc import abstractmethod
+from concurrent.futures import ThreadPoolExecutor
 import os
 import json
 
+from .constants import CONFIG_PREFETCH_WORKERS
+
 class ConfigReader:
     """Interface for reading all configuration files except index files."""
     @abstractmethod
@@ -12,10 +15,9 @@ class ConfigReaderFactory:
 
     config_readers = {}
 
-    def get_config_reader(self, config_path: str, key: str = "name") -> ConfigReader:
+    def get_config_reader(self, config_path: str) -> ConfigReader:
         ext = os.path.splitext(config_path)[1]
         config_reader = self.config_readers.get(ext, None)
-        config_reader.key = key
         if config_reader is None:
             raise ValueError(f"No config reader found for extension {ext}")
         return config_reader
@@ -25,6 +27,22 @@ class ConfigReaderFactory:
 
 CONFIG_READER_FACTORY = ConfigReaderFactory()
 
+def read_configs(config_paths: list, config_reader: ConfigReader = None, max_workers: int = CONFIG_PREFETCH_WORKERS) -> list:
+    """Read the configuration files concurrently on a bounded thread pool, returning their contents in the same order as the paths.
+    Each file is checked for existence with a single stat, in the same worker thread that reads it, so per-file latency (e.g. on network drives) overlaps."""
+    def read_config(config_path: str) -> dict:
+        try:
+            os.stat(config_path)
+        except FileNotFoundError:
+            raise FileNotFoundError(f"Path {config_path} not found")
+        reader = config_reader if config_reader is not None else CONFIG_READER_FACTORY.get_config_reader(config_path)
+        return reader.read_config(config_path)
+
+    if len(config_paths) <= 1:
+        return [read_config(config_path) for config_path in config_paths]
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(config_paths))) as executor:
+        return list(executor.map(read_config, config_paths))
+
 def register_config_reader(ext: str):
     def decorator(cls):
         CONFIG_READER_FACTORY.register_config_reader(ext, cls())
@@ -12,6 +12,46 @@ VARIABLE_TYPES_KEYS = {
     "__data_object_name__": "data_object_name"
 }
 
+# Maximum number of threads used to concurrently read a package's configuration files
+CONFIG_PREFETCH_WORKERS = 16
+
+# Number of logsheet rows parsed at a time when reading the logsheet
+LOGSHEET_CHUNK_SIZE = 10000
+
+# Number of tasks shown when previewing a runnable's task group
+TASK_PREVIEW_SIZE = 5
+
+# NumPy outputs at least this large are shared between worker processes as memory-mapped files, rather than pickled
+SHARED_OUTPUT_MIN_BYTES = 65536
+
+# The persistent artifact store evicts its least recently used outputs when it is larger than this
+ARTIFACT_STORE_MAX_BYTES = 10 * 1024 ** 3
+
+# Outputs smaller than this are stored inline in the artifact store's index, rather than in their own file
+ARTIFACT_INLINE_MAX_BYTES = 65536
+
+# Garbage collection keeps the artifacts used by this many of the most recent runs
+ARTIFACT_GC_RECENT_RUNS = 5
+
+# The run journal appends its entries once this many tasks have completed, or this many seconds have passed
+JOURNAL_BATCH_SIZE = 256
+JOURNAL_FLUSH_SECONDS = 5.0
+
+# The expected runtime of a runnable that has no runtime history, and no other runnables at its level with one
+DEFAULT_RUNTIME_SECONDS = 1.0
+
+# A worker's claim on a task in the shared work queue expires if it is not renewed within this many seconds, and the task can be claimed by another worker
+QUEUE_LEASE_SECONDS = 60.0
+# How often the coordinator and the workers poll the shared work queue
+QUEUE_POLL_SECONDS = 0.2
+
+# How much more than an equal share of the expected runtime each partition of the runnables may hold, as a fraction
+PARTITION_IMBALANCE = 0.1
+
+# The read-only SQLite DAG keeps this many of the most recently used nodes in memory, and reads nodes from the file this many at a time when iterating
+SQLITE_DAG_CACHE_SIZE = 10000
+SQLITE_DAG_FETCH_SIZE = 10000
+
 # Used in the init() function to personalize the project
 INIT_TEMPLATE_DIR = "init_template_directory"
 DEFAULT_PROJECT_NAME = "My Project"
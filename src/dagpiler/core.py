@@ -1,32 +1,78 @@
 
+from typing import Callable
+
 from base_dag import DAG
 
-from .read_and_compile_dag import process_package, check_no_unspecified_variables
+from .read_and_compile_dag import process_package, process_package_targets, process_packages_in_parallel, check_no_unspecified_variables
+from .dag.indexed_dag import IndexedDAG
 from .dag.furcate import polyfurcate_dag
+from .dag.sweep import expand_sweeps, get_sweep_grid, SweepGrid, SweepSelection
+from .dag.merge_duplicates import merge_duplicate_runnables, format_merges
+from .dag.resolve_exec import resolve_execs
+from .dag.fold_constants import fold_constants
+from .execution.artifact_store import ArtifactStore
 from .dag.printer import json_to_dag
 from .config_reader import CONFIG_READER_FACTORY
+from .session import CompileSession
 
 # Hard-coded import to load Runnable types for now. In the future this should be read from configuration files.
 from .nodes.runnables.process import Process
 
 
-def compile_dag(package_name: str, file_path: str = None) -> DAG:
-    """Get the dependency graph of packages and their runnables."""    
+def compile_dag(package_name: str, file_path: str = None, sweep: Callable[[SweepGrid], SweepSelection] = None, targets: list = None, session: CompileSession = None, workers: int = None, validate_exec: bool = False, artifact_store: ArtifactStore = None) -> DAG:
+    """Get the dependency graph of packages and their runnables.
+    `targets` optionally limits the DAG to the runnables that the target outputs (formatted as `package.runnable.output`) depend on.
+    `workers` compiles each package in a pool of that many worker processes, and then links the packages together. Not used when `targets` are provided.
+    `validate_exec` imports each runnable's exec module when compiling, and raises an error if any of the functions do not exist.
+    `artifact_store` folds the runnables whose inputs are all constants: each is run once while compiling, its outputs are stored in the artifact store, and it is marked as folded.
+    `sweep` optionally selects which parameter sweep combinations to expand, e.g. `lambda grid: grid.sample(10)`. By default, all combinations are expanded.
+    Each compilation runs in its own CompileSession unless one is provided, so compilations in the same process do not affect one another.
+    The session is kept as the DAG's `session` attribute."""    
     if file_path:
         # Create a config reader, read the config file, and convert it to DAG.
         return json_to_dag(CONFIG_READER_FACTORY.get_config_reader(file_path).read_config(file_path))
-    
+
+    if session is None:
+        session = CompileSession()
+    with session:
+        dag = _compile_dag(package_name, sweep, targets, workers, validate_exec, artifact_store)
+    # Kept with the DAG, so that its subset engines are loaded (and each subset evaluated) once per compile, however the DAG is used afterwards
+    dag.session = session
+    return dag
+
+def _compile_dag(package_name: str, sweep: Callable[[SweepGrid], SweepSelection], targets: list, workers: int, validate_exec: bool = False, artifact_store: ArtifactStore = None) -> DAG:
     processed_packages = {}
         
-    dag = DAG()
+    dag = IndexedDAG()
 
     # Get the DAG with all packages and their runnables, and bridged edges.
-    process_package(package_name, processed_packages, dag)
+    if targets:
+        process_package_targets(package_name, targets, processed_packages, dag)
+    elif workers is not None:
+        process_packages_in_parallel(package_name, processed_packages, dag, workers)
+    else:
+        process_package(package_name, processed_packages, dag)
     check_no_unspecified_variables(dag)
 
     # Polyfurcate the DAG as needed if multiple variables input into a single variable
     dag = polyfurcate_dag(dag)
 
+    # Expand the list-valued inputs into parameter sweep branches
+    selection = sweep(get_sweep_grid(dag)) if sweep is not None else None
+    dag = expand_sweeps(dag, selection)
+
+    # Merge the runnables that would compute the same outputs more than once, e.g. in branches whose inputs do not differ
+    merges = merge_duplicate_runnables(dag)
+    if merges:
+        print(f"INFO: {format_merges(merges)}")
+
+    # Resolve each runnable's exec to the module and function it runs
+    resolve_execs(dag, validate=validate_exec)
+
+    # Run the runnables whose outputs are the same for every data object once, now
+    if artifact_store is not None:
+        fold_constants(dag, artifact_store)
+
     return dag
 
 if __name__=="__main__":
@@ -0,0 +1,120 @@
+import numpy as np
+from base_dag import DAG
+
+def get_neighbour_ids(indptr: np.ndarray, indices: np.ndarray, node_ids: np.ndarray) -> np.ndarray:
+    """The neighbours of all of the nodes, from a CSR adjacency, gathered in one vectorized operation (with repeats)."""
+    starts = indptr[node_ids]
+    counts = indptr[node_ids + 1] - starts
+    # The position of each neighbour in `indices`: each node's start, plus the neighbour's offset within that node's run
+    offsets = np.cumsum(counts) - counts
+    positions = np.arange(counts.sum()) + np.repeat(starts - offsets, counts)
+    return indices[positions]
+
+class CompiledDag:
+    """A frozen, array-backed view of a DAG: each node has a dense integer id (its position in `nodes`),
+    and the forward and backward adjacency are stored in CSR form as NumPy arrays.
+    The graph algorithms (topological order, generations, degrees, reachability) run as vectorized operations over whole frontiers of nodes.
+    The view is a snapshot, so it must be rebuilt if the DAG is changed."""
+
+    def __init__(self, dag: DAG):
+        self.nodes = tuple(dag.nodes)
+        self.ids = {node: node_id for node_id, node in enumerate(self.nodes)}
+        num_nodes = len(self.nodes)
+        self.out_degrees = np.fromiter((len(dag.successors(node)) for node in self.nodes), dtype=np.int64, count=num_nodes)
+        targets = np.fromiter((self.ids[successor] for node in self.nodes for successor in dag.successors(node)), dtype=np.int64, count=int(self.out_degrees.sum()))
+        sources = np.repeat(np.arange(num_nodes, dtype=np.int64), self.out_degrees)
+        self.in_degrees = np.bincount(targets, minlength=num_nodes).astype(np.int64)
+
+        self.forward_indptr = np.concatenate(([0], np.cumsum(self.out_degrees)))
+        self.forward_indices = targets
+        self.backward_indptr = np.concatenate(([0], np.cumsum(self.in_degrees)))
+        self.backward_indices = sources[np.argsort(targets, kind="stable")]
+        self._generation_ids = None
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+    def get_id(self, node) -> int:
+        return self.ids[node]
+
+    def get_nodes(self, node_ids) -> list:
+        return [self.nodes[node_id] for node_id in node_ids]
+
+    def successor_ids(self, node_id: int) -> np.ndarray:
+        return self.forward_indices[self.forward_indptr[node_id]:self.forward_indptr[node_id + 1]]
+
+    def predecessor_ids(self, node_id: int) -> np.ndarray:
+        return self.backward_indices[self.backward_indptr[node_id]:self.backward_indptr[node_id + 1]]
+
+    def successors(self, node) -> list:
+        return self.get_nodes(self.successor_ids(self.ids[node]))
+
+    def predecessors(self, node) -> list:
+        return self.get_nodes(self.predecessor_ids(self.ids[node]))
+
+    def in_degree(self, node) -> int:
+        return int(self.in_degrees[self.ids[node]])
+
+    def out_degree(self, node) -> int:
+        return int(self.out_degrees[self.ids[node]])
+
+    @property
+    def generation_ids(self) -> np.ndarray:
+        """The topological generation of each node: 0 for the nodes without predecessors, else one more than the latest of its predecessors' generations.
+        Computed by peeling off one whole generation (frontier) at a time."""
+        if self._generation_ids is not None:
+            return self._generation_ids
+        num_nodes = len(self.nodes)
+        in_degrees = self.in_degrees.copy()
+        generation_ids = np.full(num_nodes, -1, dtype=np.int64)
+        frontier = np.flatnonzero(in_degrees == 0)
+        generation = 0
+        while frontier.size:
+            generation_ids[frontier] = generation
+            successor_ids = get_neighbour_ids(self.forward_indptr, self.forward_indices, frontier)
+            successor_ids, counts = np.unique(successor_ids, return_counts=True)
+            in_degrees[successor_ids] -= counts
+            frontier = successor_ids[in_degrees[successor_ids] == 0]
+            generation += 1
+        if (generation_ids < 0).any():
+            raise ValueError("Graph contains a cycle, so topological generations are not possible")
+        self._generation_ids = generation_ids
+        return generation_ids
+
+    def topological_order(self) -> np.ndarray:
+        """The node ids in topological order: by generation, and within each generation in the order the nodes were added to the DAG."""
+        return np.argsort(self.generation_ids, kind="stable")
+
+    def topological_sort(self) -> list:
+        return self.get_nodes(self.topological_order())
+
+    def topological_generations(self) -> list:
+        """The nodes in each topological generation, as a list of lists."""
+        order = self.topological_order()
+        boundaries = np.flatnonzero(np.diff(self.generation_ids[order])) + 1
+        return [self.get_nodes(generation) for generation in np.split(order, boundaries)] if len(order) else []
+
+    def reachable(self, node_ids, reverse: bool = False) -> np.ndarray:
+        """A boolean mask of the nodes reachable from any of the nodes (excluding themselves, unless reachable along a path),
+        following the edges backward if `reverse` (i.e. the ancestors rather than the descendants)."""
+        indptr, indices = (self.backward_indptr, self.backward_indices) if reverse else (self.forward_indptr, self.forward_indices)
+        reached = np.zeros(len(self.nodes), dtype=bool)
+        frontier = np.unique(np.asarray(node_ids, dtype=np.int64))
+        while frontier.size:
+            neighbour_ids = np.unique(get_neighbour_ids(indptr, indices, frontier))
+            frontier = neighbour_ids[~reached[neighbour_ids]]
+            reached[frontier] = True
+        return reached
+
+    def descendants(self, node, include_node: bool = False) -> list:
+        reached = self.reachable([self.ids[node]])
+        reached[self.ids[node]] |= include_node
+        return self.get_nodes(np.flatnonzero(reached))
+
+    def ancestors(self, node, include_node: bool = False) -> list:
+        reached = self.reachable([self.ids[node]], reverse=True)
+        reached[self.ids[node]] |= include_node
+        return self.get_nodes(np.flatnonzero(reached))
+
+    def has_path(self, source_node, target_node) -> bool:
+        return bool(self.reachable([self.ids[source_node]])[self.ids[target_node]])
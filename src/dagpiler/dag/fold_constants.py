@@ -0,0 +1,58 @@
+from base_dag import DAG
+
+from ..dag.organizer import topological_sort
+from ..execution.artifact_store import ArtifactStore
+from ..execution.callables import get_callable, get_exec_target
+from ..execution.consumers import get_predecessors, get_consumed_outputs
+from ..execution.digests import compute_digests
+from ..execution.executor import get_input_value, split_outputs
+from ..nodes.runnables.runnables import Runnable
+from ..nodes.variables.slices import apply_slices
+from ..nodes.variables.variables import HardcodedVariable, LoadFromFile
+
+def get_constant_runnables(runnables: list, consumed_outputs: dict) -> list:
+    """The runnables whose inputs are all hard-coded, loaded from a file, or the outputs of other constant runnables, in topological order.
+    Their outputs are the same on every run and for every data object."""
+    constant_runnables = []
+    constant_outputs = set()
+    for runnable in runnables:
+        if not getattr(runnable, "exec", "") or not getattr(runnable, "outputs", {}):
+            continue
+        is_constant = True
+        for input_name, input_variable in getattr(runnable, "inputs", {}).items():
+            consumed_output = consumed_outputs[runnable].get(input_name)
+            if consumed_output is not None:
+                is_constant = consumed_output in constant_outputs
+            else:
+                is_constant = isinstance(input_variable, (HardcodedVariable, LoadFromFile))
+            if not is_constant:
+                break
+        if is_constant:
+            constant_runnables.append(runnable)
+            constant_outputs.update(runnable.outputs.values())
+    return constant_runnables
+
+def fold_constants(dag: DAG, artifact_store: ArtifactStore) -> list:
+    """Run each constant runnable once, store its outputs in the artifact store, and mark it as folded.
+    A folded runnable's outputs do not depend on the data object, so they are loaded from the artifact store rather than run for each data object.
+    Runnables whose outputs are already in the artifact store are not run again. Returns the folded runnables."""
+    predecessors = get_predecessors(dag)
+    runnables = [node for node in topological_sort(dag) if isinstance(node, Runnable)]
+    consumed_outputs = {runnable: get_consumed_outputs(predecessors, runnable) for runnable in runnables}
+    constant_runnables = get_constant_runnables(runnables, consumed_outputs)
+    _, output_digests = compute_digests(constant_runnables, consumed_outputs)
+    for runnable in constant_runnables:
+        output_variables = list(runnable.outputs.values())
+        if not all(output_digests[output_variable] in artifact_store for output_variable in output_variables):
+            inputs = {}
+            for input_name, input_variable in getattr(runnable, "inputs", {}).items():
+                consumed_output = consumed_outputs[runnable].get(input_name)
+                if consumed_output is not None:
+                    inputs[input_name] = apply_slices(artifact_store.get(output_digests[consumed_output]), getattr(input_variable, "slices", None))
+                else:
+                    inputs[input_name] = get_input_value(input_variable, None, None)
+            result = get_callable(get_exec_target(runnable))(**inputs)
+            for output_variable, value in zip(output_variables, split_outputs(runnable.name, len(output_variables), result)):
+                artifact_store.put(output_digests[output_variable], value)
+        runnable.folded = True
+    return constant_runnables
@@ -3,6 +3,8 @@ from base_dag import DAG
 from ..nodes.variables.variables import Variable
 from ..nodes.variables.variable_factory import VARIABLE_FACTORY
 from ..nodes.runnables.runnables import Runnable
+from ..dag.organizer import topological_sort
+from ..dag.indexed_dag import remove_nodes_from
 
 def polyfurcate_dag(dag: DAG) -> DAG:
     """Polyfurcate the DAG as needed if multiple variables input into a single variable."""
@@ -19,6 +21,8 @@ def get_nodes_to_furcate(dag: DAG) -> list:
     input_variable_nodes = [edge[0] for edge in dag.edges if isinstance(edge[0], Variable) and isinstance(edge[1], Runnable)] # Includes Constants, etc.
 
     for target_node in input_variable_nodes:
+        if target_node in nodes_to_furcate:
+            continue
         source_nodes = list(dag.predecessors(target_node))
         if len(source_nodes) > 1:
             nodes_to_furcate.append(target_node)
@@ -29,61 +33,67 @@ def perform_polyfurcation(dag: DAG, nodes_to_furcate: list):
     Do this in topological order so that the furcations propagate exponentially."""
     # Turn off the singleton pattern for the Variable Factory, as multiple variables will now potentially be created with the same name.
     VARIABLE_FACTORY.toggle_singleton_off()
-    for node in nodes_to_furcate:
-        node_name = node.name # Until this point, node.name is guaranteed to be unique. After polyfurcation, it will not be unique.
+    while nodes_to_furcate:
+        # Furcating one node copies the nodes downstream of it, so the remaining nodes to furcate are recomputed each time.
+        node = first_in_topological_order(dag, nodes_to_furcate)
         # Each predecessor should be linked to one copied DAG.
         predecessors = list(dag.predecessors(node)) # The multiple output variables for each of which a new DAG will be created
         assert len(predecessors) > 1, f"Node {node} has only one source. It should not be furcated."
 
         # Get all of the descendant nodes
-        descendant_nodes = list(nx.descendants(dag, node)).append(node)        
-        descendant_graph = dag.subgraph(descendant_nodes)
+        descendant_nodes = dag.descendants(node, include_node=True)
 
-        # Create a new DAG for each source
+        # Create a new branch for each source
         for predecessor in predecessors:
-            new_dag, node_mapping = copy_dag_new_uuid(descendant_graph)
+            node_mapping = copy_subgraph(dag, descendant_nodes, root=node)
+            # Connect the furcating predecessor to the new branch
+            dag.add_edge(predecessor, node_mapping[node])
 
-            # Add the new DAG to the overall DAG
-            dag.add_nodes_from(new_dag.nodes(data=True))
-            dag.add_edges_from(new_dag.edges)
-
-            # Connect the non-furcating predecessor nodes to the new DAG
-            # Get the predecessor nodes that feed into the subgraph in the original DAG.
-            # Exclude nodes within the subgraph.
-            non_furcate_predecessors = {}
-            non_furcate_predecessors = {n:
-                pred for n in descendant_graph.nodes
-                for pred in dag.predecessors(n)
-                if pred not in descendant_graph.nodes
-            }            
-            
-            for pred, orig_node in non_furcate_predecessors.items():
-                new_node = node_mapping[orig_node]
-                dag.add_edge(pred, new_node)
-
-            # Connect the furcating predecessor to the new DAG
-            new_node = [n for n in new_dag.nodes if new_dag.nodes[n].name == node_name][0]
-            dag.add_edge(predecessor, new_node)
+        # The original subgraph has been replaced by its branches
+        remove_nodes_from(dag, descendant_nodes)
+        nodes_to_furcate = get_nodes_to_furcate(dag)
     return dag
 
-        
-# def copy_dag_new_uuid(original_dag: DAG) -> DAG:
-#     """Copy the DAG with new node UUID's, preserving (deep copying) the node data."""
-#     original_edges = original_dag.edges
-    
-#     new_dag = DAG()
+def first_in_topological_order(dag: DAG, nodes: list):
+    """Return whichever of the nodes comes first in the topological order of the DAG."""
+    nodes = set(nodes)
+    for node in topological_sort(dag):
+        if node in nodes:
+            return node
 
-#     # Mapping from the original node UUID to the new node UUID
-#     node_mapping = {node: str(uuid.uuid4()) for node in original_dag.nodes}
+def copy_subgraph(dag: DAG, subgraph_nodes: list, root = None, replacements: dict = None, include_node = None) -> dict:
+    """Copy the subgraph into the DAG with new node UUID's. The copies share the original nodes' attribute values, except the runnables' inputs and outputs, which refer to the copied variables.
+    Edges within the subgraph are copied, and nodes outside of the subgraph that feed into it (except into the `root`) are connected to the copies.
+    `replacements` maps subgraph nodes to new nodes to be used in their place, and `include_node` optionally filters which nodes are copied.
+    Returns the mapping from each original node to its copy. The caller must remove the copied originals from the DAG, as the copies read their attributes from them (see `Node.branch_copy`)."""
+    if replacements is None:
+        replacements = {}
+    subgraph_nodes_set = set(subgraph_nodes)
 
-#     # Add nodes with new UUID's and deep copy of data
-#     for old_node, new_node in node_mapping.items():
-#         original_data = original_dag.nodes[old_node]['node']
-#         copied_data = copy.deepcopy(original_data)
-#         copied_data["id"] = new_node # Change the UUID
-#         new_dag.add_node(new_node, node=copied_data)
+    node_mapping = {}
+    for original_node in subgraph_nodes:
+        if include_node is not None and not include_node(original_node):
+            continue
+        if original_node in replacements:
+            copied_node = replacements[original_node]
+        else:
+            copied_node = original_node.branch_copy()
+        node_mapping[original_node] = copied_node
+        dag.add_node(copied_node)
 
-#     # Add edges with new UUID's
-#     new_dag.add_edges_from((node_mapping[u], node_mapping[v]) for u, v in original_edges)
+    # Nodes outside of the subgraph (e.g. shared upstream inputs) are referenced by the copies, not copied.
+    for original_node, copied_node in node_mapping.items():
+        if isinstance(original_node, Runnable) and copied_node is not replacements.get(original_node):
+            for attribute in ("inputs", "outputs"):
+                if hasattr(original_node, attribute):
+                    setattr(copied_node, attribute, {key: node_mapping.get(variable, variable) for key, variable in getattr(original_node, attribute).items()})
 
-#     return new_dag, node_mapping
\ No newline at end of file
+    for original_node, copied_node in node_mapping.items():
+        for predecessor in dag.predecessors(original_node):
+            if predecessor in subgraph_nodes_set:
+                if predecessor in node_mapping:
+                    dag.add_edge(node_mapping[predecessor], copied_node)
+            elif original_node is not root:
+                # Connect the non-furcating predecessor nodes to the new branch
+                dag.add_edge(predecessor, copied_node)
+    return node_mapping
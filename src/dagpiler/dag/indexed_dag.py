@@ -0,0 +1,215 @@
+from typing import Hashable
+
+from base_dag import DAG
+
+class DagCycleError(ValueError):
+    """Adding an edge would have closed a cycle. `cycle` is the path of nodes around it, starting and ending at the edge's source."""
+
+    def __init__(self, source_node: Hashable, target_node: Hashable, cycle: list):
+        self.cycle = cycle
+        super().__init__(f"Adding the edge from {source_node} to {target_node} failed, as it would result in the cycle: {' -> '.join(str(node) for node in cycle)}")
+
+class IndexedDAG(DAG):
+    """A DAG that maintains secondary indexes of its nodes: by class, by package, by fully qualified name, and by level.
+    The indexes are updated as nodes are added, removed and relabeled, so queries such as "the unspecified variables"
+    or "the node named pkg.runnable.input" are dictionary lookups rather than scans over every node.
+    Each index maps a key to the nodes with that key, in the order they were added (as dict keys, i.e. an ordered set).
+
+    It also maintains each node's predecessors, and a topological order of the nodes that is updated as each edge is added
+    (Pearce & Kelly's online topological ordering). An edge that would close a cycle is rejected as soon as it is added,
+    with the path around the cycle, and only the nodes between the edge's ends in the order are visited to check it."""
+
+    def __init__(self):
+        super().__init__()
+        self._by_class = {}
+        self._by_package = {}
+        self._by_name = {}
+        self._by_level = {}
+        self._predecessors = {}
+        self._order = {}
+        self._next_order = 0
+
+    def _index_keys(self, node: Hashable) -> list:
+        """The (index, key) pairs of the node. Nodes without a name (e.g. in tests) are only indexed by class."""
+        keys = [(self._by_class, node.__class__)]
+        name = getattr(node, "name", None)
+        if name is not None:
+            keys.append((self._by_name, name))
+            keys.append((self._by_package, str(name).split(".")[0]))
+        level = getattr(node, "level", None)
+        if level:
+            keys.append((self._by_level, level))
+        return keys
+
+    def _index_node(self, node: Hashable) -> None:
+        for index, key in self._index_keys(node):
+            index.setdefault(key, {})[node] = None
+
+    def _unindex_node(self, node: Hashable) -> None:
+        for index, key in self._index_keys(node):
+            nodes = index.get(key, {})
+            nodes.pop(node, None)
+            if not nodes:
+                index.pop(key, None)
+
+    def add_node(self, node_to_add: Hashable):
+        if node_to_add in self.dag_dict:
+            return
+        self.dag_dict[node_to_add] = []
+        self._predecessors[node_to_add] = []
+        self._order[node_to_add] = self._next_order
+        self._next_order += 1
+        self._index_node(node_to_add)
+
+    def add_edge(self, source_node: Hashable, target_node: Hashable):
+        """Add an edge, raising a DagCycleError (a ValueError) if it would close a cycle."""
+        self.add_node(source_node)
+        self.add_node(target_node)
+        if target_node in self.dag_dict[source_node]:
+            return
+        if self._order[source_node] >= self._order[target_node]:
+            self._reorder(source_node, target_node)
+        self.dag_dict[source_node].append(target_node)
+        self._predecessors[target_node].append(source_node)
+
+    def _reorder(self, source_node: Hashable, target_node: Hashable) -> None:
+        """Restore the topological order for a new edge whose target is ordered before its source.
+        Only the nodes ordered between the two are affected: those reachable from the target are moved after those that reach the source.
+        If the source is reachable from the target, the edge would close a cycle."""
+        if source_node == target_node:
+            raise DagCycleError(source_node, target_node, [source_node, source_node])
+        lower, upper = self._order[target_node], self._order[source_node]
+
+        # The nodes reachable from the target, ordered no later than the source
+        parents = {target_node: None}
+        forward = []
+        stack = [target_node]
+        while stack:
+            node = stack.pop()
+            forward.append(node)
+            for successor in self.dag_dict[node]:
+                if successor == source_node:
+                    path = []
+                    while node is not None:
+                        path.append(node)
+                        node = parents[node]
+                    raise DagCycleError(source_node, target_node, [source_node] + path[::-1] + [source_node])
+                if successor not in parents and self._order[successor] < upper:
+                    parents[successor] = node
+                    stack.append(successor)
+
+        # The nodes that reach the source, ordered no earlier than the target
+        visited = {source_node}
+        backward = []
+        stack = [source_node]
+        while stack:
+            node = stack.pop()
+            backward.append(node)
+            for predecessor in self._predecessors[node]:
+                if predecessor not in visited and self._order[predecessor] > lower:
+                    visited.add(predecessor)
+                    stack.append(predecessor)
+
+        # Reuse the same positions in the order: first the nodes reaching the source, then those reachable from the target
+        nodes = sorted(backward, key=self._order.__getitem__) + sorted(forward, key=self._order.__getitem__)
+        positions = sorted(self._order[node] for node in nodes)
+        for node, position in zip(nodes, positions):
+            self._order[node] = position
+
+    def remove_edge(self, source_node: Hashable, target_node: Hashable):
+        super().remove_edge(source_node, target_node)
+        self._predecessors[target_node].remove(source_node)
+
+    def predecessors(self, node: Hashable):
+        return list(self._predecessors[node])
+
+    def remove_node(self, node_to_remove: Hashable):
+        self.remove_nodes_from([node_to_remove])
+
+    def remove_nodes_from(self, nodes_to_remove) -> None:
+        """Remove the nodes, only visiting their neighbours rather than every node in the DAG."""
+        nodes_to_remove = set(node for node in nodes_to_remove if node in self.dag_dict)
+        sources = set()
+        targets = set()
+        for node in nodes_to_remove:
+            sources.update(self._predecessors.pop(node))
+            targets.update(self.dag_dict.pop(node))
+            del self._order[node]
+            self._unindex_node(node)
+        for source in sources - nodes_to_remove:
+            self.dag_dict[source] = [successor for successor in self.dag_dict[source] if successor not in nodes_to_remove]
+        for target in targets - nodes_to_remove:
+            self._predecessors[target] = [predecessor for predecessor in self._predecessors[target] if predecessor not in nodes_to_remove]
+
+    def relabel_nodes(self, mapping: dict):
+        """Relabel the nodes, each new node taking the place of the old one in the order. The new nodes must not already be in the DAG."""
+        relabeled_nodes = [(old_node, new_node) for old_node, new_node in mapping.items() if old_node in self.dag_dict and old_node != new_node]
+        super().relabel_nodes(mapping)
+        for old_node, new_node in relabeled_nodes:
+            self._unindex_node(old_node)
+            self._index_node(new_node)
+            self._order[new_node] = self._order.pop(old_node)
+            self._predecessors[new_node] = self._predecessors.pop(old_node)
+            for successor in self.dag_dict[new_node]:
+                self._predecessors[successor] = [new_node if predecessor == old_node else predecessor for predecessor in self._predecessors[successor]]
+        return self
+
+    def nodes_of_type(self, node_class: type, exact: bool = False) -> list:
+        """The nodes of the class, or (unless `exact`) of any of its subclasses."""
+        if exact:
+            return list(self._by_class.get(node_class, ()))
+        return [node for indexed_class, nodes in self._by_class.items() if issubclass(indexed_class, node_class) for node in nodes]
+
+    def nodes_in_package(self, package_name: str) -> list:
+        return list(self._by_package.get(package_name, ()))
+
+    def nodes_named(self, name: str) -> list:
+        """The nodes with this fully qualified name. There may be more than one, e.g. the copies in furcated branches."""
+        return list(self._by_name.get(name, ()))
+
+    def nodes_at_level(self, level: str) -> list:
+        return list(self._by_level.get(level, ()))
+
+    def query(self, node_class: type = None, package_name: str = None, name: str = None, level: str = None) -> list:
+        """The nodes matching all of the given criteria, found from the smallest of the matching indexes.
+        With no criteria, all of the nodes."""
+        candidates = []
+        if node_class is not None:
+            candidates.append(self.nodes_of_type(node_class))
+        if package_name is not None:
+            candidates.append(self.nodes_in_package(package_name))
+        if name is not None:
+            candidates.append(self.nodes_named(name))
+        if level is not None:
+            candidates.append(self.nodes_at_level(level))
+        if not candidates:
+            return list(self.dag_dict)
+        candidates.sort(key=len)
+        others = [set(nodes) for nodes in candidates[1:]]
+        return [node for node in candidates[0] if all(node in nodes for nodes in others)]
+
+def get_nodes_of_type(dag: DAG, node_class: type, exact: bool = False) -> list:
+    """The nodes of the class (or, unless `exact`, of its subclasses), from the index of an IndexedDAG, else by scanning the nodes."""
+    if isinstance(dag, IndexedDAG):
+        return dag.nodes_of_type(node_class, exact)
+    if exact:
+        return [node for node in dag.nodes if node.__class__ == node_class]
+    return [node for node in dag.nodes if isinstance(node, node_class)]
+
+def get_nodes_named(dag: DAG, name: str) -> list:
+    """The nodes with this fully qualified name, from the index of an IndexedDAG, else by scanning the nodes."""
+    if isinstance(dag, IndexedDAG):
+        return dag.nodes_named(name)
+    return [node for node in dag.nodes if getattr(node, "name", None) == name]
+
+def remove_nodes_from(dag: DAG, nodes_to_remove) -> None:
+    """Remove the nodes from the DAG. Either way, in one pass over the edges rather than one pass per node."""
+    if isinstance(dag, IndexedDAG):
+        dag.remove_nodes_from(nodes_to_remove)
+        return
+    nodes_to_remove = set(node for node in nodes_to_remove if node in dag.dag_dict)
+    for node in nodes_to_remove:
+        del dag.dag_dict[node]
+    for node, successors in dag.dag_dict.items():
+        if any(successor in nodes_to_remove for successor in successors):
+            dag.dag_dict[node] = [successor for successor in successors if successor not in nodes_to_remove]
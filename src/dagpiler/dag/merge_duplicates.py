@@ -0,0 +1,53 @@
+from base_dag import DAG
+
+from ..dag.organizer import topological_sort
+from ..dag.indexed_dag import remove_nodes_from
+from ..execution.consumers import get_predecessors, get_consumed_outputs
+from ..execution.digests import compute_digests
+from ..nodes.runnables.runnables import Runnable
+
+# The attributes that two runnables must share to be merged, besides their inputs and output names.
+# The name is not included, so that runnables in different packages (or branches) doing the same computation are merged too.
+MERGE_ATTRIBUTES = ("exec", "level", "batch", "subset")
+
+def merge_duplicate_runnables(dag: DAG) -> list:
+    """Merge the runnables that have the same exec, attributes and input digests, e.g. the copies of a runnable in furcated branches whose inputs do not differ.
+    The consumers of each duplicate's outputs are rewired to the first such runnable in topological order, and each of its outputs keeps the duplicate's output name as an alias.
+    Returns the (survivor, duplicate) pairs, with the duplicates removed from the DAG."""
+    predecessors = get_predecessors(dag)
+    runnables = [node for node in topological_sort(dag) if isinstance(node, Runnable)]
+    consumed_outputs = {runnable: get_consumed_outputs(predecessors, runnable) for runnable in runnables}
+    # Consumers of a merged output have the same input digests whichever runnable it is read from, so one pass finds the chains of duplicates too
+    runnable_digests, _ = compute_digests(runnables, consumed_outputs, attributes=MERGE_ATTRIBUTES)
+
+    survivors = {}
+    merges = []
+    nodes_to_remove = set()
+    for runnable in runnables:
+        digest = runnable_digests[runnable]
+        if digest not in survivors:
+            survivors[digest] = runnable
+            continue
+        survivor = survivors[digest]
+        for output_name, output_variable in getattr(runnable, "outputs", {}).items():
+            survivor_output = survivor.outputs[output_name]
+            for successor in list(dag.successors(output_variable)):
+                dag.add_edge(survivor_output, successor)
+            survivor_output.aliases = getattr(survivor_output, "aliases", []) + [output_variable.name] + getattr(output_variable, "aliases", [])
+            nodes_to_remove.add(output_variable)
+        # The duplicate's input variables are removed with it, unless they also feed other nodes
+        nodes_to_remove.update(predecessor for predecessor in predecessors[runnable] if dag.successors(predecessor) == [runnable])
+        nodes_to_remove.add(runnable)
+        merges.append((survivor, runnable))
+
+    remove_nodes_from(dag, nodes_to_remove)
+    return merges
+
+def format_merges(merges: list) -> str:
+    """A report of the runnables merged into each survivor."""
+    merged_names = {}
+    for survivor, duplicate in merges:
+        merged_names.setdefault(survivor, []).append(duplicate.name)
+    lines = [f"Merged {len(merges)} duplicate runnables"]
+    lines.extend(f"    {survivor.name} <- {', '.join(names)}" for survivor, names in merged_names.items())
+    return "\n".join(lines)
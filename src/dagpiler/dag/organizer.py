@@ -1,32 +1,40 @@
 
+import numpy as np
 from base_dag import DAG
 
+from ..dag.compiled_dag import CompiledDag
+from ..dag.indexed_dag import get_nodes_of_type
 from ..nodes.runnables.runnables import Runnable
 
 
-def order_nodes(dag: DAG):
+def topological_generations(dag: DAG) -> list:
+    """Return the nodes in each topological generation as a list of lists."""
+    return CompiledDag(dag).topological_generations()
+
+def topological_sort(dag: DAG) -> list:
+    """Return the nodes of the DAG in topological order."""
+    return CompiledDag(dag).topological_sort()
+
+def order_nodes(dag: DAG, compiled_dag: CompiledDag = None):
     """Order the nodes in the DAG. Within each topological generation, order by the node name."""
-    sorted_nodes = []
-    
-    # Step 1: Get nodes by topological generations
-    for generation in nx.topological_generations(dag):
-        # Step 2: Sort nodes alphabetically by 'name' attribute within each generation
-        generation_sorted = sorted(generation, key=lambda n: dag.nodes[n].get('name', ''))
-        sorted_nodes.extend(generation_sorted)
-    
-    return sorted_nodes
+    if compiled_dag is None:
+        compiled_dag = CompiledDag(dag)
+    names = [getattr(node, 'name', '') for node in compiled_dag.nodes]
+    # Sort by name, then (stably) by generation, so that the nodes are sorted by name within each generation
+    order = np.array(sorted(range(len(names)), key=names.__getitem__), dtype=np.int64)
+    order = order[np.argsort(compiled_dag.generation_ids[order], kind="stable")]
+    return compiled_dag.get_nodes(order)
 
-def order_edges(dag: DAG):
+def order_edges(dag: DAG, compiled_dag: CompiledDag = None):
     """Order the edges in the DAG. Within each topological generation, order by the edge name."""
-    sorted_nodes = order_nodes(dag)
+    if compiled_dag is None:
+        compiled_dag = CompiledDag(dag)
 
     sorted_edges = []
-    for node in sorted_nodes:
-        # Get the edges that have this node as the source
-        edges = dag.edges(node, data=True)
-        # Sort the edges alphabetically by the 'name' attribute of the target node
-        edges_sorted = sorted(edges, key=lambda e: dag.nodes[e[1]].get('name', ''))
-        sorted_edges.extend(edges_sorted)
+    for node in order_nodes(dag, compiled_dag):
+        # Sort the edges that have this node as the source alphabetically by the 'name' attribute of the target node
+        successors = sorted(compiled_dag.successors(node), key=lambda n: getattr(n, 'name', ''))
+        sorted_edges.extend((node, successor) for successor in successors)
     
     return sorted_edges
 
@@ -35,7 +43,7 @@ def get_dag_of_runnables(dag: DAG) -> DAG:
     This DAG has the advantage of being able to topologically sort the Runnable nodes."""
     # Get the transitive closure
     trans_clos_dag = dag.transitive_closure()
-    runnable_nodes = [node for node in dag.nodes if issubclass(node.__class__, Runnable)]
+    runnable_nodes = get_nodes_of_type(dag, Runnable)
     runnable_dag = trans_clos_dag.subgraph(runnable_nodes).copy()
     
     # Get the edges to remove between Runnable nodes that are not neighbors
@@ -0,0 +1,76 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from base_dag import DAG
+
+from ..config_reader import CONFIG_READER_FACTORY, RUNNABLE_PARSER_FACTORY, read_configs
+from ..session import CompileSession, get_current_session
+from ..dag.indexed_dag import IndexedDAG
+from ..dag.package_runnables import add_runnable_nodes_to_dag, connect_dynamic_variables
+from ..bridges.bridges import add_bridges_to_dag
+from ..nodes.variables.variables import Variable
+
+class PackageFragment:
+    """The compiled, but not yet linked, runnable and variable nodes of one package.
+    Fragments are picklable, so that each package can be compiled in a separate worker process."""
+
+    def __init__(self, package_name: str, runnable_nodes: list, nodes: list, edges: list):
+        self.package_name = package_name
+        self.runnable_nodes = runnable_nodes
+        self.nodes = nodes
+        self.edges = edges
+
+def compile_package_fragment(package_name: str, index_file_path: str, runnables_file_paths: list) -> PackageFragment:
+    """Compile stage: parse, validate and build the runnable and variable nodes of one package.
+    Runs in a worker process, so it uses its own CompileSession."""
+    package_folder = os.path.dirname(index_file_path)
+    with CompileSession() as session, session.in_package(package_folder):
+        config_reader = CONFIG_READER_FACTORY.get_config_reader(index_file_path)
+        config_parser = RUNNABLE_PARSER_FACTORY.get_runnable_parser(key="name")
+        package_runnables_dict = {}
+        runnables_full_file_paths = [os.path.join(package_folder, runnables_file_path) for runnables_file_path in runnables_file_paths]
+        for runnables in read_configs(runnables_full_file_paths, config_reader):
+            package_runnables_dict.update(config_parser.parse_runnable(runnables))
+
+        if not package_runnables_dict:
+            print(f"WARNING: No runnables found for package {package_name}")
+
+        fragment_dag = IndexedDAG()
+        runnable_nodes = add_runnable_nodes_to_dag(package_name, package_runnables_dict, fragment_dag)
+    return PackageFragment(package_name, runnable_nodes, list(fragment_dag.nodes), list(fragment_dag.edges))
+
+def compile_package_fragments(lazy_packages: dict, workers: int = None) -> list:
+    """Compile the fragment of each package, in parallel over a pool of worker processes.
+    The fragments are returned in the same order as the packages."""
+    fragment_args = [
+        (package_name, lazy_package.index_file_path, lazy_package.unread_runnables_file_paths)
+        for package_name, lazy_package in lazy_packages.items()
+    ]
+    if workers == 1:
+        return [compile_package_fragment(*args) for args in fragment_args]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(compile_package_fragment, *zip(*fragment_args)))
+
+def link_package_fragments(fragments: list, lazy_packages: dict, processed_packages: dict, dag: DAG) -> None:
+    """Link stage: combine the fragments into the DAG, then resolve the dynamic variables and the bridges between packages."""
+    session = get_current_session()
+    for fragment in fragments:
+        dag.add_nodes_from(fragment.nodes)
+        for source, target in fragment.edges:
+            dag.add_edge(source, target)
+        # Intern the fragment's variables in this session, so that references to them resolve to the same nodes.
+        for node in fragment.nodes:
+            if isinstance(node, Variable):
+                session.variable_cache[node.attrs_hash()] = node
+        processed_packages[fragment.package_name] = {
+            "runnables": {runnable_node.name: runnable_node for runnable_node in fragment.runnable_nodes},
+            "bridges": lazy_packages[fragment.package_name].bridges
+        }
+
+    for fragment in fragments:
+        connect_dynamic_variables(fragment.package_name, fragment.runnable_nodes, dag)
+
+    for fragment in fragments:
+        lazy_package = lazy_packages[fragment.package_name]
+        with session.in_package(lazy_package.package_folder):
+            add_bridges_to_dag(fragment.package_name, lazy_package.bridges, dag, processed_packages)
@@ -6,6 +6,11 @@ from ..nodes.variables.variable_factory import VARIABLE_FACTORY
 
 def add_package_runnables_to_dag(package_name: str, package_runnables_dict: dict, dag: DAG) -> None:
     """Add package runnables to the DAG."""
+    runnable_nodes = add_runnable_nodes_to_dag(package_name, package_runnables_dict, dag)
+    connect_dynamic_variables(package_name, runnable_nodes, dag)
+
+def add_runnable_nodes_to_dag(package_name: str, package_runnables_dict: dict, dag: DAG) -> list:
+    """Add the runnables and their input and output variables to the DAG, without connecting the variables to one another."""
     runnable_nodes = []
     for runnable_name, runnable in package_runnables_dict.items():        
         # Convert the runnable to a node in the DAG
@@ -31,8 +36,10 @@ def add_package_runnables_to_dag(package_name: str, package_runnables_dict: dict
             for output_var in runnable_node.outputs.values():
                 dag.add_node(output_var)
                 dag.add_edge(runnable_node, output_var) 
-        
-    # Connect the variables to one another
+    return runnable_nodes
+
+def connect_dynamic_variables(package_name: str, runnable_nodes: list, dag: DAG) -> None:
+    """Connect the dynamic input variables of the runnables to the output variables they reference, within the same package."""
     for runnable_node in runnable_nodes:
         if not hasattr(runnable_node, "inputs"):
             continue
@@ -41,6 +48,7 @@ def add_package_runnables_to_dag(package_name: str, package_runnables_dict: dict
                 continue # Skip everything that's not a dynamic variable
 
             # Ensure that the value_for_hashing has any slicing removed, and the full variable name is used to match the output variable
-            output_var = VARIABLE_FACTORY.create_variable(runnable_node.value_for_hashing)
-            assert output_var in dag.nodes, f"Variable value {output_var} from {input_var} not found as an output variable in the DAG. Check your spelling and ensure that the variable is an output from a runnable."
+            output_var_name = ".".join([package_name, input_var.value_for_hashing.split("[")[0]])
+            output_var = VARIABLE_FACTORY.create_variable(output_var_name)
+            assert output_var in dag.dag_dict, f"Variable value {output_var} from {input_var} not found as an output variable in the DAG. Check your spelling and ensure that the variable is an output from a runnable."
             dag.add_edge(output_var, input_var)
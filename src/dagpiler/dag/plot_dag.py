@@ -12,13 +12,15 @@ except:
 
 from base_dag import DAG
 
-from ..nodes.variables.variables import Variable, OutputVariable, DynamicVariable, HardcodedVariable, UnspecifiedVariable, LoadFromFile, DataObjectFilePath, DataObjectName
+from ..nodes.variables.variables import Variable, OutputVariable, DynamicVariable, HardcodedVariable, UnspecifiedVariable, LoadFromFile, SweepVariable, DataObjectFilePath, DataObjectName
 from ..nodes.runnables.process import Process
 from ..nodes.runnables.plot import Plot
+from ..dag.compiled_dag import CompiledDag
 from ..dag.organizer import order_nodes, get_dag_of_runnables
 
 colors_dict = {
     HardcodedVariable: 'blue',
+    SweepVariable: 'blue',
     LoadFromFile: 'blue',
     DataObjectFilePath: 'blue',
     DataObjectName: 'blue',
@@ -29,17 +31,13 @@ colors_dict = {
     Plot: 'purple'   
 }
 
-def get_layers(graph: DAG):
-    layers = defaultdict(list)
-    for node in nx.topological_sort(graph):
-        layer = 0
-        for predecessor in graph.predecessors(node):
-            layer = max(layer, layers[predecessor] + 1)  # Determine the layer of the node
-        layers[node] = layer
-    # Invert the layers dictionary to get nodes per layer
+def get_layers(graph: DAG, compiled_dag: CompiledDag = None):
+    """The nodes in each layer (topological generation) of the DAG, i.e. one more than the latest layer of their predecessors."""
+    if compiled_dag is None:
+        compiled_dag = CompiledDag(graph)
     layers_by_generation = defaultdict(list)
-    for node, layer in layers.items():
-        layers_by_generation[layer].append(node)
+    for layer, nodes in enumerate(compiled_dag.topological_generations()):
+        layers_by_generation[layer] = nodes
     return layers_by_generation
 
 def plot_dag(dag: DAG, layout: str = 'generation'):  
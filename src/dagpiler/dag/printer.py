@@ -6,12 +6,15 @@ import yaml
 
 from base_dag import DAG
 
+from ..dag.compiled_dag import CompiledDag
+from ..dag.indexed_dag import IndexedDAG
+from ..dag.sqlite_dag import write_sqlite_dag
 from ..dag.organizer import order_nodes, order_edges, get_dag_of_runnables
 from ..nodes.node import NodeFactory
 
 def print_dag(dag: DAG, path: str = "dag.json") -> None:
     """Print the DAG in a human-readable format."""    
-    if path != "stdout" and not os.path.exists(os.path.dirname(path)):
+    if path != "stdout" and os.path.dirname(path) and not os.path.exists(os.path.dirname(path)):
         raise FileNotFoundError(f"Directory {os.path.dirname(path)} does not exist.")
     
     dag_writer = DAG_WRITER_FACTORY.create(path.split(".")[-1])
@@ -32,7 +35,7 @@ class DagWriterFactory:
         writer = self._writers.get(format)
         if not writer:
             raise ValueError(format)
-        return writer
+        return writer()
     
 DAG_WRITER_FACTORY = DagWriterFactory()
 
@@ -46,9 +49,10 @@ def register_writer(format: str):
 class StdoutDagWriter(DagWriter):
     """Write the DAG to stdout (default)"""    
     def write(self, dag: DAG, path: str) -> None:
+        compiled_dag = CompiledDag(dag)
         dag_dict = {}
-        dag_dict["nodes"] = [str(node) for node in order_nodes(dag)]
-        dag_dict["edges"] = [f"{str(edge[0])} -> {str(edge[1])}" for edge in order_edges(dag)]
+        dag_dict["nodes"] = [str(node) for node in order_nodes(dag, compiled_dag)]
+        dag_dict["edges"] = [f"{str(edge[0])} -> {str(edge[1])}" for edge in order_edges(dag, compiled_dag)]
         print("DAG:")
         print("nodes")
         for count, node in enumerate(dag_dict["nodes"]):
@@ -61,9 +65,10 @@ class StdoutDagWriter(DagWriter):
 class TomlDagWriter(DagWriter):
     """Write the DAG to a TOML file."""
     def write(self, dag: DAG, path: str) -> None:
+        compiled_dag = CompiledDag(dag)
         dag_dict = {}
-        dag_dict["nodes"] = [str(node) for node in order_nodes(dag)]
-        dag_dict["edges"] = [f"{str(edge[0])} -> {str(edge[1])}" for edge in order_edges(dag)]
+        dag_dict["nodes"] = [str(node) for node in order_nodes(dag, compiled_dag)]
+        dag_dict["edges"] = [f"{str(edge[0])} -> {str(edge[1])}" for edge in order_edges(dag, compiled_dag)]
         
         if not os.path.exists(os.path.dirname(path)):
             raise FileNotFoundError(f"Directory {os.path.dirname(path)} does not exist.")
@@ -113,6 +118,12 @@ class JsonDagWriter(DagWriter):
         # Convert the graph dictionary to JSON
         return json.dumps(graph_dict, indent=2)
     
+@register_writer("sqlite")
+class SqliteDagWriter(DagWriter):
+    """Write the DAG to an indexed SQLite file, which SqliteDag can query without loading the whole DAG into memory."""
+    def write(self, dag: DAG, path: str) -> None:
+        write_sqlite_dag(dag, path)
+
 @register_writer("yaml")
 class YamlDagWriter(DagWriter):
     def write(self, dag: DAG, path: str) -> None:
@@ -121,7 +132,7 @@ class YamlDagWriter(DagWriter):
 def json_to_dag(json_dag: dict) -> DAG:
     """Convert the saved JSON back to a DAG."""
     data = json.loads(json_dag)
-    dag = DAG()
+    dag = IndexedDAG()
 
     # Add the nodes to the graph using the RunnableFactory
     for node_data in data["nodes"]:
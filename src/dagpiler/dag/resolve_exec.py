@@ -0,0 +1,22 @@
+from base_dag import DAG
+
+from ..dag.indexed_dag import get_nodes_of_type
+from ..nodes.runnables.exec_target import parse_exec, import_exec
+from ..nodes.runnables.runnables import Runnable
+
+def resolve_execs(dag: DAG, validate: bool = False) -> None:
+    """Resolve each runnable's exec attribute to its (module name, qualified name), stored as the runnable's exec_target.
+    Raises a ValueError listing every exec that is not formatted as "module.path::function_name".
+    `validate` also imports each module, and lists every exec whose callable does not exist."""
+    errors = []
+    for node in get_nodes_of_type(dag, Runnable):
+        if not getattr(node, "exec", ""):
+            continue
+        try:
+            node.exec_target = parse_exec(node.exec)
+            if validate:
+                import_exec(*node.exec_target)
+        except ValueError as e:
+            errors.append(f"{node.name}: {e}")
+    if errors:
+        raise ValueError("The exec of these runnables could not be resolved:\n" + "\n".join(errors))
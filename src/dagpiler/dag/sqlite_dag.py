@@ -0,0 +1,239 @@
+import json
+import os
+import sqlite3
+from collections import OrderedDict
+from typing import Iterator
+
+import numpy as np
+from base_dag import DAG
+
+from ..constants import SQLITE_DAG_CACHE_SIZE, SQLITE_DAG_FETCH_SIZE
+from ..dag.compiled_dag import CompiledDag
+from ..nodes.node import Node, get_slot_names
+
+SCHEMA = [
+    "CREATE TABLE nodes (node_id INTEGER PRIMARY KEY, uuid TEXT, class TEXT, name TEXT, package TEXT, level TEXT, generation INTEGER, attributes TEXT)",
+    "CREATE TABLE edges (source INTEGER, target INTEGER)",
+]
+
+# Created after the rows are inserted, which is faster than updating them for each row
+INDEXES = [
+    "CREATE INDEX nodes_name ON nodes (name)",
+    "CREATE INDEX nodes_package ON nodes (package)",
+    "CREATE INDEX nodes_class ON nodes (class)",
+    "CREATE INDEX nodes_uuid ON nodes (uuid)",
+    "CREATE INDEX edges_source ON edges (source, target)",
+    "CREATE INDEX edges_target ON edges (target, source)",
+]
+
+def get_attribute_value(value):
+    """An attribute value that can be written as JSON. Nodes (e.g. a runnable's input and output variables) are referred to by their UUID."""
+    if isinstance(value, Node):
+        return value._uuid
+    if isinstance(value, dict):
+        return {key: get_attribute_value(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [get_attribute_value(item) for item in value]
+    return value
+
+def get_node_attributes(node) -> dict:
+    """The node's attributes, including those a branch copy reads from the node it was copied from."""
+    attribute_names = [slot for slot in get_slot_names(node.__class__) if slot not in ("_uuid", "_base")]
+    if getattr(node, "_base", None) is not None:
+        attribute_names.extend(vars(node._base))
+    attribute_names.extend(vars(node) if hasattr(node, "__dict__") else ())
+    attributes = {}
+    for attribute_name in dict.fromkeys(attribute_names):
+        try:
+            attributes[attribute_name] = get_attribute_value(getattr(node, attribute_name))
+        except AttributeError:
+            pass
+    return attributes
+
+def write_sqlite_dag(dag: DAG, path: str) -> None:
+    """Write the nodes, edges and node attributes of the DAG to an indexed SQLite file.
+    The nodes are numbered in topological order (by generation), so the file can be read in topological order by node id.
+    The file is written to a temporary path and then moved into place, so readers never see a partially written DAG."""
+    compiled_dag = CompiledDag(dag)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    order = compiled_dag.topological_order()
+    node_ids = np.empty(len(order), dtype=np.int64)
+    node_ids[order] = np.arange(len(order))
+    connection = sqlite3.connect(tmp_path)
+    try:
+        with connection:
+            for statement in SCHEMA:
+                connection.execute(statement)
+            connection.executemany("INSERT INTO nodes VALUES (?, ?, ?, ?, ?, ?, ?, ?)", (
+                (
+                    node_id,
+                    getattr(node, "_uuid", None),
+                    node.__class__.__name__,
+                    getattr(node, "name", str(node)),
+                    str(getattr(node, "name", node)).split(".")[0],
+                    json.dumps(getattr(node, "level", None)),
+                    int(compiled_dag.generation_ids[compiled_id]),
+                    json.dumps(get_node_attributes(node), default=repr),
+                )
+                for node_id, compiled_id in enumerate(order.tolist())
+                for node in (compiled_dag.nodes[compiled_id],)
+            ))
+            sources = np.repeat(np.arange(len(order)), compiled_dag.out_degrees)
+            connection.executemany("INSERT INTO edges VALUES (?, ?)", zip(node_ids[sources].tolist(), node_ids[compiled_dag.forward_indices].tolist()))
+            for statement in INDEXES:
+                connection.execute(statement)
+    finally:
+        connection.close()
+    os.replace(tmp_path, path)
+
+def get_class_names(node_class: type, exact: bool = False) -> list:
+    """The names of the class and (unless `exact`) all of its subclasses."""
+    class_names = {node_class.__name__: None}
+    if not exact:
+        subclasses = node_class.__subclasses__()
+        while subclasses:
+            subclass = subclasses.pop()
+            class_names[subclass.__name__] = None
+            subclasses.extend(subclass.__subclasses__())
+    return list(class_names)
+
+class StoredNode:
+    """A read-only node of a DAG stored in SQLite. Its attributes are loaded from JSON, and other nodes are referred to by their UUID."""
+
+    def __init__(self, node_id: int, uuid: str, class_name: str, name: str, package: str, level, generation: int, attributes: dict):
+        self.node_id = node_id
+        self.uuid = uuid
+        self.class_name = class_name
+        self.name = name
+        self.package = package
+        self.level = level
+        self.generation = generation
+        self.attributes = attributes
+
+    def __getitem__(self, attribute_name: str):
+        return self.attributes[attribute_name]
+
+    def package_name(self) -> str:
+        return self.package
+
+    def __hash__(self) -> int:
+        return self.node_id
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, StoredNode) and self.node_id == other.node_id
+
+    def __repr__(self) -> str:
+        return f"{self.class_name}({self.name})"
+
+class SqliteDag:
+    """A read-only view of a DAG written by the SQLite DAG writer, for DAGs too large to load as Python objects.
+    Each query (successors, predecessors, lookups by name, package or class) is answered from the file's indexes,
+    and the most recently used nodes are kept in an LRU cache of `cache_size` nodes."""
+
+    def __init__(self, path: str, cache_size: int = SQLITE_DAG_CACHE_SIZE):
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"File {path} does not exist.")
+        self.path = path
+        self.cache_size = cache_size
+        self.connection = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+        self._cache = OrderedDict()
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    def close(self) -> None:
+        self.connection.close()
+
+    def __enter__(self) -> "SqliteDag":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self.connection.execute("SELECT COUNT(*) FROM nodes").fetchone()[0]
+
+    @property
+    def num_edges(self) -> int:
+        return self.connection.execute("SELECT COUNT(*) FROM edges").fetchone()[0]
+
+    def _to_node(self, row: tuple) -> StoredNode:
+        node_id, uuid, class_name, name, package, level, generation, attributes = row
+        return StoredNode(node_id, uuid, class_name, name, package, json.loads(level), generation, json.loads(attributes))
+
+    def get_node(self, node_id: int) -> StoredNode:
+        if node_id in self._cache:
+            self.cache_hits += 1
+            self._cache.move_to_end(node_id)
+            return self._cache[node_id]
+        self.cache_misses += 1
+        row = self.connection.execute("SELECT * FROM nodes WHERE node_id = ?", (node_id,)).fetchone()
+        if row is None:
+            raise KeyError(f"No node with id {node_id}")
+        node = self._to_node(row)
+        self._cache[node_id] = node
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return node
+
+    def get_nodes(self, node_ids: list) -> list:
+        return [self.get_node(node_id) for node_id in node_ids]
+
+    def get_node_by_uuid(self, uuid: str) -> StoredNode:
+        """The node with this UUID, e.g. one of a stored runnable's input or output variables."""
+        row = self.connection.execute("SELECT node_id FROM nodes WHERE uuid = ?", (uuid,)).fetchone()
+        if row is None:
+            raise KeyError(f"No node with UUID {uuid}")
+        return self.get_node(row[0])
+
+    def successors(self, node: StoredNode) -> list:
+        return self.get_nodes([row[0] for row in self.connection.execute("SELECT target FROM edges WHERE source = ? ORDER BY target", (node.node_id,))])
+
+    def predecessors(self, node: StoredNode) -> list:
+        return self.get_nodes([row[0] for row in self.connection.execute("SELECT source FROM edges WHERE target = ? ORDER BY source", (node.node_id,))])
+
+    def in_degree(self, node: StoredNode) -> int:
+        return self.connection.execute("SELECT COUNT(*) FROM edges WHERE target = ?", (node.node_id,)).fetchone()[0]
+
+    def out_degree(self, node: StoredNode) -> int:
+        return self.connection.execute("SELECT COUNT(*) FROM edges WHERE source = ?", (node.node_id,)).fetchone()[0]
+
+    def _iterate(self, query: str, parameters: tuple = ()) -> Iterator[StoredNode]:
+        """The nodes of the query, fetched a batch at a time so that they are not all held in memory at once."""
+        cursor = self.connection.execute(query, parameters)
+        while True:
+            rows = cursor.fetchmany(SQLITE_DAG_FETCH_SIZE)
+            if not rows:
+                return
+            for row in rows:
+                # Iterating over the whole DAG would only churn the cache, so only nodes that are already cached are reused
+                node_id = row[0]
+                yield self._cache[node_id] if node_id in self._cache else self._to_node(row)
+
+    def topological_sort(self) -> Iterator[StoredNode]:
+        """Iterate over the nodes in topological order (by generation), which is the order of their ids."""
+        return self._iterate("SELECT * FROM nodes ORDER BY node_id")
+
+    def topological_generations(self) -> Iterator[list]:
+        """Iterate over the nodes of each topological generation."""
+        generation = []
+        for node in self.topological_sort():
+            if generation and node.generation != generation[0].generation:
+                yield generation
+                generation = []
+            generation.append(node)
+        if generation:
+            yield generation
+
+    def nodes_named(self, name: str) -> list:
+        return list(self._iterate("SELECT * FROM nodes WHERE name = ? ORDER BY node_id", (name,)))
+
+    def nodes_in_package(self, package_name: str) -> list:
+        return list(self._iterate("SELECT * FROM nodes WHERE package = ? ORDER BY node_id", (package_name,)))
+
+    def nodes_of_type(self, node_class: type, exact: bool = False) -> list:
+        """The nodes of the class, or (unless `exact`) of any of its subclasses, as for an IndexedDAG.
+        The file stores each node's class name, so the nodes are matched by the names of the class and its (imported) subclasses."""
+        class_names = get_class_names(node_class, exact)
+        return list(self._iterate(f"SELECT * FROM nodes WHERE class IN ({', '.join('?' * len(class_names))}) ORDER BY node_id", tuple(class_names)))
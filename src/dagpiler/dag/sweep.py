@@ -0,0 +1,150 @@
+import itertools
+import math
+import random
+from typing import Callable, Iterator
+
+from base_dag import DAG
+
+from ..nodes.variables.variables import SweepVariable, HardcodedVariable
+from ..dag.organizer import topological_sort
+from ..dag.indexed_dag import get_nodes_of_type, remove_nodes_from
+from ..dag.furcate import copy_subgraph
+
+class SweepGrid:
+    """The Cartesian product of the values of every swept variable in the DAG, enumerated lazily.
+    Each combination is a dict mapping the swept variable's name to one of its values."""
+
+    def __init__(self, axes: dict):
+        self.axes = axes
+        self.names = list(axes.keys())
+        self.sizes = [len(values) for values in axes.values()]
+
+    def __len__(self) -> int:
+        return math.prod(self.sizes)
+
+    def __iter__(self) -> Iterator[dict]:
+        for indices in self.indices():
+            yield self.combination(indices)
+
+    def __getitem__(self, index: int) -> dict:
+        return self.combination(self.unravel(index))
+
+    def indices(self) -> Iterator[tuple]:
+        """Lazily enumerate the combinations as tuples of value indices, one per axis."""
+        return itertools.product(*(range(size) for size in self.sizes))
+
+    def unravel(self, index: int) -> tuple:
+        """Convert the flat index of a combination to its tuple of value indices, without enumerating the grid."""
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(f"Sweep combination index {index} out of range for a grid of {len(self)} combinations")
+        indices = []
+        for size in reversed(self.sizes):
+            index, value_index = divmod(index, size)
+            indices.append(value_index)
+        return tuple(reversed(indices))
+
+    def combination(self, indices: tuple) -> dict:
+        """Convert a tuple of value indices to a combination."""
+        return {name: self.axes[name][value_index] for name, value_index in zip(self.names, indices)}
+
+    def filter(self, predicate: Callable[[dict], bool]) -> "SweepSelection":
+        """Select the combinations for which the predicate returns True."""
+        return SweepSelection(self, self.indices).filter(predicate)
+
+    def sample(self, k: int, seed: int = None) -> "SweepSelection":
+        """Select k combinations uniformly at random, without enumerating the grid."""
+        flat_indices = random.Random(seed).sample(range(len(self)), min(k, len(self)))
+        return SweepSelection(self, lambda: (self.unravel(flat_index) for flat_index in sorted(flat_indices)))
+
+class SweepSelection:
+    """A lazily enumerated subset of the combinations in a SweepGrid."""
+
+    def __init__(self, grid: SweepGrid, get_indices: Callable[[], Iterator[tuple]]):
+        self.grid = grid
+        self._get_indices = get_indices
+
+    def __iter__(self) -> Iterator[dict]:
+        for indices in self.indices():
+            yield self.grid.combination(indices)
+
+    def indices(self) -> Iterator[tuple]:
+        return self._get_indices()
+
+    def filter(self, predicate: Callable[[dict], bool]) -> "SweepSelection":
+        """Select the combinations for which the predicate returns True."""
+        return SweepSelection(self.grid, lambda: (indices for indices in self.indices() if predicate(self.grid.combination(indices))))
+
+    def sample(self, k: int, seed: int = None) -> "SweepSelection":
+        """Select k of the combinations uniformly at random (reservoir sampling, so only k combinations are held in memory)."""
+        def get_indices():
+            rng = random.Random(seed)
+            reservoir = []
+            for count, indices in enumerate(self.indices()):
+                if count < k:
+                    reservoir.append(indices)
+                    continue
+                replace_index = rng.randint(0, count)
+                if replace_index < k:
+                    reservoir[replace_index] = indices
+            return iter(sorted(reservoir))
+        return SweepSelection(self.grid, get_indices)
+
+class SelectionIndex:
+    """Answers whether a partial assignment of sweep values is part of any selected combination."""
+
+    def __init__(self, selection: SweepSelection):
+        self.combinations = list(selection.indices()) # Only the selected subset is materialized, as tuples of value indices.
+        self._projections = {}
+
+    def is_consistent(self, assignment: dict) -> bool:
+        axes = tuple(sorted(assignment.keys()))
+        if axes not in self._projections:
+            self._projections[axes] = {tuple(combination[axis] for axis in axes) for combination in self.combinations}
+        return tuple(assignment[axis] for axis in axes) in self._projections[axes]
+
+def get_sweep_grid(dag: DAG) -> SweepGrid:
+    """Get the grid of parameter sweep combinations for the swept variables in the DAG.
+    Swept variables with the same name (e.g. copies in furcated branches) are one axis of the grid."""
+    axes = {}
+    for node in get_nodes_of_type(dag, SweepVariable):
+        if node.name not in axes:
+            axes[node.name] = node.values
+    return SweepGrid(axes)
+
+def expand_sweeps(dag: DAG, selection: SweepSelection = None) -> DAG:
+    """Expand each swept variable into one hard-coded variable per value, each feeding its own copy of the swept variable's descendants.
+    Upstream nodes are shared between the branches. If a selection is provided, only the branches needed by the selected combinations are created."""
+    sweep_nodes = [node for node in topological_sort(dag) if isinstance(node, SweepVariable)]
+    if not sweep_nodes:
+        return dag
+    grid = get_sweep_grid(dag)
+    selection_index = None
+    if selection is not None and selection is not grid:
+        selection_index = SelectionIndex(selection)
+
+    # The sweep values (as {axis: value index}) that each branch node was copied for.
+    assignments = {}
+    for sweep_node in sweep_nodes:
+        axis = grid.names.index(sweep_node.name)
+        descendant_nodes = dag.descendants(sweep_node, include_node=True)
+        for value_index, value in enumerate(grid.axes[sweep_node.name]):
+            def include_node(node, value_index=value_index) -> bool:
+                if selection_index is None:
+                    return True
+                assignment = dict(assignments.get(node, {}))
+                assignment[axis] = value_index
+                return selection_index.is_consistent(assignment)
+            hardcoded_variable = HardcodedVariable(sweep_node.name, value)
+            hardcoded_variable.set_value_for_hashing()
+            node_mapping = copy_subgraph(dag, descendant_nodes, root=sweep_node, replacements={sweep_node: hardcoded_variable}, include_node=include_node)
+            for original_node, copied_node in node_mapping.items():
+                assignments[copied_node] = dict(assignments.get(original_node, {}))
+                assignments[copied_node][axis] = value_index
+
+        # The original subgraph has been replaced by its branches
+        remove_nodes_from(dag, descendant_nodes)
+        for descendant_node in descendant_nodes:
+            assignments.pop(descendant_node, None)
+    return dag
@@ -0,0 +1,95 @@
+from typing import Iterator
+
+import numpy as np
+from base_dag import DAG
+
+from ..constants import TASK_PREVIEW_SIZE
+from ..dag.organizer import topological_sort
+from ..logsheet.subsets import SubsetEngine
+from ..nodes.runnables.runnables import Runnable
+from ..session import get_dag_session
+
+class Task:
+    """One concrete call of a runnable, on one data object, or on one batch of data objects."""
+
+    def __init__(self, runnable: Runnable, data_objects: tuple):
+        self.runnable = runnable
+        self.data_objects = data_objects # The full names of the data objects the runnable is called with
+
+    def __repr__(self) -> str:
+        return f"Task({self.runnable.name}, {list(self.data_objects)})"
+
+class TaskGroup:
+    """The tasks of one runnable: one per data object at the runnable's level, or one per batch if the runnable has a batch.
+    A folded (constant) runnable has a single task, without any data objects.
+    The tasks are counted and created lazily, so a scheduler can start dispatching them before they have all been created."""
+
+    def __init__(self, runnable: Runnable, subset_engine: SubsetEngine):
+        self.runnable = runnable
+        self.subset_engine = subset_engine
+        data_object_index = subset_engine.data_object_index
+        self.level = getattr(runnable, "level", "") or data_object_index.levels[-1]
+        self.batch = tuple(getattr(runnable, "batch", ()))
+        for batch_level in self.batch:
+            if batch_level not in data_object_index.levels[:data_object_index.levels.index(self.level) + 1]:
+                raise ValueError(f"Runnable {runnable.name} batch level {batch_level} is not at or above its level {self.level}")
+        self._task_offsets = None
+
+    def _compute_tasks(self) -> None:
+        """Group the selected data objects into tasks, as the data object indices of each task in a flat array with per-task offsets."""
+        data_object_index = self.subset_engine.data_object_index
+        data_object_level = data_object_index.get_level(self.level)
+        if getattr(self.runnable, "folded", False):
+            self._task_data_objects = np.array([], dtype=int)
+            self._task_offsets = np.array([0, 0])
+            return
+        selected_data_objects = np.flatnonzero(self.subset_engine.get_data_object_mask(getattr(self.runnable, "subset", ""), self.level))
+        if not self.batch:
+            self._task_data_objects = selected_data_objects
+            self._task_offsets = np.arange(len(selected_data_objects) + 1)
+            return
+        # The batch levels are nested, so the deepest batch level identifies the batch that a data object belongs to.
+        deepest_batch_level = max(self.batch, key=data_object_index.levels.index)
+        batch_level = data_object_index.get_level(deepest_batch_level)
+        batch_ids = batch_level.row_object_ids[data_object_level.first_rows[selected_data_objects]]
+        order = np.argsort(batch_ids, kind="stable")
+        counts = np.bincount(batch_ids, minlength=len(batch_level))
+        counts = counts[counts > 0]
+        self._task_data_objects = selected_data_objects[order]
+        self._task_offsets = np.concatenate(([0], np.cumsum(counts)))
+
+    def _get_task_offsets(self) -> np.ndarray:
+        if self._task_offsets is None:
+            self._compute_tasks()
+        return self._task_offsets
+
+    def __len__(self) -> int:
+        return len(self._get_task_offsets()) - 1
+
+    @property
+    def num_data_objects(self) -> int:
+        return int(self._get_task_offsets()[-1])
+
+    def __iter__(self) -> Iterator[Task]:
+        for task_index in range(len(self)):
+            yield self.get_task(task_index)
+
+    def get_task(self, task_index: int) -> Task:
+        offsets = self._get_task_offsets()
+        data_object_names = self.subset_engine.data_object_index.get_level(self.level).names()
+        data_objects = self._task_data_objects[offsets[task_index]:offsets[task_index + 1]]
+        return Task(self.runnable, tuple(data_object_names[data_objects].tolist()))
+
+    def preview(self, k: int = TASK_PREVIEW_SIZE, seed: int = None) -> list:
+        """A sample of k of the tasks, chosen uniformly at random without creating the other tasks."""
+        num_tasks = len(self)
+        task_indices = np.random.default_rng(seed).choice(num_tasks, size=min(k, num_tasks), replace=False)
+        return [self.get_task(task_index) for task_index in np.sort(task_indices)]
+
+def expand_tasks(dag: DAG) -> Iterator[TaskGroup]:
+    """Lazily expand each runnable in the DAG into its group of tasks, in topological order.
+    Each package's runnables are expanded over the data objects in that package's logsheet."""
+    session = get_dag_session(dag)
+    for node in topological_sort(dag):
+        if isinstance(node, Runnable):
+            yield TaskGroup(node, session.get_subset_engine(node.name.split(".")[0]))
@@ -0,0 +1,120 @@
+import os
+import pickle
+import sqlite3
+import time
+
+import numpy as np
+
+from ..constants import ARTIFACT_STORE_MAX_BYTES, ARTIFACT_INLINE_MAX_BYTES, ARTIFACT_GC_RECENT_RUNS
+
+class ArtifactStore:
+    """A persistent, content-addressed store of runnable outputs, keyed by the output's digest, that survives across runs.
+
+    NumPy arrays are stored as .npy files, which are loaded memory-mapped. Small values are pickled inline in the SQLite index.
+    When the store is larger than `max_bytes`, the least recently used entries are evicted.
+    Entries that are not used by any of the `recent_runs` most recent runs can be garbage collected."""
+
+    def __init__(self, folder: str, max_bytes: int = ARTIFACT_STORE_MAX_BYTES, recent_runs: int = ARTIFACT_GC_RECENT_RUNS):
+        self.folder = folder
+        self.max_bytes = max_bytes
+        self.recent_runs = recent_runs
+        os.makedirs(folder, exist_ok=True)
+        self.connection = sqlite3.connect(os.path.join(folder, "index.sqlite"))
+        with self.connection:
+            self.connection.execute("CREATE TABLE IF NOT EXISTS artifacts (digest TEXT PRIMARY KEY, path TEXT, value BLOB, nbytes INTEGER, last_access REAL)")
+            self.connection.execute("CREATE TABLE IF NOT EXISTS runs (run_id INTEGER, digest TEXT)")
+            self.connection.execute("CREATE INDEX IF NOT EXISTS runs_run_id ON runs (run_id)")
+
+    def close(self) -> None:
+        self.connection.close()
+
+    def __contains__(self, digest: str) -> bool:
+        return self.connection.execute("SELECT 1 FROM artifacts WHERE digest = ?", (digest,)).fetchone() is not None
+
+    def get(self, digest: str):
+        """Load the value with this digest, memory-mapped if it is an array, and mark it as recently used."""
+        row = self.connection.execute("SELECT path, value FROM artifacts WHERE digest = ?", (digest,)).fetchone()
+        if row is None:
+            raise KeyError(f"No artifact with digest {digest}")
+        with self.connection:
+            self.connection.execute("UPDATE artifacts SET last_access = ? WHERE digest = ?", (time.time(), digest))
+        path, value = row
+        if path is not None:
+            return np.load(os.path.join(self.folder, path), mmap_mode="r")
+        return pickle.loads(value)
+
+    def get_file(self, digest: str):
+        """The path and size of the .npy file of the array with this digest, marking it as recently used.
+        None if the value is stored inline rather than in a file."""
+        row = self.connection.execute("SELECT path, nbytes FROM artifacts WHERE digest = ?", (digest,)).fetchone()
+        if row is None:
+            raise KeyError(f"No artifact with digest {digest}")
+        path, nbytes = row
+        if path is None:
+            return None
+        with self.connection:
+            self.connection.execute("UPDATE artifacts SET last_access = ? WHERE digest = ?", (time.time(), digest))
+        return os.path.join(self.folder, path), nbytes
+
+    def put(self, digest: str, value) -> None:
+        if digest in self:
+            return
+        path = None
+        blob = None
+        if isinstance(value, np.ndarray) and value.dtype != object and value.nbytes > ARTIFACT_INLINE_MAX_BYTES:
+            # Shard the files by the first characters of the digest, so that no one folder gets too large
+            path = os.path.join(digest[:2], f"{digest}.npy")
+            os.makedirs(os.path.join(self.folder, digest[:2]), exist_ok=True)
+            tmp_path = os.path.join(self.folder, f"{path}.{os.getpid()}.tmp")
+            with open(tmp_path, "wb") as f:
+                np.save(f, value, allow_pickle=False)
+            os.replace(tmp_path, os.path.join(self.folder, path))
+            nbytes = value.nbytes
+        else:
+            blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+            nbytes = len(blob)
+        with self.connection:
+            self.connection.execute("INSERT OR REPLACE INTO artifacts VALUES (?, ?, ?, ?, ?)", (digest, path, blob, nbytes, time.time()))
+        self.evict()
+
+    @property
+    def total_bytes(self) -> int:
+        return self.connection.execute("SELECT COALESCE(SUM(nbytes), 0) FROM artifacts").fetchone()[0]
+
+    def evict(self) -> list:
+        """Remove the least recently used entries until the store is no larger than max_bytes. Returns the evicted digests."""
+        excess_bytes = self.total_bytes - self.max_bytes
+        evicted = []
+        if excess_bytes <= 0:
+            return evicted
+        for digest, nbytes in self.connection.execute("SELECT digest, nbytes FROM artifacts ORDER BY last_access").fetchall():
+            if excess_bytes <= 0:
+                break
+            evicted.append(digest)
+            excess_bytes -= nbytes
+        self.remove(evicted)
+        return evicted
+
+    def remove(self, digests: list) -> None:
+        for digest in digests:
+            row = self.connection.execute("SELECT path FROM artifacts WHERE digest = ?", (digest,)).fetchone()
+            if row is not None and row[0] is not None and os.path.exists(os.path.join(self.folder, row[0])):
+                os.remove(os.path.join(self.folder, row[0]))
+        with self.connection:
+            self.connection.executemany("DELETE FROM artifacts WHERE digest = ?", [(digest,) for digest in digests])
+
+    def record_run(self, digests) -> None:
+        """Record the digests of the outputs of a run's DAG, so that they are kept by garbage collection."""
+        run_id = self.connection.execute("SELECT COALESCE(MAX(run_id), 0) + 1 FROM runs").fetchone()[0]
+        with self.connection:
+            self.connection.executemany("INSERT INTO runs VALUES (?, ?)", [(run_id, digest) for digest in digests])
+            self.connection.execute("DELETE FROM runs WHERE run_id <= ?", (run_id - self.recent_runs,))
+
+    def collect_garbage(self) -> list:
+        """Remove the entries that are not reachable from the DAGs of the recent runs. Returns the removed digests."""
+        unreachable = [row[0] for row in self.connection.execute("SELECT digest FROM artifacts WHERE digest NOT IN (SELECT digest FROM runs)").fetchall()]
+        self.remove(unreachable)
+        return unreachable
+
+def get_artifact_folder() -> str:
+    return os.path.join(os.getcwd(), ".dagpiler", "artifacts")
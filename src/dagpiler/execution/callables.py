@@ -0,0 +1,32 @@
+from typing import Callable
+
+from ..nodes.runnables.exec_target import parse_exec, import_exec
+
+# The callables imported by this process, by (module name, qualified name)
+_CALLABLES = {}
+
+def get_callable(exec_target: tuple) -> Callable:
+    """Get the callable for a runnable's (module name, qualified name), importing it only the first time in each process."""
+    try:
+        return _CALLABLES[exec_target]
+    except KeyError:
+        _CALLABLES[exec_target] = import_exec(*exec_target)
+        return _CALLABLES[exec_target]
+
+def clear_callables() -> None:
+    """Forget the imported callables, e.g. after their modules have been reloaded."""
+    _CALLABLES.clear()
+
+def get_exec_target(runnable) -> tuple:
+    """The (module name, qualified name) resolved when the DAG was compiled, or parsed from the exec attribute."""
+    exec_target = getattr(runnable, "exec_target", None)
+    return exec_target if exec_target is not None else parse_exec(runnable.exec)
+
+def prewarm_callables(exec_targets: list) -> None:
+    """Import the modules of these callables, e.g. when a worker process starts, so that dispatching each task is a dict lookup.
+    Callables that cannot be imported are skipped here, so their error is raised by the task that needs them."""
+    for exec_target in exec_targets:
+        try:
+            get_callable(exec_target)
+        except ValueError:
+            pass
@@ -0,0 +1,82 @@
+from base_dag import DAG
+
+from ..dag.indexed_dag import get_nodes_of_type
+from ..nodes.runnables.runnables import Runnable
+from ..nodes.variables.variables import OutputVariable
+
+def get_predecessors(dag: DAG) -> dict:
+    """Map each node to its predecessors, in one pass over the edges rather than one pass per node."""
+    predecessors = {node: [] for node in dag.nodes}
+    for node in dag.nodes:
+        for successor in dag.successors(node):
+            predecessors[successor].append(node)
+    return predecessors
+
+def get_source_output_variable(predecessors: dict, input_variable) -> OutputVariable:
+    """Get the output variable that an input variable reads from, through any intermediate variables (e.g. dynamic variables).
+    Returns None if the input variable does not read from an output variable (e.g. a hard-coded variable)."""
+    variable = input_variable
+    while not isinstance(variable, OutputVariable):
+        if not predecessors.get(variable):
+            return None
+        variable = predecessors[variable][0]
+    return variable
+
+def get_consumers(dag: DAG) -> dict:
+    """Map each output variable to the runnables that consume it, following its out-edges through any intermediate variables."""
+    consumers = {}
+    for node in get_nodes_of_type(dag, OutputVariable):
+        consumers[node] = set()
+        queue = list(dag.successors(node))
+        visited = set()
+        while queue:
+            successor = queue.pop()
+            if successor in visited:
+                continue
+            visited.add(successor)
+            if isinstance(successor, Runnable):
+                consumers[node].add(successor)
+            elif not isinstance(successor, OutputVariable):
+                queue.extend(dag.successors(successor))
+    return consumers
+
+def get_consumed_outputs(predecessors: dict, runnable: Runnable) -> dict:
+    """Map each of the runnable's input names to the output variable that it reads from, for the inputs that read from an output."""
+    consumed_outputs = {}
+    for input_name, input_variable in getattr(runnable, "inputs", {}).items():
+        output_variable = get_source_output_variable(predecessors, input_variable)
+        if output_variable is not None:
+            consumed_outputs[input_name] = output_variable
+    return consumed_outputs
+
+class ReferenceCounter:
+    """Counts the consumers of each output variable that have not yet run, so that each output can be released after its last consumer.
+    Outputs without any consumers are the results of the DAG, so they are never released."""
+
+    def __init__(self, dag: DAG):
+        self.consumers = get_consumers(dag)
+        self.remaining = {output_variable: len(runnables) for output_variable, runnables in self.consumers.items()}
+
+    def consume(self, runnable: Runnable, output_variables) -> list:
+        """Record that the runnable has finished consuming the output variables, returning those that have no consumers left."""
+        released = []
+        for output_variable in set(output_variables):
+            if runnable not in self.consumers.get(output_variable, ()):
+                continue
+            self.remaining[output_variable] -= 1
+            if self.remaining[output_variable] == 0:
+                released.append(output_variable)
+        return released
+
+def get_runnable_dependencies(runnables: list, consumed_outputs: dict) -> tuple:
+    """The runnable projection of the DAG: for each runnable, the runnables producing its inputs, and the runnables consuming its outputs.
+    Returns (runnable -> set of dependencies, runnable -> set of dependents)."""
+    producers = {output_variable: runnable for runnable in runnables for output_variable in getattr(runnable, "outputs", {}).values()}
+    dependencies = {runnable: set() for runnable in runnables}
+    dependents = {runnable: set() for runnable in runnables}
+    for runnable in runnables:
+        for output_variable in consumed_outputs[runnable].values():
+            if output_variable in producers:
+                dependencies[runnable].add(producers[output_variable])
+                dependents[producers[output_variable]].add(runnable)
+    return dependencies, dependents
@@ -0,0 +1,80 @@
+import heapq
+
+from base_dag import DAG
+
+from ..dag.organizer import topological_sort
+from ..execution.consumers import get_predecessors, get_consumed_outputs, get_runnable_dependencies
+from ..execution.runtime_history import RuntimeHistory
+from ..nodes.runnables.runnables import Runnable
+
+def get_remaining_path_lengths(runnables: list, dependents: dict, costs: dict) -> dict:
+    """The length of the longest path from each runnable to the end of the DAG, including the runnable itself.
+    `runnables` must be in topological order."""
+    remaining = {}
+    for runnable in reversed(runnables):
+        remaining[runnable] = costs[runnable] + max((remaining[dependent] for dependent in dependents[runnable]), default=0.0)
+    return remaining
+
+def get_critical_path(runnables: list, dependencies: dict, dependents: dict, remaining: dict) -> list:
+    """The longest path through the runnable projection, i.e. the chain of runnables that bounds the makespan however many workers there are."""
+    sources = [runnable for runnable in runnables if not dependencies[runnable]]
+    if not sources:
+        return []
+    path = [max(sources, key=lambda runnable: remaining[runnable])]
+    while dependents[path[-1]]:
+        path.append(max(dependents[path[-1]], key=lambda runnable: remaining[runnable]))
+    return path
+
+def simulate_makespan(runnables: list, dependencies: dict, dependents: dict, costs: dict, remaining: dict, workers: int) -> float:
+    """The expected makespan of running the runnables on this many workers, starting the ready runnable with the longest remaining path first."""
+    if workers < 1:
+        raise ValueError(f"Expected at least one worker, got {workers}")
+    order = {runnable: i for i, runnable in enumerate(runnables)}
+    num_dependencies = {runnable: len(dependencies[runnable]) for runnable in runnables}
+    ready = [(-remaining[runnable], order[runnable], runnable) for runnable in runnables if num_dependencies[runnable] == 0]
+    heapq.heapify(ready)
+    running = [] # (finish time, order, runnable)
+    now = 0.0
+    while ready or running:
+        while ready and len(running) < workers:
+            _, i, runnable = heapq.heappop(ready)
+            heapq.heappush(running, (now + costs[runnable], i, runnable))
+        now, _, runnable = heapq.heappop(running)
+        for dependent in dependents[runnable]:
+            num_dependencies[dependent] -= 1
+            if num_dependencies[dependent] == 0:
+                heapq.heappush(ready, (-remaining[dependent], order[dependent], dependent))
+    return now
+
+class CriticalPathPlan:
+    """The expected runtimes of a DAG's runnables, its critical path, and the expected makespan on a number of workers."""
+
+    def __init__(self, dag: DAG, runtime_history: RuntimeHistory = None):
+        if runtime_history is None:
+            runtime_history = RuntimeHistory()
+        predecessors = get_predecessors(dag)
+        self.runnables = [node for node in topological_sort(dag) if isinstance(node, Runnable)]
+        consumed_outputs = {runnable: get_consumed_outputs(predecessors, runnable) for runnable in self.runnables}
+        self.dependencies, self.dependents = get_runnable_dependencies(self.runnables, consumed_outputs)
+        self.costs = {runnable: runtime_history.estimate(runnable) for runnable in self.runnables}
+        self.remaining = get_remaining_path_lengths(self.runnables, self.dependents, self.costs)
+        self.critical_path = get_critical_path(self.runnables, self.dependencies, self.dependents, self.remaining)
+
+    @property
+    def total_work(self) -> float:
+        return sum(self.costs.values())
+
+    @property
+    def critical_path_length(self) -> float:
+        return sum(self.costs[runnable] for runnable in self.critical_path)
+
+    def makespan(self, workers: int = 1) -> float:
+        return simulate_makespan(self.runnables, self.dependencies, self.dependents, self.costs, self.remaining, workers)
+
+    def report(self, workers: int = 1) -> str:
+        lines = ["Critical path:"]
+        lines.extend(f"    {runnable.name} ({self.costs[runnable]:.2f} s)" for runnable in self.critical_path)
+        lines.append(f"Total work: {self.total_work:.2f} s")
+        lines.append(f"Critical path length: {self.critical_path_length:.2f} s")
+        lines.append(f"Expected makespan on {workers} worker(s): {self.makespan(workers):.2f} s")
+        return "\n".join(lines)
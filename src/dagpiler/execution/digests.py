@@ -0,0 +1,45 @@
+import hashlib
+
+from ..nodes.runnables.runnables import Runnable
+from ..nodes.variables.variables import LoadFromFile
+
+# The attributes of a runnable that determine its outputs, besides its inputs
+RUNNABLE_DIGEST_ATTRIBUTES = ("name", "exec", "level", "batch", "subset")
+
+def hash_string(string_to_hash: str) -> str:
+    return hashlib.sha256(string_to_hash.encode("utf-8")).hexdigest()
+
+def get_input_digest(input_variable, consumed_output, output_digests: dict, data_object: str = None) -> str:
+    """Digest of the value a runnable's input will have: the digest of the upstream output (and any slices of it), or of the input's own value."""
+    if consumed_output is not None:
+        slices = [slice_index.expression for slice_index in getattr(input_variable, "slices", None) or []]
+        return hash_string(repr((output_digests[consumed_output], slices)))
+    if isinstance(input_variable, LoadFromFile):
+        return hash_string(repr(input_variable.value_for_hashing))
+    return hash_string(repr((input_variable.__class__.__name__, input_variable.user_inputted_value, data_object)))
+
+def get_runnable_digest(runnable: Runnable, input_digests: dict, data_object: str = None, attributes: tuple = RUNNABLE_DIGEST_ATTRIBUTES) -> str:
+    """Digest of (runnable attributes, input digests, data object), which identifies the runnable's outputs across runs."""
+    attributes = tuple((attribute, repr(getattr(runnable, attribute, None))) for attribute in attributes)
+    output_names = tuple(getattr(runnable, "outputs", {}).keys())
+    return hash_string(repr((attributes, sorted(input_digests.items()), output_names, data_object)))
+
+def get_output_digest(runnable_digest: str, output_name: str) -> str:
+    return hash_string(repr((runnable_digest, output_name)))
+
+def compute_digests(runnables: list, consumed_outputs: dict, data_object: str = None, attributes: tuple = RUNNABLE_DIGEST_ATTRIBUTES) -> tuple:
+    """Compute the digest of each runnable and each of its outputs, from the runnables in topological order.
+    The digests of folded (constant) runnables do not depend on the data object.
+    Returns (runnable -> digest, output variable -> digest)."""
+    runnable_digests = {}
+    output_digests = {}
+    for runnable in runnables:
+        runnable_data_object = None if getattr(runnable, "folded", False) else data_object
+        input_digests = {
+            input_name: get_input_digest(input_variable, consumed_outputs[runnable].get(input_name), output_digests, runnable_data_object)
+            for input_name, input_variable in getattr(runnable, "inputs", {}).items()
+        }
+        runnable_digests[runnable] = get_runnable_digest(runnable, input_digests, runnable_data_object, attributes)
+        for output_name, output_variable in getattr(runnable, "outputs", {}).items():
+            output_digests[output_variable] = get_output_digest(runnable_digests[runnable], output_name)
+    return runnable_digests, output_digests
@@ -0,0 +1,435 @@
+import heapq
+import os
+import socket
+import threading
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, Future, FIRST_COMPLETED, wait
+
+from base_dag import DAG
+
+from ..constants import QUEUE_LEASE_SECONDS, QUEUE_POLL_SECONDS
+from ..dag.organizer import topological_sort
+from ..execution.artifact_store import ArtifactStore
+from ..execution.callables import get_callable, get_exec_target, prewarm_callables
+from ..execution.digests import compute_digests
+from ..execution.journal import RunJournal
+from ..execution.consumers import ReferenceCounter, get_predecessors, get_consumed_outputs, get_runnable_dependencies
+from ..execution.critical_path import get_remaining_path_lengths
+from ..execution.memory import MemoryReport
+from ..execution.output_store import OutputStore, OUTPUT_STORE_FACTORY
+from ..execution.runtime_history import RuntimeHistory
+from ..execution.shared_memory_store import SharedMemoryOutputStore, write_output
+from ..execution.work_queue import WorkQueue
+from ..nodes.runnables.runnables import Runnable
+from ..nodes.variables.slices import apply_slices
+from ..nodes.variables.variables import HardcodedVariable, LoadFromFile, DataObjectName, DataObjectFilePath, UnspecifiedVariable
+
+RELEASE_POLICIES = ("free", "spill", "retain")
+
+class ExecutionResult:
+    """The values of the DAG's result outputs (those without any consumers), and the memory used by the outputs during the run."""
+
+    def __init__(self, outputs: dict, memory_report: MemoryReport, cached_runnables: list = None, resumed_runnables: list = None):
+        self.outputs = outputs # OutputVariable -> value
+        self.memory_report = memory_report
+        self.cached_runnables = cached_runnables or [] # The runnables whose outputs were loaded from the artifact store rather than run
+        self.resumed_runnables = resumed_runnables or [] # The runnables skipped because the previous run completed them
+
+    def get(self, output_name: str):
+        """Get the value of the output with this full name, e.g. "package.runnable.output", or the name of an output merged into it."""
+        for output_variable, value in self.outputs.items():
+            if output_variable.name == output_name or output_name in getattr(output_variable, "aliases", ()):
+                return value
+        raise KeyError(f"Output {output_name} is not one of the results of the DAG")
+
+def get_run_folder() -> str:
+    """The folder that a run's files (e.g. spilled outputs) are written to."""
+    return os.path.join(os.getcwd(), ".dagpiler", "run")
+
+def get_input_value(input_variable, consumed_output, store: OutputStore, data_object: str = None):
+    """Get the value of a runnable's input from the upstream output it reads from, or from the input variable itself."""
+    if consumed_output is not None:
+        return apply_slices(store.get(consumed_output), getattr(input_variable, "slices", None))
+    if isinstance(input_variable, HardcodedVariable):
+        return input_variable.user_inputted_value
+    if isinstance(input_variable, LoadFromFile):
+        return input_variable.value_for_hashing
+    if isinstance(input_variable, (DataObjectName, DataObjectFilePath)):
+        return data_object
+    if isinstance(input_variable, UnspecifiedVariable):
+        raise ValueError(f"Input {input_variable.name} is unspecified, so it has no value")
+    raise ValueError(f"Input {input_variable.name} is not connected to an output variable")
+
+def split_outputs(runnable_name: str, num_outputs: int, result) -> list:
+    """Split the value(s) returned by a runnable's function into one value per output, in the order the outputs are listed."""
+    if num_outputs == 0:
+        return []
+    if num_outputs == 1:
+        return [result]
+    if not isinstance(result, (tuple, list)) or len(result) != num_outputs:
+        raise ValueError(f"Runnable {runnable_name} returned {type(result)}, expected a tuple of its {num_outputs} outputs")
+    return list(result)
+
+def set_output_values(runnable: Runnable, result, store: OutputStore) -> None:
+    """Store the value(s) returned by the runnable's function in its output variables."""
+    output_variables = list(getattr(runnable, "outputs", {}).values())
+    for output_variable, value in zip(output_variables, split_outputs(runnable.name, len(output_variables), result)):
+        store.put(output_variable, value)
+
+class DagExecution:
+    """The state of one run of a DAG: which runnables are left to run, where the outputs are held, and how many consumers each output has left."""
+
+    def __init__(self, dag: DAG, store: OutputStore, data_object: str = None, release: str = "free", artifact_store: ArtifactStore = None, journal: RunJournal = None, resume: bool = False, runtime_history: RuntimeHistory = None):
+        if release not in RELEASE_POLICIES:
+            raise ValueError(f"Expected release to be one of {RELEASE_POLICIES}, got {release}")
+        self.store = store
+        self.data_object = data_object
+        self.release = release
+        self.artifact_store = artifact_store
+        predecessors = get_predecessors(dag)
+        self.reference_counter = ReferenceCounter(dag)
+        self.runnables = [node for node in topological_sort(dag) if isinstance(node, Runnable)]
+        self.consumed_outputs = {runnable: get_consumed_outputs(predecessors, runnable) for runnable in self.runnables}
+        self.runnable_digests, self.output_digests = compute_digests(self.runnables, self.consumed_outputs, data_object)
+        self.dependencies, self.dependents = get_runnable_dependencies(self.runnables, self.consumed_outputs)
+        self.runtime_history = runtime_history
+        self.cached_runnables = []
+        self.journal = journal
+        self.resumed_runnables = []
+        self.resumable_runnables = set()
+        if journal is not None:
+            if resume:
+                self.resumable_runnables = self.get_resumable_runnables(journal.read_completed())
+            else:
+                journal.clear()
+
+    def is_needed(self, output_variable, skipped_runnables: set) -> bool:
+        """Whether the output will be read by a runnable that is not skipped, or is one of the results of the DAG."""
+        consumers = self.reference_counter.consumers[output_variable]
+        return not consumers or any(consumer not in skipped_runnables for consumer in consumers)
+
+    def get_resumable_runnables(self, completed: set) -> set:
+        """The runnables that were completed by the previous run and can be skipped.
+        A completed runnable is rerun if any of its outputs are still needed but are not in the artifact store."""
+        resumable_runnables = set()
+        for runnable in reversed(self.runnables):
+            if (self.runnable_digests[runnable], self.data_object) not in completed:
+                continue
+            needed_outputs = [output_variable for output_variable in getattr(runnable, "outputs", {}).values() if self.is_needed(output_variable, resumable_runnables)]
+            if all(self.artifact_store is not None and self.output_digests[output_variable] in self.artifact_store for output_variable in needed_outputs):
+                resumable_runnables.add(runnable)
+        return resumable_runnables
+
+    def load_resumed_outputs(self, runnable: Runnable) -> None:
+        """Load only the outputs of a completed runnable that runnables left to run (or the results) still need."""
+        for output_variable in getattr(runnable, "outputs", {}).values():
+            if self.is_needed(output_variable, self.resumable_runnables):
+                self.store.put(output_variable, self.artifact_store.get(self.output_digests[output_variable]))
+        self.resumed_runnables.append(runnable)
+
+    def skip(self, runnable: Runnable) -> bool:
+        """Skip running the runnable if it was completed by the previous run, or its outputs are in the artifact store."""
+        if runnable in self.resumable_runnables:
+            self.load_resumed_outputs(runnable)
+            return True
+        return self.load_cached_outputs(runnable)
+
+    def get_inputs(self, runnable: Runnable) -> dict:
+        return {
+            input_name: get_input_value(input_variable, self.consumed_outputs[runnable].get(input_name), self.store, self.data_object)
+            for input_name, input_variable in getattr(runnable, "inputs", {}).items()
+        }
+
+    def load_cached_outputs(self, runnable: Runnable) -> bool:
+        """Load the runnable's outputs from the artifact store (memory-mapped), if they are all there from a previous run."""
+        output_variables = list(getattr(runnable, "outputs", {}).values())
+        if self.artifact_store is None or not output_variables:
+            return False
+        if not all(self.output_digests[output_variable] in self.artifact_store for output_variable in output_variables):
+            return False
+        for output_variable in output_variables:
+            digest = self.output_digests[output_variable]
+            artifact_file = self.artifact_store.get_file(digest) if isinstance(self.store, SharedMemoryOutputStore) else None
+            if artifact_file is not None:
+                # The workers attach to the artifact's file, rather than to a copy of it
+                self.store.put_file(output_variable, *artifact_file)
+            else:
+                self.store.put(output_variable, self.artifact_store.get(digest))
+        self.cached_runnables.append(runnable)
+        return True
+
+    def save_outputs(self, runnable: Runnable) -> None:
+        """Save the runnable's outputs to the artifact store, for the next runs."""
+        if self.artifact_store is None:
+            return
+        for output_variable in getattr(runnable, "outputs", {}).values():
+            self.artifact_store.put(self.output_digests[output_variable], self.store.get(output_variable))
+
+    def finish(self, runnable: Runnable) -> None:
+        """Record that the runnable is complete, and release the outputs that it was the last consumer of."""
+        if self.journal is not None and runnable not in self.resumable_runnables:
+            self.journal.record(self.runnable_digests[runnable], self.data_object)
+        for output_variable in self.reference_counter.consume(runnable, self.consumed_outputs[runnable].values()):
+            if self.release == "free":
+                self.store.release(output_variable)
+            elif self.release == "spill":
+                self.store.spill(output_variable)
+
+    def run_in_process(self) -> None:
+        for runnable in self.runnables:
+            if not self.skip(runnable):
+                inputs = self.get_inputs(runnable)
+                function = get_callable(get_exec_target(runnable))
+                start = time.perf_counter()
+                result = function(**inputs)
+                seconds = time.perf_counter() - start
+                del inputs # So that released outputs are not kept alive by this reference
+                set_output_values(runnable, result, self.store)
+                self.record_history(runnable, seconds)
+                self.save_outputs(runnable)
+            self.finish(runnable)
+
+    def record_history(self, runnable: Runnable, seconds: float) -> None:
+        """Record how long the runnable took and the size of each of its outputs, for planning the next runs."""
+        if self.runtime_history is None:
+            return
+        self.runtime_history.record(runnable, seconds)
+        for output_variable in getattr(runnable, "outputs", {}).values():
+            self.runtime_history.record_output(output_variable, self.store.memory_tracker.nbytes(output_variable))
+
+    def get_priorities(self) -> dict:
+        """The expected length of the longest path from each runnable to the end of the DAG, from the runtime history."""
+        runtime_history = self.runtime_history or RuntimeHistory()
+        costs = {runnable: runtime_history.estimate(runnable) for runnable in self.runnables}
+        return get_remaining_path_lengths(self.runnables, self.dependents, costs)
+
+    def run_in_pool(self, workers: int) -> None:
+        """Run each runnable in a pool of worker processes as soon as the runnables producing its inputs have finished.
+        When more runnables are ready than there are free workers, the one with the longest expected path to the end of the DAG is started first.
+        Outputs are sent between the processes as handles, so each large output is written once however many runnables consume it."""
+        if not isinstance(self.store, SharedMemoryOutputStore):
+            raise ValueError("Running in worker processes requires the shared memory output store")
+        remaining = self.get_priorities()
+        order = {runnable: i for i, runnable in enumerate(self.runnables)}
+        num_dependencies = {runnable: len(self.dependencies[runnable]) for runnable in self.runnables}
+
+        def push_ready(runnables):
+            for runnable in runnables:
+                heapq.heappush(ready, (-remaining[runnable], order[runnable], runnable))
+
+        # Each worker imports the modules of the DAG's runnables when it starts, rather than with its first task
+        exec_targets = {get_exec_target(runnable) for runnable in self.runnables if getattr(runnable, "exec", "")}
+        with ProcessPoolExecutor(max_workers=workers, initializer=prewarm_callables, initargs=(list(exec_targets),)) as executor:
+            futures = {}
+            ready = []
+            push_ready(runnable for runnable in self.runnables if num_dependencies[runnable] == 0)
+            while ready or futures:
+                # Only submit as many runnables as there are workers, so that the pool's queue does not decide the order
+                while ready and len(futures) < workers:
+                    _, _, runnable = heapq.heappop(ready)
+                    if not self.skip(runnable):
+                        futures[self.submit(executor, runnable)] = runnable
+                        continue
+                    self.finish(runnable)
+                    push_ready(self.get_newly_ready(runnable, self.dependents, num_dependencies))
+                if not futures:
+                    continue
+                done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                for future in done:
+                    runnable = futures.pop(future)
+                    handles, seconds = future.result()
+                    for output_variable, handle in zip(getattr(runnable, "outputs", {}).values(), handles):
+                        self.store.put_handle(output_variable, handle)
+                    self.record_history(runnable, seconds)
+                    self.save_outputs(runnable)
+                    self.finish(runnable)
+                    push_ready(self.get_newly_ready(runnable, self.dependents, num_dependencies))
+
+    @staticmethod
+    def get_newly_ready(runnable: Runnable, dependents: dict, num_dependencies: dict) -> list:
+        newly_ready = []
+        for dependent in dependents[runnable]:
+            num_dependencies[dependent] -= 1
+            if num_dependencies[dependent] == 0:
+                newly_ready.append(dependent)
+        return newly_ready
+
+    def run_in_queue(self, queue: WorkQueue, poll_seconds: float = QUEUE_POLL_SECONDS, partitions: dict = None) -> None:
+        """Publish each runnable to the shared work queue as soon as the runnables producing its inputs have finished, for workers on any host to run.
+        The outputs are shared as memory-mapped files in the queue's folder.
+        `partitions` maps each runnable to the partition whose workers should prefer it, so that runnables exchanging large outputs run on the same host."""
+        if not isinstance(self.store, SharedMemoryOutputStore):
+            raise ValueError("Running from a work queue requires the shared memory output store")
+        priorities = self.get_priorities()
+        num_dependencies = {runnable: len(self.dependencies[runnable]) for runnable in self.runnables}
+        published = {} # task id -> runnable
+        partitions = partitions or {}
+
+        def publish(runnables):
+            runnables = list(runnables)
+            while runnables:
+                runnable = runnables.pop()
+                if self.skip(runnable):
+                    self.finish(runnable)
+                    runnables.extend(self.get_newly_ready(runnable, self.dependents, num_dependencies))
+                    continue
+                payload = (runnable.name, get_exec_target(runnable), self.get_worker_inputs(runnable), [output_variable._uuid for output_variable in getattr(runnable, "outputs", {}).values()], self.store.outputs_folder)
+                queue.publish(runnable._uuid, runnable.name, payload, priorities[runnable], partitions.get(runnable))
+                published[runnable._uuid] = runnable
+
+        queue.reset()
+        try:
+            publish(runnable for runnable in self.runnables if num_dependencies[runnable] == 0)
+            while published:
+                completed = queue.collect()
+                if not completed:
+                    time.sleep(poll_seconds)
+                    continue
+                for task_id, worker, result, error in completed:
+                    runnable = published.pop(task_id)
+                    if error is not None:
+                        raise RuntimeError(f"Runnable {runnable.name} failed on worker {worker}:\n{error}")
+                    handles, seconds = result
+                    for output_variable, handle in zip(getattr(runnable, "outputs", {}).values(), handles):
+                        self.store.put_handle(output_variable, handle)
+                    self.record_history(runnable, seconds)
+                    self.save_outputs(runnable)
+                    self.finish(runnable)
+                    publish(self.get_newly_ready(runnable, self.dependents, num_dependencies))
+        except BaseException:
+            queue.cancel()
+            raise
+        finally:
+            queue.finish()
+
+    def get_worker_inputs(self, runnable: Runnable) -> dict:
+        """The runnable's inputs for a worker process: a handle to the upstream output and the slices to apply to it, or the input's value."""
+        inputs = {}
+        for input_name, input_variable in getattr(runnable, "inputs", {}).items():
+            consumed_output = self.consumed_outputs[runnable].get(input_name)
+            if consumed_output is not None:
+                inputs[input_name] = (self.store.get_handle(consumed_output), getattr(input_variable, "slices", None), None)
+            else:
+                inputs[input_name] = (None, None, get_input_value(input_variable, None, self.store, self.data_object))
+        return inputs
+
+    def submit(self, executor: ProcessPoolExecutor, runnable: Runnable) -> Future:
+        inputs = self.get_worker_inputs(runnable)
+        output_keys = [output_variable._uuid for output_variable in getattr(runnable, "outputs", {}).values()]
+        return executor.submit(run_runnable_in_worker, runnable.name, get_exec_target(runnable), inputs, output_keys, self.store.outputs_folder)
+
+    def get_result(self) -> ExecutionResult:
+        results = {
+            output_variable: self.store.get(output_variable)
+            for output_variable, consumers in self.reference_counter.consumers.items()
+            if not consumers and output_variable in self.store
+        }
+        return ExecutionResult(results, self.store.memory_tracker.report(), self.cached_runnables, self.resumed_runnables)
+
+def execute_dag(dag: DAG, data_object: str = None, release: str = "free", store: OutputStore = None, run_folder: str = None, workers: int = None, artifact_store: ArtifactStore = None, journal: RunJournal = None, resume: bool = False, runtime_history: RuntimeHistory = None, queue: WorkQueue = None, partitions: dict = None) -> ExecutionResult:
+    """Run each runnable in the DAG in topological order.
+    Each output is released as soon as the last runnable that consumes it has finished: freed, spilled to the run folder, or retained (to compare).
+    `workers` runs the runnables in a pool of that many worker processes, which share the outputs through memory-mapped files in the run folder.
+    `artifact_store` skips the runnables whose outputs were stored by a previous run with the same attributes, inputs and data object, and stores the outputs of the others.
+    `journal` logs each completed runnable. With `resume`, the runnables completed by the previous run are skipped, loading the outputs still needed from the artifact store.
+    `queue` publishes the runnables to a work queue in a shared folder, for workers on other hosts (started with `run_queue_worker`) to run.
+    `partitions` maps each runnable to a partition (see `Partition`), which the queue's workers of that partition claim first.
+    `runtime_history` records how long each runnable took, and orders the ready runnables in the pool by their longest expected remaining path."""
+    if workers is not None and queue is not None:
+        raise ValueError("Either run in a pool of workers or from a work queue, not both")
+    if partitions is not None and queue is None:
+        raise ValueError("Partitions are only used when running from a work queue")
+    if queue is not None:
+        run_folder = queue.folder
+    elif workers is not None and run_folder is None:
+        run_folder = get_run_folder()
+    if store is None:
+        store = OUTPUT_STORE_FACTORY.create("memory" if workers is None and queue is None else "shared_memory", run_folder=run_folder)
+    execution = DagExecution(dag, store, data_object, release, artifact_store, journal, resume, runtime_history)
+    try:
+        if queue is not None:
+            execution.run_in_queue(queue, partitions=partitions)
+        elif workers is None:
+            execution.run_in_process()
+        else:
+            execution.run_in_pool(workers)
+    finally:
+        if journal is not None:
+            journal.flush()
+        if runtime_history is not None and runtime_history.path is not None:
+            runtime_history.save()
+    if artifact_store is not None:
+        artifact_store.record_run(execution.output_digests.values())
+    return execution.get_result()
+
+def run_runnable_in_worker(runnable_name: str, exec_target: tuple, inputs: dict, output_keys: list, outputs_folder: str) -> tuple:
+    """Run one runnable in a worker process. Each input is either a handle to an upstream output and the slices to apply to it, or the input's value.
+    Returns the handles of the runnable's outputs, rather than the outputs themselves, and how many seconds the function took."""
+    input_values = {}
+    for input_name, (handle, slices, value) in inputs.items():
+        input_values[input_name] = apply_slices(handle.attach(), slices) if handle is not None else value
+    function = get_callable(exec_target)
+    start = time.perf_counter()
+    result = function(**input_values)
+    seconds = time.perf_counter() - start
+    del input_values
+    return [write_output(outputs_folder, key, value) for key, value in zip(output_keys, split_outputs(runnable_name, len(output_keys), result))], seconds
+
+def run_queue_worker(folder: str, worker: str = None, lease_seconds: float = QUEUE_LEASE_SECONDS, poll_seconds: float = QUEUE_POLL_SECONDS, partition: int = None) -> int:
+    """Run tasks from the work queue in the shared folder until the coordinator has finished publishing and no task is left to claim.
+    A worker started between runs (e.g. before `dagpiler run --queue`) waits for the next run to start, rather than exiting because the previous run has finished.
+    A worker with a partition claims the tasks of that partition first.
+    The lease on each task is renewed while it runs. Returns the number of tasks this worker completed."""
+    if worker is None:
+        worker = f"{socket.gethostname()}:{os.getpid()}"
+    queue = WorkQueue(folder)
+    num_completed = 0
+    try:
+        initial_run_id, finished = queue.run_state
+        # The run this worker works for: the current run if it is still going, else the next one to start
+        run_id = None if finished else initial_run_id
+        while True:
+            claimed = queue.claim(worker, lease_seconds, partition)
+            if claimed is None:
+                current_run_id, finished = queue.run_state
+                if run_id is None and current_run_id != initial_run_id:
+                    run_id = current_run_id
+                if run_id is not None and (finished or current_run_id != run_id):
+                    return num_completed
+                time.sleep(poll_seconds)
+                continue
+            if run_id is None:
+                run_id = queue.run_state[0]
+            task_id, attempt, (runnable_name, exec_target, inputs, output_keys, outputs_folder) = claimed
+            stop_renewing = threading.Event()
+            renewer = threading.Thread(target=renew_lease, args=(folder, task_id, attempt, lease_seconds, stop_renewing), daemon=True)
+            renewer.start()
+            try:
+                # Each claim writes its own files, so a worker whose lease expired cannot overwrite the outputs of the task's new claim
+                result = run_runnable_in_worker(runnable_name, exec_target, inputs, [f"{key}_{attempt}" for key in output_keys], outputs_folder)
+                error = None
+            except Exception:
+                result = None
+                error = traceback.format_exc()
+            finally:
+                stop_renewing.set()
+                renewer.join()
+            if queue.complete(task_id, attempt, result, error):
+                num_completed += 1
+            elif result is not None:
+                for handle in result[0]:
+                    if handle.path is not None and os.path.exists(handle.path):
+                        os.remove(handle.path)
+    finally:
+        queue.close()
+
+def renew_lease(folder: str, task_id: str, attempt: int, lease_seconds: float, stop: threading.Event) -> None:
+    """Renew the lease on a task every third of the lease, until the task is done or the claim has expired."""
+    queue = WorkQueue(folder)
+    try:
+        while not stop.wait(lease_seconds / 3):
+            if not queue.renew(task_id, attempt, lease_seconds):
+                return
+    finally:
+        queue.close()
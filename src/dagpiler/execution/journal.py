@@ -0,0 +1,52 @@
+import os
+import time
+
+from ..constants import JOURNAL_BATCH_SIZE, JOURNAL_FLUSH_SECONDS
+
+class RunJournal:
+    """An append-only log of the tasks completed during a run, each keyed by the runnable's digest and the data object.
+    Entries are buffered and appended in batches, so that many small tasks do not each wait on a write to disk."""
+
+    def __init__(self, path: str, batch_size: int = JOURNAL_BATCH_SIZE, flush_seconds: float = JOURNAL_FLUSH_SECONDS):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self._buffer = []
+        self._last_flush = time.monotonic()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+    def read_completed(self) -> set:
+        """The (runnable digest, data object) keys of the completed tasks.
+        A partially written last line (e.g. if the run was killed while writing) is ignored."""
+        completed = set()
+        if not os.path.exists(self.path):
+            return completed
+        with open(self.path, "r") as f:
+            for line in f:
+                if not line.endswith("\n"):
+                    break
+                runnable_digest, _, data_object = line.rstrip("\n").partition("\t")
+                completed.add((runnable_digest, data_object or None))
+        return completed
+
+    def clear(self) -> None:
+        """Start a new run, forgetting the tasks completed by the previous run."""
+        self._buffer = []
+        open(self.path, "w").close()
+
+    def record(self, runnable_digest: str, data_object: str = None) -> None:
+        self._buffer.append(f"{runnable_digest}\t{data_object or ''}\n")
+        if len(self._buffer) >= self.batch_size or time.monotonic() - self._last_flush >= self.flush_seconds:
+            self.flush()
+
+    def flush(self) -> None:
+        if self._buffer:
+            with open(self.path, "a") as f:
+                f.write("".join(self._buffer))
+                f.flush()
+                os.fsync(f.fileno())
+            self._buffer = []
+        self._last_flush = time.monotonic()
+
+def get_journal_path(run_folder: str) -> str:
+    return os.path.join(run_folder, "journal.log")
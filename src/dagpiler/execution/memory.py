@@ -0,0 +1,75 @@
+import sys
+
+import numpy as np
+
+def get_nbytes(value) -> int:
+    """The approximate number of bytes held by an output value."""
+    if isinstance(value, np.ndarray):
+        # A view does not own its buffer, so it adds no memory of its own
+        return value.nbytes if value.base is None else 0
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    if isinstance(value, memoryview):
+        return 0
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(get_nbytes(item) for item in value)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(get_nbytes(item) for item in value.values())
+    return sys.getsizeof(value)
+
+class MemoryTracker:
+    """Tracks the bytes of the output values currently held in memory, and the peak over the run.
+    Also tracks the peak if no output had been released, for comparison."""
+
+    def __init__(self):
+        self.current_bytes = 0
+        self.peak_bytes = 0
+        self.retain_all_bytes = 0
+        self.num_released = 0
+        self._nbytes = {}
+
+    def allocate(self, key, value) -> None:
+        self.allocate_bytes(key, get_nbytes(value))
+
+    def allocate_bytes(self, key, nbytes: int) -> None:
+        self._nbytes[key] = nbytes
+        self.current_bytes += nbytes
+        self.retain_all_bytes += nbytes
+        self.peak_bytes = max(self.peak_bytes, self.current_bytes)
+
+    def nbytes(self, key) -> int:
+        return self._nbytes.get(key, 0)
+
+    def free(self, key) -> None:
+        self.current_bytes -= self._nbytes.pop(key, 0)
+        self.num_released += 1
+
+    def report(self) -> "MemoryReport":
+        return MemoryReport(self.peak_bytes, self.retain_all_bytes, self.num_released)
+
+class MemoryReport:
+    """The peak memory of the output values during a run, versus retaining every output until the end of the run."""
+
+    def __init__(self, peak_bytes: int, retain_all_peak_bytes: int, num_released: int):
+        self.peak_bytes = peak_bytes
+        self.retain_all_peak_bytes = retain_all_peak_bytes
+        self.num_released = num_released
+
+    @property
+    def saved_bytes(self) -> int:
+        return self.retain_all_peak_bytes - self.peak_bytes
+
+    def __str__(self) -> str:
+        saved_percent = 100 * self.saved_bytes / self.retain_all_peak_bytes if self.retain_all_peak_bytes else 0
+        return "\n".join([
+            f"Peak output memory: {format_bytes(self.peak_bytes)}",
+            f"Peak output memory if all outputs were retained: {format_bytes(self.retain_all_peak_bytes)}",
+            f"Saved: {format_bytes(self.saved_bytes)} ({saved_percent:.1f}%) by releasing {self.num_released} outputs after their last consumer",
+        ])
+
+def format_bytes(num_bytes: float) -> str:
+    for unit in ["B", "KB", "MB", "GB"]:
+        if abs(num_bytes) < 1024:
+            return f"{num_bytes:.1f} {unit}"
+        num_bytes /= 1024
+    return f"{num_bytes:.1f} TB"
@@ -0,0 +1,109 @@
+import os
+import pickle
+
+import numpy as np
+
+from ..execution.memory import MemoryTracker
+
+class OutputStore:
+    """Interface for where the values of the output variables are held during a run."""
+
+    def __init__(self, run_folder: str = None):
+        self.run_folder = run_folder
+        self.memory_tracker = MemoryTracker()
+
+    def put(self, output_variable, value) -> None:
+        raise NotImplementedError("Each output store must implement a put method")
+
+    def get(self, output_variable):
+        raise NotImplementedError("Each output store must implement a get method")
+
+    def release(self, output_variable) -> None:
+        """Free the output's value, after its last consumer has run."""
+        raise NotImplementedError("Each output store must implement a release method")
+
+    def spill(self, output_variable) -> None:
+        """Move the output's value out of memory to the run folder, after its last consumer has run."""
+        raise NotImplementedError("Each output store must implement a spill method")
+
+    def __contains__(self, output_variable) -> bool:
+        raise NotImplementedError("Each output store must implement a __contains__ method")
+
+    def get_spill_path(self, output_variable, value) -> str:
+        if self.run_folder is None:
+            raise ValueError("A run folder is required to spill outputs to disk")
+        spill_folder = os.path.join(self.run_folder, "spill")
+        os.makedirs(spill_folder, exist_ok=True)
+        extension = "npy" if isinstance(value, np.ndarray) and value.dtype != object else "pkl"
+        return os.path.join(spill_folder, f"{output_variable._uuid}.{extension}")
+
+class OutputStoreFactory:
+    def __init__(self):
+        self._stores = {}
+
+    def register(self, name: str, store: type):
+        self._stores[name] = store
+
+    def create(self, name: str, **kwargs) -> OutputStore:
+        store = self._stores.get(name)
+        if not store:
+            raise ValueError(f"No output store registered as {name}, expected one of {list(self._stores)}")
+        return store(**kwargs)
+
+OUTPUT_STORE_FACTORY = OutputStoreFactory()
+
+def register_output_store(name: str):
+    def decorator(cls):
+        OUTPUT_STORE_FACTORY.register(name, cls)
+        return cls
+    return decorator
+
+@register_output_store("memory")
+class InMemoryOutputStore(OutputStore):
+    """Holds the output values in this process's memory, spilling them to the run folder if requested."""
+
+    def __init__(self, run_folder: str = None):
+        super().__init__(run_folder)
+        self._values = {}
+        self._spill_paths = {}
+
+    def put(self, output_variable, value) -> None:
+        self._values[output_variable] = value
+        self.memory_tracker.allocate(output_variable, value)
+
+    def get(self, output_variable):
+        if output_variable in self._values:
+            return self._values[output_variable]
+        if output_variable in self._spill_paths:
+            return load_spilled_value(self._spill_paths[output_variable])
+        raise KeyError(f"No value for output {output_variable}, it was not produced or has already been released")
+
+    def release(self, output_variable) -> None:
+        if output_variable in self._values:
+            del self._values[output_variable]
+            self.memory_tracker.free(output_variable)
+
+    def spill(self, output_variable) -> None:
+        if output_variable not in self._values:
+            return
+        value = self._values[output_variable]
+        spill_path = self.get_spill_path(output_variable, value)
+        save_spilled_value(spill_path, value)
+        self._spill_paths[output_variable] = spill_path
+        self.release(output_variable)
+
+    def __contains__(self, output_variable) -> bool:
+        return output_variable in self._values or output_variable in self._spill_paths
+
+def save_spilled_value(path: str, value) -> None:
+    if path.endswith(".npy"):
+        np.save(path, value, allow_pickle=False)
+        return
+    with open(path, "wb") as f:
+        pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+def load_spilled_value(path: str):
+    if path.endswith(".npy"):
+        return np.load(path, mmap_mode="r")
+    with open(path, "rb") as f:
+        return pickle.load(f)
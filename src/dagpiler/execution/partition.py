@@ -0,0 +1,113 @@
+from base_dag import DAG
+
+from ..constants import PARTITION_IMBALANCE
+from ..dag.organizer import topological_sort
+from ..execution.consumers import get_predecessors, get_consumed_outputs
+from ..execution.memory import format_bytes
+from ..execution.runtime_history import RuntimeHistory
+from ..nodes.runnables.runnables import Runnable
+
+def get_edge_weights(runnables: list, consumed_outputs: dict, runtime_history: RuntimeHistory) -> dict:
+    """The expected bytes sent between each pair of runnables, from the historical sizes of the outputs one consumes from the other.
+    Returns {runnable: {neighbour: bytes}}, in both directions."""
+    producers = {output_variable: runnable for runnable in runnables for output_variable in getattr(runnable, "outputs", {}).values()}
+    edge_weights = {runnable: {} for runnable in runnables}
+    for consumer in runnables:
+        for output_variable in set(consumed_outputs[consumer].values()):
+            if output_variable not in producers:
+                continue
+            producer = producers[output_variable]
+            nbytes = runtime_history.estimate_output_bytes(output_variable)
+            edge_weights[producer][consumer] = edge_weights[producer].get(consumer, 0.0) + nbytes
+            edge_weights[consumer][producer] = edge_weights[consumer].get(producer, 0.0) + nbytes
+    return edge_weights
+
+def partition_runnables(runnables: list, edge_weights: dict, costs: dict, num_partitions: int, imbalance: float = PARTITION_IMBALANCE) -> dict:
+    """Split the runnables into partitions that minimize the bytes sent between partitions, while no partition holds more than (1 + imbalance) times an equal share of the cost.
+    Each runnable is placed (in topological order) with the neighbours it exchanges the most bytes with, then runnables are moved between partitions while that reduces the bytes sent.
+    Returns {runnable: partition}."""
+    if num_partitions < 1:
+        raise ValueError(f"Expected at least one partition, got {num_partitions}")
+    capacity = max((1 + imbalance) * sum(costs.values()) / num_partitions, max(costs.values(), default=0.0))
+    loads = [0.0] * num_partitions
+    assignments = {}
+
+    def get_connections(runnable) -> list:
+        connections = [0.0] * num_partitions
+        for neighbour, nbytes in edge_weights[runnable].items():
+            if neighbour in assignments:
+                connections[assignments[neighbour]] += nbytes
+        return connections
+
+    for runnable in runnables:
+        connections = get_connections(runnable)
+        fits = [partition for partition in range(num_partitions) if loads[partition] + costs[runnable] <= capacity]
+        candidates = fits or range(num_partitions)
+        partition = max(candidates, key=lambda partition: (connections[partition], -loads[partition]))
+        assignments[runnable] = partition
+        loads[partition] += costs[runnable]
+
+    moved = True
+    while moved:
+        moved = False
+        for runnable in runnables:
+            current = assignments[runnable]
+            connections = get_connections(runnable)
+            best = max(range(num_partitions), key=lambda partition: connections[partition])
+            if connections[best] > connections[current] and loads[best] + costs[runnable] <= capacity:
+                assignments[runnable] = best
+                loads[current] -= costs[runnable]
+                loads[best] += costs[runnable]
+                moved = True
+    return assignments
+
+class Partition:
+    """A locality-aware partition of a DAG's runnables between workers, and the bytes it saves sending between them."""
+
+    def __init__(self, dag: DAG, num_partitions: int, runtime_history: RuntimeHistory = None, imbalance: float = PARTITION_IMBALANCE):
+        if runtime_history is None:
+            runtime_history = RuntimeHistory()
+        predecessors = get_predecessors(dag)
+        self.num_partitions = num_partitions
+        self.runnables = [node for node in topological_sort(dag) if isinstance(node, Runnable)]
+        consumed_outputs = {runnable: get_consumed_outputs(predecessors, runnable) for runnable in self.runnables}
+        self.edge_weights = get_edge_weights(self.runnables, consumed_outputs, runtime_history)
+        self.costs = {runnable: runtime_history.estimate(runnable) for runnable in self.runnables}
+        self.assignments = partition_runnables(self.runnables, self.edge_weights, self.costs, num_partitions, imbalance)
+
+    @property
+    def loads(self) -> list:
+        loads = [0.0] * self.num_partitions
+        for runnable, partition in self.assignments.items():
+            loads[partition] += self.costs[runnable]
+        return loads
+
+    @property
+    def total_bytes(self) -> float:
+        """The bytes sent between all runnables, counting each pair once."""
+        return sum(sum(neighbours.values()) for neighbours in self.edge_weights.values()) / 2
+
+    @property
+    def cross_bytes(self) -> float:
+        """The bytes sent between runnables in different partitions."""
+        return sum(
+            nbytes for runnable, neighbours in self.edge_weights.items() for neighbour, nbytes in neighbours.items()
+            if self.assignments[runnable] != self.assignments[neighbour]
+        ) / 2
+
+    @property
+    def unaware_cross_bytes(self) -> float:
+        """The expected bytes sent between workers if each runnable ran on any worker, regardless of where its inputs are."""
+        return self.total_bytes * (self.num_partitions - 1) / self.num_partitions
+
+    @property
+    def saved_bytes(self) -> float:
+        return self.unaware_cross_bytes - self.cross_bytes
+
+    def report(self) -> str:
+        lines = [f"Partitions: {self.num_partitions}"]
+        lines.extend(f"    {partition}: {list(self.assignments.values()).count(partition)} runnables, {load:.2f} s" for partition, load in enumerate(self.loads))
+        lines.append(f"Bytes sent between partitions: {format_bytes(self.cross_bytes)}")
+        lines.append(f"Bytes sent between workers without partitioning: {format_bytes(self.unaware_cross_bytes)}")
+        lines.append(f"Saved: {format_bytes(self.saved_bytes)}")
+        return "\n".join(lines)
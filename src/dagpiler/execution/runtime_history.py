@@ -0,0 +1,60 @@
+import json
+import os
+
+from ..constants import DEFAULT_RUNTIME_SECONDS
+from ..nodes.runnables.runnables import Runnable
+
+class RuntimeHistory:
+    """The mean runtime of each runnable, and of the runnables at each level, over previous runs.
+    Used to estimate how long each runnable will take, falling back to its level's mean for runnables that have not run before.
+    Also records the mean size of each output, to estimate how many bytes are sent between the runnables."""
+
+    def __init__(self, path: str = None):
+        self.path = path
+        self.runnables = {} # runnable name -> [count, mean seconds]
+        self.levels = {} # level -> [count, mean seconds]
+        self.outputs = {} # output name -> [count, mean bytes]
+        if path is not None and os.path.exists(path):
+            with open(path, "r") as f:
+                history_dict = json.load(f)
+            self.runnables = history_dict.get("runnables", {})
+            self.levels = history_dict.get("levels", {})
+            self.outputs = history_dict.get("outputs", {})
+
+    def record(self, runnable: Runnable, seconds: float) -> None:
+        update_mean(self.runnables, runnable.name, seconds)
+        level = getattr(runnable, "level", "")
+        if level:
+            update_mean(self.levels, level, seconds)
+
+    def record_output(self, output_variable, nbytes: int) -> None:
+        update_mean(self.outputs, output_variable.name, nbytes)
+
+    def estimate_output_bytes(self, output_variable) -> float:
+        """The expected size of the output, in bytes. Outputs that have not been produced before are assumed to be empty."""
+        if output_variable.name in self.outputs:
+            return self.outputs[output_variable.name][1]
+        return 0.0
+
+    def estimate(self, runnable: Runnable) -> float:
+        """The expected runtime of the runnable, in seconds."""
+        if runnable.name in self.runnables:
+            return self.runnables[runnable.name][1]
+        level = getattr(runnable, "level", "")
+        if level in self.levels:
+            return self.levels[level][1]
+        return DEFAULT_RUNTIME_SECONDS
+
+    def save(self) -> None:
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"runnables": self.runnables, "levels": self.levels, "outputs": self.outputs}, f, indent=4)
+        os.replace(tmp_path, self.path)
+
+def update_mean(means: dict, key: str, value: float) -> None:
+    count, mean = means.get(key, [0, 0.0])
+    means[key] = [count + 1, mean + (value - mean) / (count + 1)]
+
+def get_runtime_history_path() -> str:
+    return os.path.join(os.getcwd(), ".dagpiler", "runtimes.json")
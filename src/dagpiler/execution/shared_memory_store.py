@@ -0,0 +1,94 @@
+import os
+
+import numpy as np
+
+from ..constants import SHARED_OUTPUT_MIN_BYTES
+from ..execution.memory import get_nbytes
+from ..execution.output_store import OutputStore, register_output_store
+
+class OutputHandle:
+    """A picklable reference to an output value, which is sent to worker processes instead of the value itself.
+    Large NumPy arrays are written once to a memory-mapped file, which each consumer attaches to without copying it.
+    Other (small) values are held inline in the handle.
+    A handle that does not own its file (e.g. a file in the artifact store) never deletes it."""
+
+    def __init__(self, path: str = None, nbytes: int = 0, value = None, owned: bool = True):
+        self.path = path
+        self.nbytes = nbytes
+        self.value = value
+        self.owned = owned
+
+    def attach(self):
+        """Get the value: a read-only memory-mapped array, or the inline value."""
+        if self.path is None:
+            return self.value
+        return np.load(self.path, mmap_mode="r")
+
+def write_output(outputs_folder: str, key: str, value) -> OutputHandle:
+    """Write the output value, returning the handle that consumers attach to it by."""
+    if isinstance(value, np.ndarray) and value.dtype != object and value.nbytes >= SHARED_OUTPUT_MIN_BYTES:
+        os.makedirs(outputs_folder, exist_ok=True)
+        path = os.path.join(outputs_folder, f"{key}.npy")
+        np.save(path, value, allow_pickle=False)
+        return OutputHandle(path=path, nbytes=value.nbytes)
+    return OutputHandle(nbytes=get_nbytes(value), value=value)
+
+@register_output_store("shared_memory")
+class SharedMemoryOutputStore(OutputStore):
+    """Holds the output values as memory-mapped files under the run folder, so that worker processes share them rather than pickling them.
+    Each file is deleted once the output's last consumer has run."""
+
+    def __init__(self, run_folder: str = None):
+        if run_folder is None:
+            raise ValueError("A run folder is required for the shared memory output store")
+        super().__init__(run_folder)
+        self.outputs_folder = os.path.join(run_folder, "outputs")
+        self._handles = {}
+
+    def put(self, output_variable, value) -> None:
+        self.put_handle(output_variable, write_output(self.outputs_folder, output_variable._uuid, value))
+
+    def put_file(self, output_variable, path: str, nbytes: int) -> None:
+        """Store an output that is already a .npy file kept by someone else (e.g. the artifact store), without copying it.
+        The file is hard linked into the outputs folder, so it stays in place even if its owner removes it.
+        Where it cannot be linked (e.g. it is on another file system), the handle points at the file itself, and does not own it."""
+        os.makedirs(self.outputs_folder, exist_ok=True)
+        link_path = os.path.join(self.outputs_folder, f"{output_variable._uuid}.npy")
+        try:
+            if os.path.exists(link_path):
+                os.remove(link_path)
+            os.link(path, link_path)
+            handle = OutputHandle(path=link_path, nbytes=nbytes)
+        except OSError:
+            handle = OutputHandle(path=path, nbytes=nbytes, owned=False)
+        self.put_handle(output_variable, handle)
+
+    def put_handle(self, output_variable, handle: OutputHandle) -> None:
+        """Store the handle of an output that was written by a worker process."""
+        self._handles[output_variable] = handle
+        self.memory_tracker.allocate_bytes(output_variable, handle.nbytes)
+
+    def get_handle(self, output_variable) -> OutputHandle:
+        if output_variable not in self._handles:
+            raise KeyError(f"No value for output {output_variable}, it was not produced or has already been released")
+        return self._handles[output_variable]
+
+    def get(self, output_variable):
+        return self.get_handle(output_variable).attach()
+
+    def release(self, output_variable) -> None:
+        handle = self._handles.pop(output_variable, None)
+        if handle is None:
+            return
+        self.memory_tracker.free(output_variable)
+        if handle.path is not None and handle.owned and os.path.exists(handle.path):
+            # Consumers that still have the file mapped keep their view of it until they unmap it
+            os.remove(handle.path)
+
+    def spill(self, output_variable) -> None:
+        """The large values are already on disk, so spilling only stops counting them as held in memory."""
+        if output_variable in self._handles:
+            self.memory_tracker.free(output_variable)
+
+    def __contains__(self, output_variable) -> bool:
+        return output_variable in self._handles
@@ -0,0 +1,116 @@
+import contextlib
+import os
+import pickle
+import sqlite3
+import time
+
+from ..constants import QUEUE_LEASE_SECONDS
+
+class WorkQueue:
+    """A queue of tasks in a SQLite database on a folder shared between hosts (e.g. an NFS mount), so that workers on any host can run a DAG's runnables.
+
+    The coordinator publishes each runnable once its inputs are available. Workers claim the ready task with the highest priority, holding a lease on it that they renew while it runs.
+    A task may have a partition: a worker of that partition claims it before any other task, but idle workers of other partitions still take it.
+    A task whose lease has expired (e.g. its worker died) is claimed again by the next idle worker.
+    Each run is numbered, so that a worker started before a run does not mistake the previous run's end for the end of its own.
+    Each claim is numbered, so a result published under an expired claim is rejected rather than overwriting the new claim's result."""
+
+    def __init__(self, folder: str, timeout: float = 30.0):
+        self.folder = folder
+        os.makedirs(folder, exist_ok=True)
+        # Transactions are started explicitly, so that a claim locks the database from its read to its write
+        self.connection = sqlite3.connect(os.path.join(folder, "queue.sqlite"), timeout=timeout, isolation_level=None)
+        with self.transaction():
+            self.connection.execute("CREATE TABLE IF NOT EXISTS tasks (task_id TEXT PRIMARY KEY, runnable_name TEXT, payload BLOB, priority REAL, partition INTEGER, state TEXT, worker TEXT, attempt INTEGER, lease_expires REAL, result BLOB, error TEXT)")
+            self.connection.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+            # A queue created before tasks had partitions is upgraded in place
+            columns = [row[1] for row in self.connection.execute("PRAGMA table_info(tasks)")]
+            if "partition" not in columns:
+                self.connection.execute("ALTER TABLE tasks ADD COLUMN partition INTEGER")
+
+    @property
+    def outputs_folder(self) -> str:
+        return os.path.join(self.folder, "outputs")
+
+    @contextlib.contextmanager
+    def transaction(self):
+        self.connection.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        except BaseException:
+            self.connection.execute("ROLLBACK")
+            raise
+        self.connection.execute("COMMIT")
+
+    def close(self) -> None:
+        self.connection.close()
+
+    def reset(self) -> None:
+        """Start a new run with the next run id, removing the previous run's tasks."""
+        with self.transaction():
+            run_id, _ = self.run_state
+            self.connection.execute("DELETE FROM tasks")
+            self.connection.execute("INSERT OR REPLACE INTO meta VALUES ('run_id', ?)", (str(run_id + 1),))
+            self.connection.execute("INSERT OR REPLACE INTO meta VALUES ('finished', '0')")
+
+    def cancel(self) -> None:
+        """Cancel the tasks that have not completed, so that no worker claims them (or publishes their results) after the run has failed."""
+        with self.transaction():
+            self.connection.execute("UPDATE tasks SET state = 'cancelled', payload = NULL WHERE state IN ('ready', 'claimed')")
+
+    def finish(self) -> None:
+        """Tell the workers that no more tasks will be published, so they can exit once the queue is empty."""
+        with self.transaction():
+            self.connection.execute("INSERT OR REPLACE INTO meta VALUES ('finished', '1')")
+
+    @property
+    def is_finished(self) -> bool:
+        return self.run_state[1]
+
+    @property
+    def run_state(self) -> tuple:
+        """(the id of the latest run, whether it has finished). Before the first run, the id is 0 and the run counts as finished."""
+        meta = dict(self.connection.execute("SELECT key, value FROM meta WHERE key IN ('run_id', 'finished')").fetchall())
+        run_id = int(meta.get("run_id", 0))
+        return run_id, run_id == 0 or meta.get("finished") == "1"
+
+    def publish(self, task_id: str, runnable_name: str, payload: tuple, priority: float = 0.0, partition: int = None) -> None:
+        with self.transaction():
+            self.connection.execute("INSERT OR REPLACE INTO tasks (task_id, runnable_name, payload, priority, partition, state, attempt) VALUES (?, ?, ?, ?, ?, 'ready', 0)", (task_id, runnable_name, pickle.dumps(payload, protocol=pickle.HIGHEST_PROTOCOL), priority, partition))
+
+    def claim(self, worker: str, lease_seconds: float = QUEUE_LEASE_SECONDS, partition: int = None):
+        """Claim the ready task with the highest priority, or a task whose lease has expired, preferring the tasks in the worker's partition.
+        Returns (task_id, attempt, payload), or None if there is no task to claim."""
+        now = time.time()
+        with self.transaction():
+            row = self.connection.execute(
+                "SELECT task_id, attempt, payload FROM tasks WHERE state = 'ready' OR (state = 'claimed' AND lease_expires < ?) ORDER BY partition IS ? DESC, priority DESC LIMIT 1", (now, partition)
+            ).fetchone()
+            if row is None:
+                return None
+            task_id, attempt, payload = row
+            self.connection.execute("UPDATE tasks SET state = 'claimed', worker = ?, attempt = ?, lease_expires = ? WHERE task_id = ?", (worker, attempt + 1, now + lease_seconds, task_id))
+        return task_id, attempt + 1, pickle.loads(payload)
+
+    def renew(self, task_id: str, attempt: int, lease_seconds: float = QUEUE_LEASE_SECONDS) -> bool:
+        """Extend the lease on a claimed task. Returns False if the claim has expired and the task was claimed again."""
+        with self.transaction():
+            cursor = self.connection.execute("UPDATE tasks SET lease_expires = ? WHERE task_id = ? AND attempt = ? AND state = 'claimed'", (time.time() + lease_seconds, task_id, attempt))
+        return cursor.rowcount == 1
+
+    def complete(self, task_id: str, attempt: int, result=None, error: str = None) -> bool:
+        """Publish the result (or the error) of a claimed task. Returns False if the claim has expired, in which case the result is discarded."""
+        state = "failed" if error is not None else "done"
+        with self.transaction():
+            cursor = self.connection.execute(
+                "UPDATE tasks SET state = ?, result = ?, error = ? WHERE task_id = ? AND attempt = ? AND state = 'claimed'",
+                (state, pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL), error, task_id, attempt)
+            )
+        return cursor.rowcount == 1
+
+    def collect(self) -> list:
+        """The completed tasks that the coordinator has not collected yet, as (task_id, worker, result, error)."""
+        with self.transaction():
+            rows = self.connection.execute("SELECT task_id, worker, result, error FROM tasks WHERE state IN ('done', 'failed')").fetchall()
+            self.connection.executemany("UPDATE tasks SET state = 'collected', payload = NULL, result = NULL WHERE task_id = ?", [(row[0],) for row in rows])
+        return [(task_id, worker, pickle.loads(result), error) for task_id, worker, result, error in rows]
@@ -10,13 +10,20 @@ class IndexParser():
         bridges = self.index_dict.get("bridges", [])
         if not isinstance(bridges, list):
             raise ValueError(f"Expected list, got {type(bridges)}")
-        package_folder = os.environ.get("PACKAGE_FOLDER")
-        for b in bridges:
-            full_bridge_path = os.path.join(package_folder, b)
-            if not os.path.exists(full_bridge_path):
-                raise FileNotFoundError(f"Bridge {b} not found")
+        # The existence of the bridges files is checked when they are read.
         self.index_dict.pop("bridges", None)
         return bridges
+
+    def get_and_remove_package_settings(self) -> str:
+        """Return the path to the package settings file (if any) and remove that key from the index dictionary so that it is not read as runnables."""
+        package_settings = self.index_dict.pop("package_settings", None)
+        if isinstance(package_settings, list):
+            if len(package_settings) > 1:
+                raise ValueError(f"Expected one package settings file, got {len(package_settings)}")
+            package_settings = package_settings[0] if package_settings else None
+        if package_settings is not None and not isinstance(package_settings, str):
+            raise ValueError(f"Expected str, got {type(package_settings)}")
+        return package_settings
     
     def _flatten_index(self) -> dict:
         """Flatten the index dictionary."""
@@ -0,0 +1,112 @@
+import os
+
+import numpy as np
+
+from ..logsheet.logsheet_reader import LogsheetSettings, read_logsheet_columns
+
+class DataObjectLevel:
+    """The data objects at one level of the logsheet.
+    Each data object is identified by the values of the identifying columns of its level and all of the levels above it."""
+
+    def __init__(self, level: str, keys: dict, row_object_ids: np.ndarray, first_rows: np.ndarray):
+        self.level = level
+        self.keys = keys # level -> array of the identifying values of each data object, for this level and the levels above it
+        self.row_object_ids = row_object_ids # For each logsheet row, the index of the data object it belongs to
+        self.first_rows = first_rows # For each data object, the index of its first logsheet row
+        self._names = {}
+
+    def __len__(self) -> int:
+        return len(self.keys[self.level])
+
+    def names(self, separator: str = "/") -> np.ndarray:
+        """The full name of each data object, e.g. "Subject1/Condition1/Trial1"."""
+        if separator not in self._names:
+            names = None
+            for values in self.keys.values():
+                values = values.astype(np.str_)
+                names = values if names is None else np.char.add(np.char.add(names, separator), values)
+            self._names[separator] = names
+        return self._names[separator]
+
+class DataObjectIndex:
+    """A typed, NumPy-backed columnar index of the logsheet, from which the data objects at each level are computed without looping over the rows."""
+
+    def __init__(self, columns: dict, level_columns: dict):
+        self.columns = columns # header name -> array with one value per logsheet row
+        self.level_columns = level_columns # level -> header name of the column that names the data objects at that level, from the top level down
+        self.levels = list(level_columns.keys())
+        self._data_object_levels = {}
+
+    @property
+    def num_rows(self) -> int:
+        if not self.columns:
+            return 0
+        return len(next(iter(self.columns.values())))
+
+    def get_level(self, level: str) -> DataObjectLevel:
+        """Get the data objects at the level, computing them once with vectorized operations."""
+        if level not in self._data_object_levels:
+            self._data_object_levels[level] = self._compute_level(level)
+        return self._data_object_levels[level]
+
+    def _compute_level(self, level: str) -> DataObjectLevel:
+        if level not in self.level_columns:
+            raise ValueError(f"Level {level} not found in the logsheet levels {self.levels}")
+        key_levels = self.levels[:self.levels.index(level) + 1]
+        # Factorize each identifying column, then combine the codes into one integer per row.
+        codes = []
+        uniques = []
+        for key_level in key_levels:
+            column_uniques, column_codes = np.unique(self.columns[self.level_columns[key_level]], return_inverse=True)
+            uniques.append(column_uniques)
+            codes.append(column_codes.ravel())
+        combined_codes = np.ravel_multi_index(codes, [len(u) for u in uniques]) if codes else np.zeros(self.num_rows, dtype=np.int64)
+        _, first_rows, row_object_ids = np.unique(combined_codes, return_index=True, return_inverse=True)
+        # Keep the data objects in the order they first appear in the logsheet.
+        order = np.argsort(first_rows, kind="stable")
+        rank = np.empty_like(order)
+        rank[order] = np.arange(len(order))
+        first_rows = first_rows[order]
+        keys = {key_level: self.columns[self.level_columns[key_level]][first_rows] for key_level in key_levels}
+        return DataObjectLevel(level, keys, rank[row_object_ids.ravel()], first_rows)
+
+    def save(self, path: str) -> None:
+        arrays = {f"column_{i}": column for i, column in enumerate(self.columns.values())}
+        arrays["column_names"] = np.array(list(self.columns.keys()), dtype=np.str_)
+        arrays["levels"] = np.array(list(self.level_columns.keys()), dtype=np.str_)
+        arrays["level_column_names"] = np.array(list(self.level_columns.values()), dtype=np.str_)
+        with open(path, "wb") as f:
+            np.savez(f, **arrays)
+
+    @classmethod
+    def load(cls, path: str) -> "DataObjectIndex":
+        with np.load(path, allow_pickle=False) as arrays:
+            columns = {str(name): arrays[f"column_{i}"] for i, name in enumerate(arrays["column_names"])}
+            level_columns = dict(zip(arrays["levels"].tolist(), arrays["level_column_names"].tolist()))
+        return cls(columns, level_columns)
+
+def get_logsheet_cache_folder() -> str:
+    return os.path.join(os.getcwd(), ".dagpiler", "cache", "logsheets")
+
+def load_data_object_index(settings: LogsheetSettings, cache_folder: str = None) -> DataObjectIndex:
+    """Get the data object index of the logsheet, from the on-disk cache if the logsheet and its settings are unchanged."""
+    if cache_folder is None:
+        cache_folder = get_logsheet_cache_folder()
+    cache_path = os.path.join(cache_folder, f"{settings.digest()}.npz")
+    if os.path.exists(cache_path):
+        return DataObjectIndex.load(cache_path)
+
+    data_object_index = DataObjectIndex(read_logsheet_columns(settings), settings.level_columns)
+    os.makedirs(cache_folder, exist_ok=True)
+    # Write to a temporary file first so that a partially written cache file is never read.
+    tmp_cache_path = f"{cache_path}.{os.getpid()}.tmp"
+    data_object_index.save(tmp_cache_path)
+    os.replace(tmp_cache_path, cache_path)
+    return data_object_index
+
+def load_package_data_object_index(package_name: str, cache_folder: str = None) -> DataObjectIndex:
+    """Get the data object index of the logsheet in the package's settings."""
+    from ..read_and_compile_dag import LazyPackage
+    lazy_package = LazyPackage(package_name)
+    settings = LogsheetSettings.from_dict(lazy_package.get_package_settings(), lazy_package.package_folder)
+    return load_data_object_index(settings, cache_folder)
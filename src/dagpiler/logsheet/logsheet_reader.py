@@ -0,0 +1,117 @@
+import csv
+import hashlib
+import os
+
+import numpy as np
+
+from ..constants import LOGSHEET_CHUNK_SIZE
+
+BOOL_TRUE_STRINGS = np.array(["true", "t", "yes", "y", "1"])
+
+class LogsheetColumn:
+    """A typed column of the logsheet, and the level of the data objects it describes."""
+
+    def __init__(self, header_name: str, column_name: str, type: str, level: str):
+        if type not in LOGSHEET_COLUMN_PARSERS:
+            raise ValueError(f"Logsheet column {header_name} has type {type}, expected one of {list(LOGSHEET_COLUMN_PARSERS)}")
+        self.header_name = header_name
+        self.column_name = column_name
+        self.type = type
+        self.level = level
+
+class LogsheetSettings:
+    """The `[logsheet]` settings of a package: where the logsheet is, its typed headers, and the columns that identify the data objects at each level."""
+
+    def __init__(self, path: str, num_header_rows: int, columns: dict, level_columns: dict):
+        self.path = path
+        self.num_header_rows = num_header_rows
+        self.columns = columns # header name -> LogsheetColumn
+        self.level_columns = level_columns # level -> header name of the column that names the data objects at that level, from the top level down
+        self.levels = list(level_columns.keys())
+
+    @classmethod
+    def from_dict(cls, package_settings: dict, package_folder: str = None) -> "LogsheetSettings":
+        """Read the settings from a package settings dict containing a `logsheet` table.
+        Headers are either `name = [level, type]` (with `class_column_names` mapping levels to columns),
+        or `name.column_name`, `name.type` & `name.level` (with `dataset_factors` listing the identifying headers)."""
+        logsheet_dict = package_settings.get("logsheet", package_settings)
+        path = logsheet_dict["path"]
+        if package_folder is not None and not os.path.isabs(path):
+            path = os.path.join(package_folder, path)
+
+        columns = {}
+        for header_name, header in logsheet_dict.get("headers", {}).items():
+            if isinstance(header, dict):
+                columns[header_name] = LogsheetColumn(header_name, header.get("column_name", header_name), header["type"], header["level"])
+            else:
+                level, type = header
+                columns[header_name] = LogsheetColumn(header_name, header_name, type, level)
+
+        level_columns = {}
+        if "class_column_names" in logsheet_dict:
+            column_names_to_headers = {column.column_name: header_name for header_name, column in columns.items()}
+            class_column_names = logsheet_dict["class_column_names"]
+            schema = package_settings.get("dataset_schema", list(class_column_names.keys()))
+            for level in schema:
+                if level in class_column_names:
+                    level_columns[level] = column_names_to_headers.get(class_column_names[level], class_column_names[level])
+        for header_name in logsheet_dict.get("dataset_factors", []):
+            level_columns[columns[header_name].level] = header_name
+        for level, header_name in level_columns.items():
+            if header_name not in columns:
+                raise ValueError(f"Logsheet column {header_name} for level {level} is not one of the logsheet headers")
+        return cls(path, logsheet_dict.get("num_header_rows", 1), columns, level_columns)
+
+    def digest(self) -> str:
+        """Hash the logsheet file contents and these settings, to identify a cached index of the logsheet."""
+        sha256_hash = hashlib.sha256()
+        with open(self.path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                sha256_hash.update(block)
+        settings_repr = repr((self.num_header_rows, self.level_columns, [(c.header_name, c.column_name, c.type, c.level) for c in self.columns.values()]))
+        sha256_hash.update(settings_repr.encode("utf-8"))
+        return sha256_hash.hexdigest()
+
+def parse_num_column(values: np.ndarray) -> np.ndarray:
+    values = np.char.strip(values)
+    return np.where(values == "", "nan", values).astype(np.float64)
+
+def parse_str_column(values: np.ndarray) -> np.ndarray:
+    return np.char.strip(values)
+
+def parse_bool_column(values: np.ndarray) -> np.ndarray:
+    return np.isin(np.char.lower(np.char.strip(values)), BOOL_TRUE_STRINGS)
+
+LOGSHEET_COLUMN_PARSERS = {
+    "num": parse_num_column,
+    "str": parse_str_column,
+    "bool": parse_bool_column,
+}
+
+def read_logsheet_columns(settings: LogsheetSettings, chunk_size: int = LOGSHEET_CHUNK_SIZE) -> dict:
+    """Stream the logsheet CSV in chunks of rows, parsing each chunk into typed NumPy arrays, one per header.
+    Only one chunk of raw rows is held in memory at a time."""
+    with open(settings.path, "r", newline="") as f:
+        reader = csv.reader(f)
+        column_names = next(reader)
+        for _ in range(settings.num_header_rows - 1):
+            next(reader)
+        column_indices = {}
+        for header_name, column in settings.columns.items():
+            if column.column_name not in column_names:
+                raise ValueError(f"Column {column.column_name} not found in logsheet {settings.path}")
+            column_indices[header_name] = column_names.index(column.column_name)
+
+        chunks = {header_name: [] for header_name in settings.columns}
+        while True:
+            rows = [row for _, row in zip(range(chunk_size), reader)]
+            if not rows:
+                break
+            # Pad short rows so that every row has every column
+            num_columns = len(column_names)
+            raw_chunk = np.array([row[:num_columns] + [""] * (num_columns - len(row)) for row in rows], dtype=np.str_)
+            for header_name, column in settings.columns.items():
+                parser = LOGSHEET_COLUMN_PARSERS[column.type]
+                chunks[header_name].append(parser(raw_chunk[:, column_indices[header_name]]))
+
+    return {header_name: np.concatenate(header_chunks) if header_chunks else np.array([]) for header_name, header_chunks in chunks.items()}
@@ -0,0 +1,157 @@
+import operator
+from typing import Callable
+
+import numpy as np
+
+from ..logsheet.logsheet_reader import LogsheetSettings
+from ..logsheet.data_object_index import DataObjectIndex, load_data_object_index
+from ..dag.indexed_dag import get_nodes_of_type
+from ..nodes.runnables.runnables import Runnable
+from ..read_and_compile_dag import LazyPackage
+from ..session import get_dag_session
+
+# A subset predicate maps the logsheet's columns to a boolean mask over its rows.
+SubsetPredicate = Callable[[dict], np.ndarray]
+
+def isin(column: np.ndarray, values) -> np.ndarray:
+    return np.isin(column, np.asarray(values))
+
+def notin(column: np.ndarray, values) -> np.ndarray:
+    return ~np.isin(column, np.asarray(values))
+
+def contains(column: np.ndarray, value) -> np.ndarray:
+    return np.char.find(column.astype(np.str_), str(value)) >= 0
+
+SUBSET_OPERATORS = {
+    "==": operator.eq,
+    "!=": operator.ne,
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+    "in": isin,
+    "not in": notin,
+    "contains": contains,
+}
+
+class SubsetCompiler:
+    """Compiles the subset definitions in a package's settings into vectorized predicates over the logsheet's columns.
+
+    A subset is defined by a condition `{header = ..., operator = ..., value = ...}`, a list of definitions (all of which must hold),
+    `{and = [...]}` or `{or = [...]}` of definitions, `{not = definition}`, or the name of another subset (`{subset = name}`).
+    Each definition is a table, so that definitions can be mixed in one (homogeneous) TOML array."""
+
+    def __init__(self, subset_definitions: dict, headers: list):
+        self.subset_definitions = subset_definitions
+        self.headers = headers
+        self._predicates = {}
+
+    def compile(self, subset_name: str, _referencing: tuple = ()) -> SubsetPredicate:
+        if subset_name in _referencing:
+            raise ValueError(f"Subset {subset_name} references itself: {' -> '.join(_referencing + (subset_name,))}")
+        if subset_name not in self._predicates:
+            if subset_name not in self.subset_definitions:
+                raise ValueError(f"Subset {subset_name} not found in the subsets {list(self.subset_definitions)}")
+            self._predicates[subset_name] = self._compile_definition(self.subset_definitions[subset_name], _referencing + (subset_name,))
+        return self._predicates[subset_name]
+
+    def _compile_definition(self, definition, referencing: tuple) -> SubsetPredicate:
+        if isinstance(definition, str):
+            return self.compile(definition, referencing)
+        if isinstance(definition, list):
+            return self._compile_all([self._compile_definition(d, referencing) for d in definition])
+        if not isinstance(definition, dict):
+            raise ValueError(f"Invalid subset definition {definition}")
+        if set(definition.keys()) == {"header", "operator", "value"}:
+            return self._compile_condition(definition["header"], definition["operator"], definition["value"])
+        if len(definition) != 1:
+            raise ValueError(f"Invalid subset definition {definition}")
+        (key, value), = definition.items()
+        if key == "subset":
+            return self.compile(value, referencing)
+        if key == "and":
+            return self._compile_all([self._compile_definition(d, referencing) for d in value])
+        if key == "or":
+            return self._compile_any([self._compile_definition(d, referencing) for d in value])
+        if key == "not":
+            predicate = self._compile_definition(value, referencing)
+            return lambda columns: ~predicate(columns)
+        raise ValueError(f"Expected one of 'subset', 'and', 'or' or 'not' in subset definition, got {key}")
+
+    def _compile_condition(self, header: str, operator_name: str, value) -> SubsetPredicate:
+        if header not in self.headers:
+            raise ValueError(f"Subset condition on {header}, which is not one of the logsheet headers")
+        if operator_name not in SUBSET_OPERATORS:
+            raise ValueError(f"Subset operator {operator_name} is not one of {list(SUBSET_OPERATORS)}")
+        compare = SUBSET_OPERATORS[operator_name]
+        return lambda columns: compare(columns[header], value)
+
+    @staticmethod
+    def _compile_all(predicates: list) -> SubsetPredicate:
+        def predicate(columns: dict) -> np.ndarray:
+            mask = np.ones(len(next(iter(columns.values()))), dtype=bool)
+            for p in predicates:
+                mask &= p(columns)
+            return mask
+        return predicate
+
+    @staticmethod
+    def _compile_any(predicates: list) -> SubsetPredicate:
+        def predicate(columns: dict) -> np.ndarray:
+            mask = np.zeros(len(next(iter(columns.values()))), dtype=bool)
+            for p in predicates:
+                mask |= p(columns)
+            return mask
+        return predicate
+
+class SubsetEngine:
+    """Evaluates each subset once over the data object index, and caches its row and data object masks."""
+
+    def __init__(self, data_object_index: DataObjectIndex, subset_definitions: dict):
+        self.data_object_index = data_object_index
+        self.compiler = SubsetCompiler(subset_definitions, list(data_object_index.columns.keys()))
+        # Compile every definition up front, so that invalid subsets fail the compilation
+        for subset_name in subset_definitions:
+            self.compiler.compile(subset_name)
+        self._row_masks = {}
+        self._data_object_masks = {}
+
+    def get_row_mask(self, subset_name: str) -> np.ndarray:
+        """The logsheet rows in the subset."""
+        if subset_name not in self._row_masks:
+            self._row_masks[subset_name] = self.compiler.compile(subset_name)(self.data_object_index.columns)
+        return self._row_masks[subset_name]
+
+    def get_data_object_mask(self, subset_name: str, level: str) -> np.ndarray:
+        """The data objects at the level that are in the subset, i.e. that have at least one row in the subset.
+        An empty subset name selects every data object."""
+        key = (subset_name, level)
+        if key not in self._data_object_masks:
+            data_object_level = self.data_object_index.get_level(level)
+            mask = np.zeros(len(data_object_level), dtype=bool)
+            if subset_name:
+                mask[data_object_level.row_object_ids[self.get_row_mask(subset_name)]] = True
+            else:
+                mask[:] = True
+            self._data_object_masks[key] = mask
+        return self._data_object_masks[key]
+
+def load_package_subset_engine(package_name: str, cache_folder: str = None) -> SubsetEngine:
+    """Create the subset engine from the logsheet and the subsets in the package's settings."""
+    lazy_package = LazyPackage(package_name)
+    package_settings = lazy_package.get_package_settings()
+    settings = LogsheetSettings.from_dict(package_settings, lazy_package.package_folder)
+    return SubsetEngine(load_data_object_index(settings, cache_folder), package_settings.get("subsets", {}))
+
+def get_runnable_data_object_masks(dag) -> dict:
+    """For each runnable in the DAG with a subset, the mask of the data objects at its level that it runs on.
+    Runnables that reference the same subset at the same level share one mask."""
+    session = get_dag_session(dag)
+    data_object_masks = {}
+    for node in get_nodes_of_type(dag, Runnable):
+        if not getattr(node, "subset", ""):
+            continue
+        subset_engine = session.get_subset_engine(node.name.split(".")[0])
+        level = getattr(node, "level", "") or subset_engine.data_object_index.levels[-1]
+        data_object_masks[node] = subset_engine.get_data_object_mask(node.subset, level)
+    return data_object_masks
@@ -1,11 +1,26 @@
 from abc import abstractmethod
+import sys
 import uuid
 import hashlib
 
+def intern_name(name: str) -> str:
+    """Intern a node's full name and its dot-separated components (package, runnable, variable), which are repeated across many nodes."""
+    if not isinstance(name, str):
+        return name
+    return sys.intern(".".join(sys.intern(part) for part in name.split(".")))
+
+def get_slot_names(cls: type) -> tuple:
+    """The names of the slots declared by the class and its bases."""
+    return tuple(slot for klass in cls.__mro__ for slot in getattr(klass, "__slots__", ()) if slot != "__dict__")
+
 class Node:
+    # The common attributes are slots, to keep each of the many nodes in a large DAG small.
+    # Other attributes (e.g. a runnable's extra attributes) go in the instance __dict__, which is only created once one is set.
+    __slots__ = ("_uuid", "_base", "__dict__")
 
     def __init__(self):
-        self._uuid = str(uuid.uuid4())    
+        self._uuid = str(uuid.uuid4())
+        self._base = None
 
     @classmethod
     def from_dict(cls, runnable_dict: dict):        
@@ -21,11 +36,12 @@ class Node:
     def __repr__(self) -> str:
         return self.__str__()
     
-    def attrs_hash(self):
-        """Hash the attributes of the Process object."""
+    def attrs_hash(self) -> str:
+        """Hash the attributes of the Process object.
+        The full SHA256 digest, as it is the key of the node in caches of unique nodes, which must not collide even in DAGs with hundreds of thousands of nodes."""
         attrs_dict = self.to_dict()
         hashable_repr = str(attrs_dict.items())
-        return self._hash(hashable_repr)
+        return hashlib.sha256(hashable_repr.encode('utf-8')).hexdigest()
     
     def __hash__(self) -> int:
         """Compute a  unique SHA256 hash for the instance from the UUID, which is immutable.
@@ -41,20 +57,46 @@ class Node:
         sha256_hash = hashlib.sha256(string_to_hash.encode('utf-8')).hexdigest()
         return int(sha256_hash, 16) % (10 ** 8)  # Modulo to fit within typical hash size
     
+    def __getattr__(self, name: str):
+        """Attributes that a branch copy does not override are read from the node it was copied from."""
+        base = self._base if name != "_base" else None
+        if base is None:
+            raise AttributeError(f"{self.__class__.__name__} has no attribute {name}")
+        return getattr(base, name)
+
+    def branch_copy(self) -> "Node":
+        """A copy of the node (e.g. for another branch of a furcated DAG) with its own UUID, that shares this node's attribute values rather than copying them.
+        The copy only holds the attributes that are set on it, so the attribute values must not be mutated in place.
+        Any attribute the copy has not set is read from the original, including one set on the original after copying (e.g. `folded`, `aliases` or `exec_target`).
+        So the original must be removed from the DAG once it has been copied, before any such attribute is set, as the callers of `copy_subgraph` do."""
+        base = self._base if self._base is not None else self
+        copied_node = object.__new__(self.__class__)
+        if base is not self:
+            # A copy of a copy shares the original's attributes, along with those overridden by the copy it was made from
+            for slot in get_slot_names(self.__class__):
+                try:
+                    setattr(copied_node, slot, object.__getattribute__(self, slot))
+                except AttributeError:
+                    pass
+            copied_node.__dict__.update(self.__dict__)
+        copied_node._base = base
+        copied_node._uuid = str(uuid.uuid4())
+        return copied_node
+
     def __copy__(self) -> "Node":
         """Copy attributes to a new instance."""
         return self.__class__.from_dict(self.to_dict())
         
     def __eq__(self, other) -> bool:
+        """Nodes are equal only if they are the same node in the DAG, consistent with __hash__.
+        Copies of a node (e.g. in furcated branches) share attributes but are distinct nodes. Use attrs_hash() to compare attributes."""
         if not isinstance(other, Node):
             return False
-        return self.attrs_hash() == other.attrs_hash()
+        return self._uuid == other._uuid
     
     def package_name(self) -> str:
         """Get the package name for the current node."""
-        name = str(self.name)
-        name_split = name.split('.')
-        return name_split[0]
+        return sys.intern(str(self.name).split('.')[0])
     
 class NodeFactory:
     """Decides whether to create a Runnable or Variable based on the dictionary passed in."""
@@ -41,9 +41,9 @@ class ExecValidator(AttributeValidator):
     def validate(self, value):
         if not isinstance(value, str):
             raise ValueError(f"Expected 'exec' to be a str, got {type(value)}")
+        # Only the separator is checked here. The (module, function) form is enforced when the DAG's execs are resolved
         if DELIMITER not in value:
             raise ValueError(f"Expected 'exec' to contain a separator '{DELIMITER}'")
-        split_exec = value.split(sep=DELIMITER)
         return value.strip()
 
 @register_attr_validator("inputs")
@@ -0,0 +1,28 @@
+import importlib
+from typing import Callable
+
+from ...constants import DELIMITER
+
+def parse_exec(exec: str) -> tuple:
+    """Split a runnable's exec attribute, formatted as "module.path::function_name", into (module name, qualified name)."""
+    if exec.count(DELIMITER) != 1:
+        raise ValueError(f"Expected 'exec' to contain exactly one separator '{DELIMITER}', got {exec}")
+    module_name, qualname = (part.strip() for part in exec.split(DELIMITER))
+    for dotted_name in (module_name, qualname):
+        if not all(part.isidentifier() for part in dotted_name.split(".")):
+            raise ValueError(f"Expected 'exec' to be formatted as module.path{DELIMITER}function_name, got {exec}")
+    return module_name, qualname
+
+def import_exec(module_name: str, qualname: str) -> Callable:
+    """Import the callable with this qualified name from its module, raising a ValueError if either does not exist."""
+    try:
+        target = importlib.import_module(module_name)
+    except ImportError as e:
+        raise ValueError(f"Module {module_name} could not be imported: {e}") from e
+    for attr in qualname.split("."):
+        if not hasattr(target, attr):
+            raise ValueError(f"{qualname} does not exist in module {module_name}")
+        target = getattr(target, attr)
+    if not callable(target):
+        raise ValueError(f"{module_name}{DELIMITER}{qualname} is not callable")
+    return target
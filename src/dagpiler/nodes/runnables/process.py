@@ -1,3 +1,6 @@
+import sys
+
+from ...nodes.node import intern_name
 from ...nodes.runnables.runnables import Runnable
 from ...nodes.runnables.runnable_factory import register_runnable
 from ...nodes.runnables.dict_validator import DictValidator
@@ -7,6 +10,7 @@ RUNNABLE_TYPE = "process"
 @register_runnable(RUNNABLE_TYPE)
 class Process(Runnable):
     """A process object that can be run in a DAG."""
+    __slots__ = ("name", "type", "exec", "inputs", "outputs", "level", "batch", "subset")
     
     def __init__(self, 
                  name: str,                  
@@ -31,6 +35,10 @@ class Process(Runnable):
         runnable_dict.update(kwargs)
         dict_validator = DictValidator()
         dict_validator.validate(runnable_dict)
+        # The name, exec and level strings are repeated across many runnables (and branch copies)
+        runnable_dict["name"] = intern_name(name)
+        runnable_dict["exec"] = sys.intern(exec)
+        runnable_dict["level"] = sys.intern(level) if isinstance(level, str) else level
         for key, value in runnable_dict.items():
             setattr(self, key, value)
         super().__init__() # Mandatory
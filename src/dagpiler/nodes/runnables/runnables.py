@@ -3,7 +3,7 @@ from ...nodes.variables.variable_factory import VARIABLE_FACTORY
 
 class Runnable(Node):
     """Interface for runnable objects that can be run in a DAG."""   
-    pass              
+    __slots__ = ()
 
 def initialize_variables(runnable: Runnable):
     """Initialize input and output variables for the runnable."""
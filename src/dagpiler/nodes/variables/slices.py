@@ -0,0 +1,45 @@
+class SliceIndex:
+    """One `[...]` slice expression of a dynamic variable, parsed at compile time into the key that indexes the upstream output.
+    The key only uses basic indexing (integers, slices, `...` and `None`), so indexing a NumPy array returns a view rather than a copy."""
+
+    def __init__(self, expression: str):
+        self.expression = expression
+        self.key = parse_slice_expression(expression)
+
+    def __repr__(self) -> str:
+        return f"SliceIndex([{self.expression}])"
+
+    def apply(self, value):
+        """Index the value without copying it: NumPy arrays return a view, and bytes-like values a memoryview slice."""
+        if isinstance(value, (bytes, bytearray, memoryview)) and not isinstance(self.key, str):
+            return memoryview(value)[self.key]
+        return value[self.key]
+
+def apply_slices(value, slices: list):
+    """Apply each of a dynamic variable's slices, in order, to the upstream output's value."""
+    for slice_index in slices or []:
+        value = slice_index.apply(value)
+    return value
+
+def parse_slice_expression(expression: str):
+    """Parse the contents of one `[...]`, e.g. `0`, `1:10:2`, `..., 0`, or a quoted key `"name"`."""
+    expression = expression.strip()
+    if len(expression) >= 2 and expression[0] == expression[-1] and expression[0] in "'\"":
+        return expression[1:-1]
+    parts = [parse_slice_part(part.strip(), expression) for part in expression.split(",")]
+    return parts[0] if len(parts) == 1 else tuple(parts)
+
+def parse_slice_part(part: str, expression: str):
+    if part == "...":
+        return Ellipsis
+    if part == "None":
+        return None
+    try:
+        if ":" not in part:
+            return int(part)
+        bounds = part.split(":")
+        if len(bounds) > 3:
+            raise ValueError
+        return slice(*[int(bound) if bound.strip() else None for bound in bounds])
+    except ValueError:
+        raise ValueError(f"Invalid slice [{expression}], expected integers, slices (start:stop:step), '...', 'None' or a quoted key")
@@ -4,18 +4,28 @@ if TYPE_CHECKING:
     from ..variables.variables import Variable
 
 from ...constants import VARIABLE_TYPES_KEYS
+from ...session import get_current_session
 
 class VariableFactory:
-    """Factory for creating Variable objects."""
+    """Factory for creating Variable objects.
+    The cache of unique Variable instances belongs to the current CompileSession, so that compilations do not share Variables."""
     
     def __init__(self):
         self.variable_types = {}
-        self.variable_cache = {} # Cache to store unique Variable instances
-        self.use_singleton = True # Use the singleton pattern for Variable objects by default
+
+    @property
+    def variable_cache(self) -> dict:
+        """Cache to store unique Variable instances."""
+        return get_current_session().variable_cache
+
+    @property
+    def use_singleton(self) -> bool:
+        """Whether to use the singleton pattern for Variable objects (by default, True)."""
+        return get_current_session().use_singleton
 
     def toggle_singleton_off(self):
-        """Turn off the singleton pattern for Variable objects."""
-        self.use_singleton = False
+        """Turn off the singleton pattern for Variable objects, for the rest of the current session."""
+        get_current_session().use_singleton = False
     
     def register_variable(self, variable_type: str, variable_class):
         self.variable_types[variable_type] = variable_class
@@ -73,8 +83,7 @@ def get_variable_type(variable_name: str, raw_user_inputted_value: Any = None) -
         else:
             raw_user_inputted_value = raw_user_inputted_value[key]
     elif isinstance(raw_user_inputted_value, list):
-        # TODO: Implement parameter sweep
-        pass
+        variable_type = "sweep" # Each value in the list is one branch of a parameter sweep
     return variable_type
 
 VARIABLE_FACTORY = VariableFactory()
@@ -2,25 +2,25 @@ import re
 import os
 
 from ...config_reader import CONFIG_READER_FACTORY
-from ...nodes.node import Node
+from ...session import get_current_session
+from ...nodes.node import Node, intern_name
 from ...nodes.variables.variable_factory import VARIABLE_FACTORY, register_variable
+from ...nodes.variables.slices import SliceIndex
 
 class Variable(Node):
     """Variable object that can be used as input or output to a Runnable."""
+    __slots__ = ("name", "user_inputted_value", "value_for_hashing", "slices")
     
     def __init__(self, 
                  name: str, 
                  user_inputted_value: str = None,
                  **kwargs):
-        var_dict = {
-            "name": name,
-            "user_inputted_value": user_inputted_value,
-            "value_for_hashing": None,
-            "slices": None            
-        }
         # No validation here because there really isn't any validation to perform. Any value can be a variable.
-        var_dict.update(kwargs)
-        for key, value in var_dict.items():
+        self.name = intern_name(name)
+        self.user_inputted_value = user_inputted_value
+        self.value_for_hashing = None
+        self.slices = None
+        for key, value in kwargs.items():
             setattr(self, key, value)
         super().__init__()
 
@@ -66,6 +66,22 @@ class HardcodedVariable(Variable):
     def set_value_for_hashing(self):
         self.value_for_hashing = self.user_inputted_value
     
+@register_variable("sweep")
+class SweepVariable(Variable):
+    """Variable that is a list of hard-coded values in the TOML file, each of which is one branch of a parameter sweep."""
+
+    def __init__(self, name: str, user_inputted_value: list):
+        super().__init__(name, user_inputted_value)
+        self.set_value_for_hashing()
+
+    def set_value_for_hashing(self):
+        self.value_for_hashing = self.user_inputted_value
+
+    @property
+    def values(self) -> list:
+        """The values that the variable is swept over."""
+        return self.user_inputted_value
+
 @register_variable("load_from_file")
 class LoadFromFile(Variable):
     """Variable that loads its value from a file."""
@@ -75,7 +91,7 @@ class LoadFromFile(Variable):
         self.set_value_for_hashing()
     
     def set_value_for_hashing(self):
-        package_path = os.environ.get("PACKAGE_FOLDER", None)
+        package_path = get_current_session().package_folder
         key = list(self.user_inputted_value.keys())[0]
         full_path = os.path.join(package_path, self.user_inputted_value[key])
         config_reader = CONFIG_READER_FACTORY.get_config_reader(full_path)
@@ -100,7 +116,8 @@ class DynamicVariable(Variable):
     """Variable that is a dynamic reference to an output variable."""
 
     def __init__(self, name: str, user_inputted_value: str):
-        super().__init__(name, user_inputted_value)
+        # The reference is the name of an output variable (and any slices), so it is interned along with the names
+        super().__init__(name, intern_name(user_inputted_value))
         self.set_value_for_hashing()
     
     def set_value_for_hashing(self):
@@ -112,5 +129,6 @@ class DynamicVariable(Variable):
         # Regular expression to find all occurrences of "[...]" at the end of the string
         pattern = r'\[([^\[\]]+)\]'
 
-        # Find all occurrences of the pattern in the string
-        self.slices = re.findall(pattern, self.user_inputted_value)
\ No newline at end of file
+        # Find all occurrences of the pattern in the string, and parse each one once here rather than at every execution.
+        # A tuple, so that the many variables without slices share the empty tuple
+        self.slices = tuple(SliceIndex(expression) for expression in re.findall(pattern, self.user_inputted_value))
\ No newline at end of file
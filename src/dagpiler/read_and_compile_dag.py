@@ -5,15 +5,23 @@ from base_dag import DAG
 
 from .index.index_processor import INDEX_LOADER_FACTORY, IndexProcessor
 from .index.index_parser import IndexParser
-from .config_reader import CONFIG_READER_FACTORY, RUNNABLE_PARSER_FACTORY
+from .config_reader import CONFIG_READER_FACTORY, RUNNABLE_PARSER_FACTORY, read_configs
 from .dag.package_runnables import add_package_runnables_to_dag
 from .bridges.bridges import add_bridges_to_dag
+from .dag.compiled_dag import CompiledDag
+from .dag.indexed_dag import get_nodes_of_type
+from .dag.package_fragment import compile_package_fragments, link_package_fragments
 
 from .nodes.variables.variables import UnspecifiedVariable
+from .nodes.variables.variable_factory import get_variable_type
+from .session import get_current_session
 
 def check_no_unspecified_variables(dag: DAG) -> None:
     """Check that there are no unspecified variables in the DAG."""
-    unspecified_input_variables = [n for n in dag.nodes if n.__class__==UnspecifiedVariable and dag.in_degree(n)>0]
+    unspecified_input_variables = get_nodes_of_type(dag, UnspecifiedVariable, exact=True)
+    if unspecified_input_variables:
+        compiled_dag = CompiledDag(dag)
+        unspecified_input_variables = [n for n in unspecified_input_variables if compiled_dag.in_degree(n)>0]
     if len(unspecified_input_variables) > 0:
         for unspecified_input_variable in unspecified_input_variables:
             print(f"Unspecified input variable found in the DAG: {unspecified_input_variable}")
@@ -26,26 +34,161 @@ def process_package(package_name: str, processed_packages: dict, package_depende
         return    
 
     # Get the index file path for the package
-    index_file_path = get_index_file_path(package_name)
+    session = get_current_session()
+    index_file_path = session.get_index_file_path(package_name)
 
-    os.environ["PACKAGE_FOLDER"] = os.path.dirname(index_file_path)
-    
-    # Read the package's bridges and runnables
-    package_runnables_and_bridges = get_package_runnables_and_bridges(index_file_path)
-    package_bridges_dict = package_runnables_and_bridges["bridges"]
-    package_runnables_dict = package_runnables_and_bridges["runnables"]
+    with session.in_package(os.path.dirname(index_file_path)):
+        # Read the package's bridges and runnables
+        package_runnables_and_bridges = get_package_runnables_and_bridges(index_file_path)
+        package_bridges_dict = package_runnables_and_bridges["bridges"]
+        package_runnables_dict = package_runnables_and_bridges["runnables"]
+
+        # Store the package's data
+        processed_packages[package_name] = {
+            "runnables": package_runnables_dict,
+            "bridges": package_bridges_dict
+        }
+
+        if not package_runnables_dict:
+            print(f"WARNING: No runnables found for package {package_name}")
+
+        add_package_runnables_to_dag(package_name, package_runnables_dict, package_dependency_graph)    
+        add_bridges_to_dag(package_name, package_bridges_dict, package_dependency_graph, processed_packages)
+
+def process_package_targets(package_name: str, targets: list, processed_packages: dict, package_dependency_graph: DAG) -> None:
+    """Process only the runnables (and the packages & bridges) that the target outputs depend on.
+    Starting from the targets, walk backwards through the dynamic inputs and bridges, reading each package's runnables files only until the needed runnables are found."""
+    lazy_packages = {}
+    needed_runnables = {} # package name -> {runnable name: runnable dict}, in the order they were found
+    bridges_by_target = {} # target input variable name -> list of (package name, bridge name, source)
+    queued_runnables = set()
+    queue = []
+
+    def get_lazy_package(name: str) -> LazyPackage:
+        if name not in lazy_packages:
+            lazy_packages[name] = LazyPackage(name)
+            # Bridges from a newly loaded package may provide inputs to runnables that are already needed.
+            for bridge_name, bridge in lazy_packages[name].bridges.items():
+                for target in bridge.get("targets", []):
+                    for source in bridge.get("sources", []):
+                        bridges_by_target.setdefault(target, []).append((name, bridge_name, source))
+                        if ".".join(target.split(".")[0:2]) in queued_runnables:
+                            queue_runnable(source)
+        return lazy_packages[name]
+
+    def queue_runnable(variable_name: str) -> None:
+        """Queue the runnable that outputs the variable, formatted as package.runnable.variable (or package.runnable)"""
+        if not isinstance(variable_name, str) or variable_name.count(".") < 1:
+            return # Not a reference to a runnable, e.g. a hard-coded bridge source
+        runnable_full_name = ".".join(variable_name.split("[")[0].split(".")[0:2])
+        if runnable_full_name not in queued_runnables:
+            queued_runnables.add(runnable_full_name)
+            queue.append(runnable_full_name)
+
+    get_lazy_package(package_name)
+    for target in targets:
+        queue_runnable(target)
+
+    while queue:
+        runnable_full_name = queue.pop(0)
+        runnable_package_name, runnable_name = runnable_full_name.split(".")
+        runnable = get_lazy_package(runnable_package_name).get_runnable(runnable_name)
+        needed_runnables.setdefault(runnable_package_name, {})[runnable_name] = runnable
+        for input_key, input_value in runnable.get("inputs", {}).items():
+            if get_variable_type(input_key, input_value) == "dynamic":
+                queue_runnable(f"{runnable_package_name}.{input_value}")
+            for _, _, source in bridges_by_target.get(f"{runnable_full_name}.{input_key}", []):
+                queue_runnable(source)
+
+    for target in targets:
+        target_split = target.split(".")
+        if len(target_split) > 2:
+            outputs = needed_runnables[target_split[0]][target_split[1]].get("outputs", [])
+            if target_split[2] not in outputs:
+                raise ValueError(f"Target {target} is not an output of runnable {target_split[0]}.{target_split[1]}")
 
-    # Store the package's data
-    processed_packages[package_name] = {
-        "runnables": package_runnables_dict,
-        "bridges": package_bridges_dict
-    }
+    # Add the runnables in the cone to the DAG, followed by the bridges between them.
+    session = get_current_session()
+    for cone_package_name, package_runnables_dict in needed_runnables.items():
+        processed_packages[cone_package_name] = {
+            "runnables": package_runnables_dict,
+            "bridges": {}
+        }
+        with session.in_package(lazy_packages[cone_package_name].package_folder):
+            add_package_runnables_to_dag(cone_package_name, package_runnables_dict, package_dependency_graph)
+    for target, bridge_sources in bridges_by_target.items():
+        if ".".join(target.split(".")[0:2]) not in queued_runnables:
+            continue
+        for bridge_package_name, bridge_name, source in bridge_sources:
+            package_bridges_dict = {bridge_name: {"sources": [source], "targets": [target]}}
+            with session.in_package(lazy_packages[bridge_package_name].package_folder):
+                add_bridges_to_dag(bridge_package_name, package_bridges_dict, package_dependency_graph, processed_packages)
 
-    if not package_runnables_dict:
-        print(f"WARNING: No runnables found for package {package_name}")
+def process_packages_in_parallel(package_name: str, processed_packages: dict, package_dependency_graph: DAG, workers: int = None) -> None:
+    """Process the package and every package bridged to it, compiling each package in a separate worker process and then linking them together."""
+    lazy_packages = discover_packages(package_name)
+    fragments = compile_package_fragments(lazy_packages, workers)
+    link_package_fragments(fragments, lazy_packages, processed_packages, package_dependency_graph)
 
-    add_package_runnables_to_dag(package_name, package_runnables_dict, package_dependency_graph)    
-    add_bridges_to_dag(package_name, package_bridges_dict, package_dependency_graph, processed_packages)
+def discover_packages(package_name: str) -> dict:
+    """Find the package and every package bridged to it (recursively), reading only their index and bridges files."""
+    lazy_packages = {}
+    queue = [package_name]
+    while queue:
+        current_package_name = queue.pop(0)
+        if current_package_name in lazy_packages:
+            continue
+        lazy_packages[current_package_name] = LazyPackage(current_package_name)
+        for bridge in lazy_packages[current_package_name].bridges.values():
+            for bridged_variable_name in bridge.get("sources", []) + bridge.get("targets", []):
+                bridged_package_name = get_package_name_from_runnable(bridged_variable_name)
+                if bridged_package_name is not None and bridged_package_name not in lazy_packages:
+                    queue.append(bridged_package_name)
+    return lazy_packages
+
+class LazyPackage:
+    """A package whose bridges are read up front, but whose runnables files are only read once one of their runnables is needed."""
+
+    def __init__(self, package_name: str):
+        self.package_name = package_name
+        session = get_current_session()
+        self.index_file_path = session.get_index_file_path(package_name)
+        self.package_folder = os.path.dirname(self.index_file_path)
+
+        package_index_dict = IndexProcessor(INDEX_LOADER_FACTORY).process_index(self.index_file_path)
+        index_parser = IndexParser(index_dict=package_index_dict)
+        bridges_file_paths = index_parser.get_and_remove_bridges()
+        package_settings_file_path = index_parser.get_and_remove_package_settings()
+        self.package_settings_file_path = os.path.join(self.package_folder, package_settings_file_path) if package_settings_file_path else None
+        self.unread_runnables_file_paths = index_parser.get_runnables_paths_from_index()
+
+        self.config_reader = CONFIG_READER_FACTORY.get_config_reader(self.index_file_path)
+        self.bridges = {}
+        bridges_full_file_paths = [os.path.join(self.package_folder, bridge_file_path) for bridge_file_path in bridges_file_paths]
+        for package_bridges in read_configs(bridges_full_file_paths, self.config_reader):
+            self.bridges.update(package_bridges)
+        self.runnables = {}
+        self._package_settings = None
+
+    def get_package_settings(self) -> dict:
+        """Get the package's settings dict, reading the package settings file once."""
+        if self._package_settings is None:
+            if self.package_settings_file_path is None:
+                raise ValueError(f"Package {self.package_name} does not have a package_settings file in its index")
+            self._package_settings = self.config_reader.read_config(self.package_settings_file_path)
+        return self._package_settings
+
+    def get_runnable(self, runnable_name: str) -> dict:
+        """Get the runnable's dict, reading the package's runnables files until it is found."""
+        config_parser = RUNNABLE_PARSER_FACTORY.get_runnable_parser(key="name")
+        while runnable_name not in self.runnables and self.unread_runnables_file_paths:
+            runnables_file_path = os.path.join(self.package_folder, self.unread_runnables_file_paths.pop(0))
+            if not os.path.exists(runnables_file_path):
+                raise FileNotFoundError(f"Path {runnables_file_path} not found")
+            self.runnables.update(config_parser.parse_runnable(self.config_reader.read_config(runnables_file_path)))
+        if runnable_name not in self.runnables:
+            raise ValueError(f"Runnable {runnable_name} not found in package {self.package_name}")
+        return self.runnables[runnable_name]
 
 def get_package_name_from_runnable(runnable_full_name: str) -> str:
     """Extract the package name from a runnable's full name."""
@@ -54,10 +197,12 @@ def get_package_name_from_runnable(runnable_full_name: str) -> str:
         return runnable_full_name.split('.')[0]
     return None
 
-def get_python_version_folder():
+def get_python_version_folder(project_folder: str = None):
     """Within the virtual environment."""
+    if project_folder is None:
+        project_folder = os.getcwd()
     # Get the python folder
-    python_version_folders = os.listdir(os.path.join(os.getcwd(), '.venv', 'lib'))
+    python_version_folders = os.listdir(os.path.join(project_folder, '.venv', 'lib'))
     # Remove folders that don't contain "python"
     python_version_folders = [folder for folder in python_version_folders if "python" in folder]
     if not python_version_folders:
@@ -65,11 +210,13 @@ def get_python_version_folder():
     python_version_folder = python_version_folders[0] 
     return python_version_folder
 
-def get_package_folders_in_venv(package_name: str, python_version_folder: str):
+def get_package_folders_in_venv(package_name: str, python_version_folder: str, project_folder: str = None):
     """Should return a list of two folders:
     1. The dist-info folder
     2. The folder containing the source code."""       
-    installed_package_folders = os.listdir(os.path.join(os.getcwd(), '.venv', 'lib', python_version_folder, 'site-packages'))
+    if project_folder is None:
+        project_folder = os.getcwd()
+    installed_package_folders = os.listdir(os.path.join(project_folder, '.venv', 'lib', python_version_folder, 'site-packages'))
     # Get the package folders that contain the project name
     lower_package_name = package_name.lower()
     package_folders = [folder for folder in installed_package_folders if lower_package_name in folder]
@@ -79,8 +226,10 @@ def get_package_folders_in_venv(package_name: str, python_version_folder: str):
     package_folders = [folder for folder in package_folders if folder.startswith(lower_package_name)]    
     return package_folders
 
-def get_package_folder_and_index_path(package_name: str, dist_info_folder_path: str, python_version_folder: str):
+def get_package_folder_and_index_path(package_name: str, dist_info_folder_path: str, python_version_folder: str, project_folder: str = None):
     """Get the package folder path. If editable, points to local folder. If not, points to folder in virtual environment."""
+    if project_folder is None:
+        project_folder = os.getcwd()
     if "direct_url.json" not in os.listdir(dist_info_folder_path):
         ## Non-editable package
         package_folder_path = os.path.join(dist_info_folder_path, package_name)
@@ -95,11 +244,13 @@ def get_package_folder_and_index_path(package_name: str, dist_info_folder_path:
         return (package_folder_path, os.path.join(package_folder_path, "src", package_name, 'index.toml'))
     else:
         # Non-editable package that have a direct_url.json file
-        package_folder_path = os.path.join(os.getcwd(), '.venv', 'lib', python_version_folder, 'site-packages', package_name)
+        package_folder_path = os.path.join(project_folder, '.venv', 'lib', python_version_folder, 'site-packages', package_name)
         return (package_folder_path, os.path.join(package_folder_path, "index.toml"))
     
-def get_dist_info_folder(package_folders: list, package_name: str, python_version_folder: str):
+def get_dist_info_folder(package_folders: list, package_name: str, python_version_folder: str, project_folder: str = None):
     """Given the list of folders in the virtual env that contain the package name, return the dist-info folder."""
+    if project_folder is None:
+        project_folder = os.getcwd()
     # If a folder has "dist-info" in its name, use that one.
     dist_info_folders = [folder for folder in package_folders if "dist-info" in folder]    
 
@@ -108,22 +259,22 @@ def get_dist_info_folder(package_folders: list, package_name: str, python_versio
     # If a dist-info folder is found, use that one
     dist_info_folder = dist_info_folders[0]
 
-    dist_info_folder_path = os.path.join(os.getcwd(), '.venv', 'lib', python_version_folder, 'site-packages', dist_info_folder)
+    dist_info_folder_path = os.path.join(project_folder, '.venv', 'lib', python_version_folder, 'site-packages', dist_info_folder)
     return dist_info_folder_path
 
-def get_index_file_path(package_name: str) -> str:
+def get_index_file_path(package_name: str, project_folder: str = None) -> str:
     """Map a package name to its index file path."""
-    python_version_folder = get_python_version_folder()
-    package_folders = get_package_folders_in_venv(package_name, python_version_folder)
-    dist_info_folder_path = get_dist_info_folder(package_folders, package_name, python_version_folder)
-    package_folder_path, index_path = get_package_folder_and_index_path(package_name, dist_info_folder_path, python_version_folder)
+    python_version_folder = get_python_version_folder(project_folder)
+    package_folders = get_package_folders_in_venv(package_name, python_version_folder, project_folder)
+    dist_info_folder_path = get_dist_info_folder(package_folders, package_name, python_version_folder, project_folder)
+    package_folder_path, index_path = get_package_folder_and_index_path(package_name, dist_info_folder_path, python_version_folder, project_folder)
     return index_path
 
-def get_package_folder_path(package_name: str) -> str:
-    python_version_folder = get_python_version_folder()
-    package_folders = get_package_folders_in_venv(package_name, python_version_folder)
-    dist_info_folder_path = get_dist_info_folder(package_folders, package_name, python_version_folder)
-    package_folder_path, index_path = get_package_folder_and_index_path(package_name, dist_info_folder_path, python_version_folder)
+def get_package_folder_path(package_name: str, project_folder: str = None) -> str:
+    python_version_folder = get_python_version_folder(project_folder)
+    package_folders = get_package_folders_in_venv(package_name, python_version_folder, project_folder)
+    dist_info_folder_path = get_dist_info_folder(package_folders, package_name, python_version_folder, project_folder)
+    package_folder_path, index_path = get_package_folder_and_index_path(package_name, dist_info_folder_path, python_version_folder, project_folder)
     return package_folder_path
 
 def get_package_runnables_and_bridges(index_file_path: str) -> dict:
@@ -140,23 +291,18 @@ def get_package_runnables_and_bridges(index_file_path: str) -> dict:
 
     # Extract the bridges paths and runnable files paths
     bridges_file_paths = index_parser.get_and_remove_bridges()
+    index_parser.get_and_remove_package_settings()
     runnables_file_paths = index_parser.get_runnables_paths_from_index()
 
-    for bridge_file_path in bridges_file_paths:
-        if not os.path.exists(os.path.join(package_root_folder, bridge_file_path)):
-            raise FileNotFoundError(f"Path {bridge_file_path} not found")
-    for runnables_file_path in runnables_file_paths:
-        if not os.path.exists(os.path.join(package_root_folder, runnables_file_path)):
-            raise FileNotFoundError(f"Path {runnables_file_path} not found")
-
-    # Read the package's bridges and runnables files
+    # Read the package's bridges and runnables files, all at once
     config_reader = CONFIG_READER_FACTORY.get_config_reader(index_file_path)
     bridges_full_file_paths = [os.path.join(package_root_folder, bridge) for bridge in bridges_file_paths]
-    package_bridges = [config_reader.read_config(bridge) for bridge in bridges_full_file_paths]
+    runnable_full_file_paths = [os.path.join(package_root_folder, runnable) for runnable in runnables_file_paths]    
+    package_configs = read_configs(bridges_full_file_paths + runnable_full_file_paths, config_reader)
+    package_bridges = package_configs[:len(bridges_full_file_paths)]
 
     config_parser = RUNNABLE_PARSER_FACTORY.get_runnable_parser(key="name")
-    runnable_full_file_paths = [os.path.join(package_root_folder, runnable) for runnable in runnables_file_paths]    
-    package_runnables = [config_parser.parse_runnable(config_reader.read_config(runnable)) for runnable in runnable_full_file_paths]
+    package_runnables = [config_parser.parse_runnable(runnable) for runnable in package_configs[len(bridges_full_file_paths):]]
 
     # Convert the list of dicts to a single dict for bridges and runnables
     package_bridges_dict = {}
@@ -0,0 +1,62 @@
+import contextvars
+from contextlib import contextmanager
+
+class CompileSession:
+    """The state of a single compilation: the package resolver and its cache, the variable interning table, and the current package folder.
+    Each call to compile_dag runs in its own session, so concurrent compilations (e.g. in threads) do not share any mutable state."""
+
+    def __init__(self, project_folder: str = None):
+        self.project_folder = project_folder # The folder containing the .venv that packages are resolved from. Defaults to the current working directory.
+        self.index_file_paths = {} # Cache of package name -> index file path
+        self.variable_cache = {} # Cache to store unique Variable instances
+        self.use_singleton = True # Use the singleton pattern for Variable objects by default
+        self.package_folder = None # The folder of the package currently being processed
+        self.subset_engines = {} # Cache of package name -> SubsetEngine, so that each subset is evaluated once per compile
+        self._tokens = []
+
+    def __enter__(self) -> "CompileSession":
+        self._tokens.append(_CURRENT_SESSION.set(self))
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        _CURRENT_SESSION.reset(self._tokens.pop())
+
+    def get_index_file_path(self, package_name: str) -> str:
+        """Map a package name to its index file path, resolving each package only once per session."""
+        from .read_and_compile_dag import get_index_file_path
+        if package_name not in self.index_file_paths:
+            self.index_file_paths[package_name] = get_index_file_path(package_name, self.project_folder)
+        return self.index_file_paths[package_name]
+
+    def get_subset_engine(self, package_name: str):
+        """Get the subset engine over the package's logsheet, loading it only once per session."""
+        from .logsheet.subsets import load_package_subset_engine
+        if package_name not in self.subset_engines:
+            # Resolve the package within this session, so that its index file path is cached here too
+            with self:
+                self.subset_engines[package_name] = load_package_subset_engine(package_name)
+        return self.subset_engines[package_name]
+
+    @contextmanager
+    def in_package(self, package_folder: str):
+        """Set the package folder (that relative paths are resolved from) for the duration of the context."""
+        previous_package_folder = self.package_folder
+        self.package_folder = package_folder
+        try:
+            yield self
+        finally:
+            self.package_folder = previous_package_folder
+
+_CURRENT_SESSION = contextvars.ContextVar("dagpiler_compile_session", default=None)
+
+def get_current_session() -> CompileSession:
+    """Get the session of the compilation running in the current thread/context.
+    When no session has been entered (e.g. nodes are created outside of compile_dag), a new throwaway session, so that nothing is cached between calls."""
+    session = _CURRENT_SESSION.get()
+    return session if session is not None else CompileSession()
+
+def get_dag_session(dag) -> CompileSession:
+    """Get the session that compiled the DAG, so that the steps run on the compiled DAG (e.g. expanding its tasks) share its caches.
+    The current session if the DAG was not compiled by compile_dag, e.g. it was read from a file."""
+    session = getattr(dag, "session", None)
+    return session if session is not None else get_current_session()
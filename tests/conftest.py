@@ -0,0 +1,56 @@
+import importlib
+import json
+import sys
+
+import pytest
+import toml
+
+from dagpiler.execution.callables import clear_callables
+
+@pytest.fixture
+def make_package(tmp_path, monkeypatch):
+    """Create packages installed in editable mode in a temporary project's .venv, and run the test from the project folder."""
+    site_packages_folder = tmp_path / ".venv" / "lib" / "python3" / "site-packages"
+    site_packages_folder.mkdir(parents=True)
+    monkeypatch.chdir(tmp_path)
+
+    def make(package_name: str, runnables: dict, bridges: dict = None, extra_runnables_files: dict = None, package_settings: dict = None):
+        package_folder = tmp_path / package_name
+        src_folder = package_folder / "src" / package_name
+        src_folder.mkdir(parents=True)
+        index_dict = {"processes": ["processes.toml"]}
+        (src_folder / "processes.toml").write_text(toml.dumps(runnables))
+        for file_name, contents in (extra_runnables_files or {}).items():
+            index_dict["processes"].append(file_name)
+            (src_folder / file_name).write_text(contents)
+        if bridges:
+            index_dict["bridges"] = ["bridges.toml"]
+            (src_folder / "bridges.toml").write_text(toml.dumps(bridges))
+        if package_settings:
+            index_dict["package_settings"] = "package_settings.toml"
+            (src_folder / "package_settings.toml").write_text(toml.dumps(package_settings))
+        (src_folder / "index.toml").write_text(toml.dumps(index_dict))
+
+        dist_info_folder = site_packages_folder / f"{package_name}-0.1.0.dist-info"
+        dist_info_folder.mkdir()
+        direct_url = {"url": f"file://{package_folder}", "dir_info": {"editable": True}}
+        (dist_info_folder / "direct_url.json").write_text(json.dumps(direct_url))
+        return src_folder
+
+    return make
+
+@pytest.fixture
+def make_module(tmp_path, monkeypatch):
+    """Create an importable Python module with the runnables' functions."""
+    modules_folder = tmp_path / "modules"
+    modules_folder.mkdir()
+    monkeypatch.syspath_prepend(str(modules_folder))
+
+    def make(module_name: str, source: str):
+        (modules_folder / f"{module_name}.py").write_text(source)
+        # Import this module rather than one with the same name from another test
+        sys.modules.pop(module_name, None)
+        importlib.invalidate_caches()
+        clear_callables()
+
+    return make
@@ -0,0 +1,142 @@
+import os
+
+import numpy as np
+
+from dagpiler import compile_dag, execute_dag
+from dagpiler.execution.artifact_store import ArtifactStore
+from dagpiler.execution.shared_memory_store import OutputHandle, SharedMemoryOutputStore
+from dagpiler.nodes.variables.variables import OutputVariable
+
+STEPS = '''
+import os
+import numpy as np
+
+CALLS_FILE = os.path.join(os.path.dirname(__file__), "calls.txt")
+
+def record_call(name):
+    with open(CALLS_FILE, "a") as f:
+        f.write(name + "\\n")
+
+def make(size):
+    record_call("make")
+    return np.ones(size)
+
+def double(data):
+    record_call("double")
+    return data * 2
+
+def total(data):
+    record_call("total")
+    return float(data.sum())
+'''
+
+def make_runnables(size: int) -> dict:
+    return {
+        "make": {"type": "process", "exec": "artifact_steps::make", "inputs": {"size": size}, "outputs": ["data"]},
+        "double": {"type": "process", "exec": "artifact_steps::double", "inputs": {"data": "make.data"}, "outputs": ["doubled"]},
+        "total": {"type": "process", "exec": "artifact_steps::total", "inputs": {"data": "double.doubled"}, "outputs": ["total"]},
+    }
+
+def get_calls(tmp_path) -> list:
+    calls_file = tmp_path / "modules" / "calls.txt"
+    calls = calls_file.read_text().split() if calls_file.exists() else []
+    calls_file.write_text("")
+    return calls
+
+def test_small_and_large_values(tmp_path):
+    artifact_store = ArtifactStore(str(tmp_path / "artifacts"))
+    artifact_store.put("a" * 64, {"small": 1})
+    artifact_store.put("b" * 64, np.arange(100000))
+    assert artifact_store.get("a" * 64) == {"small": 1}
+    large_value = artifact_store.get("b" * 64)
+    assert isinstance(large_value, np.memmap)
+    assert (tmp_path / "artifacts" / "bb" / f"{'b' * 64}.npy").exists()
+    assert not (tmp_path / "artifacts" / "aa").exists()
+
+def test_lru_eviction(tmp_path):
+    artifact_store = ArtifactStore(str(tmp_path / "artifacts"), max_bytes=2 * 800000)
+    artifact_store.put("a" * 64, np.zeros(100000))
+    artifact_store.put("b" * 64, np.zeros(100000))
+    artifact_store.get("a" * 64) # a is now more recently used than b
+    artifact_store.put("c" * 64, np.zeros(100000))
+    assert "a" * 64 in artifact_store
+    assert "b" * 64 not in artifact_store
+    assert "c" * 64 in artifact_store
+    assert not (tmp_path / "artifacts" / "bb" / f"{'b' * 64}.npy").exists()
+
+def test_garbage_collection(tmp_path):
+    artifact_store = ArtifactStore(str(tmp_path / "artifacts"), recent_runs=2)
+    for digest in ["a" * 64, "b" * 64, "c" * 64]:
+        artifact_store.put(digest, 1)
+    artifact_store.record_run(["a" * 64])
+    artifact_store.record_run(["b" * 64])
+    assert artifact_store.collect_garbage() == ["c" * 64]
+    artifact_store.record_run(["b" * 64])
+    assert artifact_store.collect_garbage() == ["a" * 64]
+    assert "b" * 64 in artifact_store
+
+def test_unchanged_runnables_are_loaded(make_package, make_module, tmp_path):
+    make_module("artifact_steps", STEPS)
+    make_package("pkg", make_runnables(200000))
+    artifact_store = ArtifactStore(str(tmp_path / "artifacts"))
+    first_result = execute_dag(compile_dag("pkg"), artifact_store=artifact_store)
+    assert get_calls(tmp_path) == ["make", "double", "total"]
+
+    second_result = execute_dag(compile_dag("pkg"), artifact_store=artifact_store)
+    assert get_calls(tmp_path) == []
+    assert len(second_result.cached_runnables) == 3
+    assert second_result.get("pkg.total.total") == first_result.get("pkg.total.total") == 400000.0
+    # Loaded memory-mapped, rather than into memory
+    assert second_result.memory_report.peak_bytes < 1000
+
+def test_changed_inputs_are_rerun(make_package, make_module, tmp_path):
+    make_module("artifact_steps", STEPS)
+    make_package("pkg", make_runnables(10))
+    artifact_store = ArtifactStore(str(tmp_path / "artifacts"))
+    execute_dag(compile_dag("pkg"), artifact_store=artifact_store)
+    get_calls(tmp_path)
+
+    (tmp_path / "pkg" / "src" / "pkg" / "processes.toml").write_text((tmp_path / "pkg" / "src" / "pkg" / "processes.toml").read_text().replace("size = 10", "size = 20"))
+    result = execute_dag(compile_dag("pkg"), artifact_store=artifact_store)
+    assert get_calls(tmp_path) == ["make", "double", "total"]
+    assert result.get("pkg.total.total") == 40.0
+
+def test_cached_outputs_in_pool(make_package, make_module, tmp_path):
+    make_module("artifact_steps", STEPS)
+    make_package("pkg", make_runnables(10))
+    artifact_store = ArtifactStore(str(tmp_path / "artifacts"))
+    execute_dag(compile_dag("pkg"), artifact_store=artifact_store, workers=2, run_folder=str(tmp_path / "run"))
+    result = execute_dag(compile_dag("pkg"), artifact_store=artifact_store, workers=2, run_folder=str(tmp_path / "run"))
+    assert len(result.cached_runnables) == 3
+    assert result.get("pkg.total.total") == 20.0
+
+def test_cached_files_are_not_copied(make_package, make_module, tmp_path):
+    make_module("artifact_steps", STEPS)
+    make_package("pkg", make_runnables(100000))
+    artifact_store = ArtifactStore(str(tmp_path / "artifacts"))
+    execute_dag(compile_dag("pkg"), artifact_store=artifact_store, workers=2, run_folder=str(tmp_path / "run"))
+    dag = compile_dag("pkg")
+    store = SharedMemoryOutputStore(str(tmp_path / "run"))
+    put_files = []
+    store.put_file = lambda output_variable, path, nbytes: put_files.append(path) or SharedMemoryOutputStore.put_file(store, output_variable, path, nbytes)
+    result = execute_dag(dag, artifact_store=artifact_store, store=store, workers=2)
+    assert len(result.cached_runnables) == 3
+    assert result.get("pkg.total.total") == 200000.0
+    # Both arrays were shared from the artifact store's files, which outlive the run
+    assert len(put_files) == 2
+    assert all(os.path.exists(path) for path in put_files)
+
+def test_release_keeps_files_it_does_not_own(tmp_path):
+    artifact_store = ArtifactStore(str(tmp_path / "artifacts"))
+    artifact_store.put("digest", np.ones(100000))
+    path, nbytes = artifact_store.get_file("digest")
+    assert nbytes == np.ones(100000).nbytes
+    linked, unowned = OutputVariable("pkg.make.linked"), OutputVariable("pkg.make.unowned")
+    store = SharedMemoryOutputStore(str(tmp_path / "run"))
+    store.put_file(linked, path, nbytes)
+    assert os.path.samefile(store.get_handle(linked).path, path)
+    store.put_handle(unowned, OutputHandle(path=path, nbytes=nbytes, owned=False))
+    store.release(linked)
+    store.release(unowned)
+    assert os.path.exists(path)
+    assert float(artifact_store.get("digest").sum()) == 100000.0
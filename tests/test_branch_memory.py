@@ -0,0 +1,36 @@
+import tracemalloc
+
+from dagpiler import compile_dag
+from dagpiler.nodes.runnables.process import Process
+
+# Each runnable downstream of the furcation carries a large attribute, which the branches share rather than copy
+SETTINGS = {f"setting_{i}": f"value_{i}" * 10 for i in range(2000)}
+
+UPSTREAM_RUNNABLES = {f"load_{i}": {"type": "process", "exec": "upstream_pkg.load::load", "inputs": {"value": i}, "outputs": ["value"]} for i in range(12)}
+
+FURCATED_RUNNABLES = {
+    "analyze": {"type": "process", "exec": "furcated.analyze::analyze", "inputs": {"value": "?"}, "outputs": ["result"], "settings": SETTINGS},
+    "report": {"type": "process", "exec": "furcated.report::report", "inputs": {"result": "analyze.result[0]"}, "outputs": ["report"], "settings": SETTINGS},
+}
+
+def get_bridges(package_name: str, num_branches: int) -> dict:
+    return {"value": {"sources": [f"upstream_pkg.load_{i}.value" for i in range(num_branches)], "targets": [f"{package_name}.analyze.value"]}}
+
+def measure_compile_bytes(make_package, num_branches: int) -> int:
+    package_name = f"furcated_{num_branches}"
+    make_package(package_name, FURCATED_RUNNABLES, bridges=get_bridges(package_name, num_branches))
+    tracemalloc.start()
+    dag = compile_dag(package_name)
+    allocated_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    assert len([node for node in dag.nodes if isinstance(node, Process) and node.name == f"{package_name}.report"]) == num_branches
+    return allocated_bytes
+
+def test_branches_share_attribute_payloads(make_package):
+    make_package("upstream_pkg", UPSTREAM_RUNNABLES)
+    few_branches_bytes = measure_compile_bytes(make_package, 2)
+    many_branches_bytes = measure_compile_bytes(make_package, 12)
+    bytes_per_branch = (many_branches_bytes - few_branches_bytes) / 10
+    payload_bytes = sum(len(key) + len(value) for key, value in SETTINGS.items())
+    # Each branch costs its nodes and their references, rather than a copy of the attribute payload
+    assert bytes_per_branch < payload_bytes / 4
@@ -0,0 +1,77 @@
+import pytest
+from base_dag import DAG
+
+from dagpiler import compile_dag
+from dagpiler.dag.compiled_dag import CompiledDag
+from dagpiler.dag.organizer import order_nodes, order_edges
+from dagpiler.dag.printer import print_dag
+
+def make_dag() -> DAG:
+    """a -> b -> d, a -> c -> d, e (isolated), f -> c"""
+    dag = DAG()
+    for node in ["a", "b", "c", "d", "e", "f"]:
+        dag.add_node(node)
+    for source, target in [("a", "b"), ("b", "d"), ("a", "c"), ("c", "d"), ("f", "c")]:
+        dag.add_edge(source, target)
+    return dag
+
+def test_adjacency_and_degrees():
+    compiled_dag = CompiledDag(make_dag())
+    assert compiled_dag.successors("a") == ["b", "c"]
+    assert sorted(compiled_dag.predecessors("c")) == ["a", "f"]
+    assert compiled_dag.in_degree("d") == 2
+    assert compiled_dag.out_degree("d") == 0
+    assert compiled_dag.in_degrees.tolist() == [0, 1, 2, 2, 0, 0]
+    assert compiled_dag.out_degrees.tolist() == [2, 1, 1, 0, 0, 1]
+
+def test_topological_generations():
+    compiled_dag = CompiledDag(make_dag())
+    assert compiled_dag.topological_generations() == [["a", "e", "f"], ["b", "c"], ["d"]]
+    assert compiled_dag.generation_ids.tolist() == [0, 1, 1, 2, 0, 0]
+    assert compiled_dag.topological_sort() == ["a", "e", "f", "b", "c", "d"]
+
+def test_reachability():
+    compiled_dag = CompiledDag(make_dag())
+    assert sorted(compiled_dag.descendants("a")) == ["b", "c", "d"]
+    assert sorted(compiled_dag.ancestors("d", include_node=True)) == ["a", "b", "c", "d", "f"]
+    assert compiled_dag.has_path("f", "d")
+    assert not compiled_dag.has_path("b", "c")
+
+def test_cycle_raises():
+    dag = make_dag()
+    dag.dag_dict["d"].append("a") # Bypasses the cycle check in add_edge
+    with pytest.raises(ValueError, match="cycle"):
+        CompiledDag(dag).topological_generations()
+
+def test_large_layered_dag():
+    """100k nodes in 200 generations, each node feeding two nodes of the next generation."""
+    num_generations, width = 200, 500
+    dag = DAG()
+    dag.dag_dict = {
+        generation * width + i: [(generation + 1) * width + i, (generation + 1) * width + (i + 1) % width] if generation < num_generations - 1 else []
+        for generation in range(num_generations) for i in range(width)
+    }
+    compiled_dag = CompiledDag(dag)
+    assert compiled_dag.generation_ids.tolist() == [node // width for node in range(num_generations * width)]
+    assert compiled_dag.topological_sort()[:3] == [0, 1, 2]
+    # Each generation widens the reach by one node: node 0 reaches nodes 0..g of generation g
+    reached = compiled_dag.reachable([0])
+    assert reached[width:2 * width].sum() == 2
+    assert reached.sum() == sum(generation + 1 for generation in range(1, num_generations))
+
+RUNNABLES = {
+    "load": {"type": "process", "exec": "csr_steps::load", "inputs": {"value": 0}, "outputs": ["value"]},
+    "filter": {"type": "process", "exec": "csr_steps::step", "inputs": {"value": "load.value"}, "outputs": ["value"]},
+}
+
+def test_writers_use_compiled_view(make_package, capsys):
+    make_package("csr_pkg", RUNNABLES)
+    dag = compile_dag("csr_pkg")
+    nodes = order_nodes(dag)
+    assert [str(node) for node in nodes[:2]] == ["HardcodedVariable(csr_pkg.load.value)", "Process(csr_pkg.load)"]
+    positions = {node: position for position, node in enumerate(nodes)}
+    edges = order_edges(dag)
+    assert len(edges) == sum(len(dag.successors(node)) for node in dag.nodes)
+    assert all(positions[source] < positions[target] for source, target in edges)
+    print_dag(dag, "stdout")
+    assert "Process(csr_pkg.filter)" in capsys.readouterr().out
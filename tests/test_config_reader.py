@@ -0,0 +1,59 @@
+import json
+import threading
+import time
+
+import pytest
+
+from dagpiler import config_reader
+from dagpiler.config_reader import ConfigReader, read_configs
+
+class SlowReader(ConfigReader):
+    """Reads the earlier paths more slowly, so that the later paths finish first."""
+
+    def __init__(self, num_paths: int):
+        self.num_paths = num_paths
+        self.thread_ids = set()
+
+    def read_config(self, config_path: str) -> dict:
+        self.thread_ids.add(threading.get_ident())
+        with open(config_path) as f:
+            index = json.load(f)["index"]
+        time.sleep(0.01 * (self.num_paths - index))
+        return {"index": index}
+
+def write_configs(tmp_path, num_paths: int) -> list:
+    config_paths = []
+    for index in range(num_paths):
+        config_path = tmp_path / f"config_{index}.json"
+        config_path.write_text(json.dumps({"index": index}))
+        config_paths.append(str(config_path))
+    return config_paths
+
+def test_results_in_path_order(tmp_path):
+    config_paths = write_configs(tmp_path, 12)
+    reader = SlowReader(len(config_paths))
+    configs = read_configs(config_paths, reader, max_workers=4)
+    assert [config["index"] for config in configs] == list(range(12))
+    assert 1 < len(reader.thread_ids) <= 4
+
+def test_default_reader_by_extension(tmp_path):
+    config_paths = write_configs(tmp_path, 3)
+    assert read_configs(config_paths) == [{"index": 0}, {"index": 1}, {"index": 2}]
+
+def test_missing_path_raises(tmp_path):
+    config_paths = write_configs(tmp_path, 3)
+    config_paths.insert(1, str(tmp_path / "missing.json"))
+    with pytest.raises(FileNotFoundError, match="missing.json"):
+        read_configs(config_paths)
+    with pytest.raises(FileNotFoundError, match="missing.json"):
+        read_configs(config_paths[1:2])
+
+def test_single_path_is_read_without_a_pool(tmp_path, monkeypatch):
+    def no_pool(*args, **kwargs):
+        raise AssertionError("A single path should be read in the calling thread")
+    monkeypatch.setattr(config_reader, "ThreadPoolExecutor", no_pool)
+    config_paths = write_configs(tmp_path, 1)
+    reader = SlowReader(1)
+    assert read_configs(config_paths, reader) == [{"index": 0}]
+    assert reader.thread_ids == {threading.get_ident()}
+    assert read_configs([], reader) == []
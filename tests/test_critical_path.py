@@ -0,0 +1,63 @@
+import pytest
+
+from dagpiler import compile_dag, execute_dag
+from dagpiler.execution.critical_path import CriticalPathPlan
+from dagpiler.execution.runtime_history import RuntimeHistory
+
+STEPS = '''
+def step(value):
+    return value + 1
+'''
+
+# A chain of three runnables, and two independent runnables
+RUNNABLES = {
+    "load": {"type": "process", "exec": "critical_steps::step", "inputs": {"value": 0}, "outputs": ["value"]},
+    "filter": {"type": "process", "exec": "critical_steps::step", "inputs": {"value": "load.value"}, "outputs": ["value"]},
+    "fit": {"type": "process", "exec": "critical_steps::step", "inputs": {"value": "filter.value"}, "outputs": ["value"]},
+    "summary": {"type": "process", "exec": "critical_steps::step", "inputs": {"value": 10}, "outputs": ["value"]},
+    "report": {"type": "process", "exec": "critical_steps::step", "inputs": {"value": 20}, "outputs": ["value"]},
+}
+
+RUNTIMES = {"pkg.load": 1.0, "pkg.filter": 2.0, "pkg.fit": 3.0, "pkg.summary": 4.0, "pkg.report": 1.0}
+
+def make_history(dag) -> RuntimeHistory:
+    runtime_history = RuntimeHistory()
+    for node in dag.nodes:
+        if node.name in RUNTIMES:
+            runtime_history.record(node, RUNTIMES[node.name])
+    return runtime_history
+
+def test_critical_path_and_makespan(make_package):
+    make_package("pkg", RUNNABLES)
+    dag = compile_dag("pkg")
+    plan = CriticalPathPlan(dag, make_history(dag))
+    assert [runnable.name for runnable in plan.critical_path] == ["pkg.load", "pkg.filter", "pkg.fit"]
+    assert plan.critical_path_length == 6.0
+    assert plan.total_work == 11.0
+    assert plan.makespan(1) == 11.0
+    # The chain is started first, so the other two runnables fit alongside it
+    assert plan.makespan(2) == 6.0
+    assert plan.makespan(10) == 6.0
+    assert "Expected makespan on 2 worker(s): 6.00 s" in plan.report(2)
+    with pytest.raises(ValueError):
+        plan.makespan(0)
+
+def test_runtime_history_estimates(make_package, tmp_path):
+    make_package("pkg", RUNNABLES)
+    dag = compile_dag("pkg")
+    path = str(tmp_path / "runtimes.json")
+    runtime_history = RuntimeHistory(path)
+    load = [node for node in dag.nodes if node.name == "pkg.load"][0]
+    runtime_history.record(load, 1.0)
+    runtime_history.record(load, 3.0)
+    runtime_history.save()
+    assert RuntimeHistory(path).estimate(load) == 2.0
+
+@pytest.mark.parametrize("workers", [None, 2])
+def test_execution_records_runtimes(make_package, make_module, tmp_path, workers):
+    make_module("critical_steps", STEPS)
+    make_package("pkg", RUNNABLES)
+    path = str(tmp_path / "runtimes.json")
+    result = execute_dag(compile_dag("pkg"), run_folder=str(tmp_path / "run"), workers=workers, runtime_history=RuntimeHistory(path))
+    assert result.get("pkg.fit.value") == 3
+    assert sorted(RuntimeHistory(path).runnables) == sorted(RUNTIMES)
@@ -0,0 +1,48 @@
+import pytest
+
+from dagpiler import compile_dag
+from dagpiler.dag.indexed_dag import IndexedDAG, DagCycleError
+from dagpiler.nodes.runnables.process import Process
+from dagpiler.nodes.variables.variables import DynamicVariable, OutputVariable
+
+def test_online_order_rejects_cycle_with_path():
+    dag = IndexedDAG()
+    # Added against the initial order, so each edge reorders the nodes
+    for source, target in [("d", "e"), ("c", "d"), ("b", "c"), ("a", "b")]:
+        dag.add_edge(source, target)
+    order = sorted(dag.nodes, key=dag._order.__getitem__)
+    assert order.index("a") < order.index("b") < order.index("c") < order.index("d") < order.index("e")
+    with pytest.raises(DagCycleError) as error:
+        dag.add_edge("e", "b")
+    assert error.value.cycle == ["e", "b", "c", "d", "e"]
+    assert "e -> b -> c -> d -> e" in str(error.value)
+    # The rejected edge was not added
+    assert dag.successors("e") == []
+    assert dag.predecessors("b") == ["a"]
+    with pytest.raises(DagCycleError):
+        dag.add_edge("a", "a")
+
+def test_self_referential_dynamic_variable(make_package):
+    make_package("cycle_pkg", {
+        "load": {"type": "process", "exec": "cycle_steps::load", "inputs": {"value": 1}, "outputs": ["value"]},
+        "smooth": {"type": "process", "exec": "cycle_steps::smooth", "inputs": {"data": "smooth.smoothed"}, "outputs": ["smoothed"]},
+    })
+    with pytest.raises(DagCycleError) as error:
+        compile_dag("cycle_pkg")
+    cycle = error.value.cycle
+    assert [node.__class__ for node in cycle] == [OutputVariable, DynamicVariable, Process, OutputVariable]
+    assert cycle[0] is cycle[-1]
+    assert "OutputVariable(cycle_pkg.smooth.smoothed) -> DynamicVariable(cycle_pkg.smooth.data) -> Process(cycle_pkg.smooth)" in str(error.value)
+
+def test_cycle_between_bridged_packages(make_package):
+    make_package("cycle_left", {
+        "step": {"type": "process", "exec": "cycle_steps::step", "inputs": {"value": "?"}, "outputs": ["result"]},
+    }, bridges={"value": {"sources": ["cycle_right.step.result"], "targets": ["cycle_left.step.value"]}})
+    make_package("cycle_right", {
+        "step": {"type": "process", "exec": "cycle_steps::step", "inputs": {"value": "?"}, "outputs": ["result"]},
+    }, bridges={"value": {"sources": ["cycle_left.step.result"], "targets": ["cycle_right.step.value"]}})
+    with pytest.raises(DagCycleError) as error:
+        compile_dag("cycle_left")
+    names = [node.name for node in error.value.cycle]
+    assert names[0] == names[-1]
+    assert {"cycle_left.step", "cycle_right.step"} <= set(names)
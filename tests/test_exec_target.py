@@ -0,0 +1,64 @@
+import pytest
+
+from dagpiler import compile_dag, execute_dag
+from dagpiler.execution import callables
+from dagpiler.execution.callables import get_callable, prewarm_callables
+from dagpiler.nodes.runnables.exec_target import parse_exec
+from dagpiler.nodes.runnables.process import Process
+
+STEPS = '''
+class Steps:
+    @staticmethod
+    def double(value):
+        return value * 2
+
+NOT_CALLABLE = 1
+'''
+
+RUNNABLES = {
+    "double": {"type": "process", "exec": "exec_steps::Steps.double", "inputs": {"value": 2}, "outputs": ["value"]},
+    "again": {"type": "process", "exec": "exec_steps::Steps.double", "inputs": {"value": "double.value"}, "outputs": ["value"]},
+}
+
+def test_parse_exec():
+    assert parse_exec("package.module::Class.method") == ("package.module", "Class.method")
+    for exec in ["package.module", "a::b::c", "package module::func", "package.module::"]:
+        with pytest.raises(ValueError):
+            parse_exec(exec)
+
+def test_file_path_exec_is_rejected_when_compiling(make_package):
+    # The node itself only checks for the separator, so it can still be built from an older exec
+    assert Process(name="pkg.a", exec="path/to/file.py::func", inputs={}, outputs=[]).exec == "path/to/file.py::func"
+    make_package("pkg", {"a": {"type": "process", "exec": "path/to/file.py::func", "inputs": {"value": 1}, "outputs": ["value"]}})
+    with pytest.raises(ValueError, match="pkg.a: Expected 'exec' to be formatted as module.path::function_name"):
+        compile_dag("pkg")
+
+def test_compile_resolves_exec(make_package, make_module):
+    make_module("exec_steps", STEPS)
+    make_package("pkg", RUNNABLES)
+    dag = compile_dag("pkg", validate_exec=True)
+    exec_targets = {node.exec_target for node in dag.nodes if hasattr(node, "exec_target")}
+    assert exec_targets == {("exec_steps", "Steps.double")}
+    assert execute_dag(dag).get("pkg.again.value") == 8
+
+def test_validate_exec_reports_missing_targets(make_package, make_module):
+    make_module("exec_steps", STEPS)
+    runnables = dict(RUNNABLES)
+    runnables["missing"] = {"type": "process", "exec": "exec_steps::missing", "inputs": {"value": 1}, "outputs": ["value"]}
+    runnables["not_callable"] = {"type": "process", "exec": "exec_steps::NOT_CALLABLE", "inputs": {"value": 1}, "outputs": ["value"]}
+    runnables["no_module"] = {"type": "process", "exec": "no_such_module::step", "inputs": {"value": 1}, "outputs": ["value"]}
+    make_package("pkg", runnables)
+    # Resolving the exec does not import anything unless asked to
+    compile_dag("pkg")
+    with pytest.raises(ValueError) as error:
+        compile_dag("pkg", validate_exec=True)
+    for name in ["pkg.missing", "pkg.not_callable", "pkg.no_module"]:
+        assert name in str(error.value)
+    assert "pkg.double" not in str(error.value)
+
+def test_callables_are_cached(make_module):
+    make_module("exec_steps", STEPS)
+    prewarm_callables([("exec_steps", "Steps.double"), ("exec_steps", "missing")])
+    assert ("exec_steps", "Steps.double") in callables._CALLABLES
+    assert ("exec_steps", "missing") not in callables._CALLABLES
+    assert get_callable(("exec_steps", "Steps.double")) is callables._CALLABLES[("exec_steps", "Steps.double")]
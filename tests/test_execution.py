@@ -0,0 +1,72 @@
+import os
+
+import numpy as np
+
+from dagpiler import compile_dag, execute_dag
+from dagpiler.execution.consumers import get_consumers
+
+STEPS = '''
+import numpy as np
+
+def make(size):
+    return np.ones(size)
+
+def double(data):
+    return data * 2
+
+def add(a, b):
+    return a + b
+
+def scale(data):
+    return data / 3
+
+def total(data):
+    return float(data.sum())
+'''
+
+RUNNABLES = {
+    "make": {"type": "process", "exec": "steps::make", "inputs": {"size": 125000}, "outputs": ["data"]},
+    "double": {"type": "process", "exec": "steps::double", "inputs": {"data": "make.data"}, "outputs": ["doubled"]},
+    "add": {"type": "process", "exec": "steps::add", "inputs": {"a": "make.data", "b": "double.doubled"}, "outputs": ["added"]},
+    "scale": {"type": "process", "exec": "steps::scale", "inputs": {"data": "add.added"}, "outputs": ["scaled"]},
+    "total": {"type": "process", "exec": "steps::total", "inputs": {"data": "scale.scaled"}, "outputs": ["total"]},
+}
+
+def compile_steps(make_package, make_module):
+    make_module("steps", STEPS)
+    make_package("pkg", RUNNABLES)
+    return compile_dag("pkg")
+
+def test_consumers_counted_through_dynamic_variables(make_package, make_module):
+    dag = compile_steps(make_package, make_module)
+    consumers = {output_variable.name: sorted(runnable.name for runnable in runnables) for output_variable, runnables in get_consumers(dag).items()}
+    assert consumers == {
+        "pkg.make.data": ["pkg.add", "pkg.double"],
+        "pkg.double.doubled": ["pkg.add"],
+        "pkg.add.added": ["pkg.scale"],
+        "pkg.scale.scaled": ["pkg.total"],
+        "pkg.total.total": [],
+    }
+
+def test_outputs_freed_after_last_consumer(make_package, make_module):
+    dag = compile_steps(make_package, make_module)
+    result = execute_dag(dag)
+    assert result.get("pkg.total.total") == 125000
+    assert list(result.outputs) == [o for o in result.outputs if o.name == "pkg.total.total"]
+    retained = execute_dag(dag, release="retain").memory_report
+
+    # Each array is 1MB. At most three are needed at once (by add), but all four are held if nothing is released.
+    assert 3000000 <= result.memory_report.peak_bytes < 3100000
+    assert 4000000 <= retained.peak_bytes < 4100000
+    assert result.memory_report.saved_bytes == retained.peak_bytes - result.memory_report.peak_bytes
+    assert result.memory_report.num_released == 4
+    assert "Saved" in str(result.memory_report)
+
+def test_outputs_spilled_after_last_consumer(make_package, make_module, tmp_path):
+    dag = compile_steps(make_package, make_module)
+    result = execute_dag(dag, release="spill", run_folder=str(tmp_path / "run"))
+    assert result.get("pkg.total.total") == 125000
+    spilled_files = os.listdir(tmp_path / "run" / "spill")
+    assert len(spilled_files) == 4
+    spilled_values = [np.load(tmp_path / "run" / "spill" / file_name) for file_name in spilled_files]
+    assert sorted(float(value[0]) for value in spilled_values) == [1.0, 1.0, 2.0, 3.0]
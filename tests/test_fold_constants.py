@@ -0,0 +1,58 @@
+from dagpiler import compile_dag, execute_dag
+from dagpiler.execution.artifact_store import ArtifactStore
+
+STEPS = '''
+import os
+
+FOLDER = os.path.dirname(__file__)
+
+def step(value, name):
+    with open(os.path.join(FOLDER, "calls.txt"), "a") as f:
+        f.write(name + "\\n")
+    return value + 1
+
+def label(value, data_object):
+    with open(os.path.join(FOLDER, "calls.txt"), "a") as f:
+        f.write("label\\n")
+    return f"{data_object}:{value}"
+'''
+
+# A chain of two constant runnables, and a runnable that depends on the data object
+RUNNABLES = {
+    "first": {"type": "process", "exec": "fold_steps::step", "inputs": {"value": 0, "name": "first"}, "outputs": ["value"]},
+    "second": {"type": "process", "exec": "fold_steps::step", "inputs": {"value": "first.value", "name": "second"}, "outputs": ["value"]},
+    "label": {"type": "process", "exec": "fold_steps::label", "inputs": {"value": "second.value", "data_object": {"__data_object_name__": "DataObject"}}, "outputs": ["label"]},
+}
+
+def get_calls(tmp_path) -> list:
+    calls_file = tmp_path / "modules" / "calls.txt"
+    calls = calls_file.read_text().split() if calls_file.exists() else []
+    calls_file.write_text("")
+    return calls
+
+def test_constant_chains_are_folded(make_package, make_module, tmp_path):
+    make_module("fold_steps", STEPS)
+    make_package("pkg", RUNNABLES)
+    artifact_store = ArtifactStore(str(tmp_path / "artifacts"))
+    dag = compile_dag("pkg", artifact_store=artifact_store)
+    assert get_calls(tmp_path) == ["first", "second"]
+    folded = sorted(node.name for node in dag.nodes if getattr(node, "folded", False))
+    assert folded == ["pkg.first", "pkg.second"]
+
+    # The folded runnables are loaded from the artifact store for each data object, rather than run
+    for data_object in ["Subject1", "Subject2"]:
+        result = execute_dag(dag, data_object=data_object, artifact_store=artifact_store)
+        assert result.get("pkg.label.label") == f"{data_object}:2"
+        assert sorted(runnable.name for runnable in result.cached_runnables) == ["pkg.first", "pkg.second"]
+    assert get_calls(tmp_path) == ["label", "label"]
+
+    # Compiling again does not rerun them
+    compile_dag("pkg", artifact_store=artifact_store)
+    assert get_calls(tmp_path) == []
+
+def test_no_folding_without_artifact_store(make_package, make_module, tmp_path):
+    make_module("fold_steps", STEPS)
+    make_package("pkg", RUNNABLES)
+    dag = compile_dag("pkg")
+    assert get_calls(tmp_path) == []
+    assert not any(getattr(node, "folded", False) for node in dag.nodes)
@@ -0,0 +1,82 @@
+from base_dag import DAG
+
+from dagpiler import compile_dag, execute_dag
+from dagpiler.dag.indexed_dag import IndexedDAG, get_nodes_of_type, get_nodes_named
+from dagpiler.nodes.runnables.process import Process
+from dagpiler.nodes.runnables.runnables import Runnable
+from dagpiler.nodes.variables.variables import Variable, OutputVariable, HardcodedVariable
+
+UPSTREAM_RUNNABLES = {
+    "load_a": {"type": "process", "exec": "index_steps::load", "inputs": {"value": 1}, "outputs": ["value"]},
+    "load_b": {"type": "process", "exec": "index_steps::load", "inputs": {"value": 2}, "outputs": ["value"]},
+}
+
+FURCATED_RUNNABLES = {
+    "analyze": {"type": "process", "exec": "index_steps::analyze", "inputs": {"value": "?"}, "outputs": ["result"], "level": "Trial"},
+    "report": {"type": "process", "exec": "index_steps::report", "inputs": {"result": "analyze.result"}, "outputs": ["report"]},
+}
+
+BRIDGES = {"value": {"sources": ["index_upstream.load_a.value", "index_upstream.load_b.value"], "targets": ["index_furcated.analyze.value"]}}
+
+def assert_indexes_match_scan(dag: IndexedDAG) -> None:
+    """The maintained indexes give the same answers as a scan over all of the nodes."""
+    for node_class in [Runnable, Process, Variable, OutputVariable, HardcodedVariable]:
+        assert set(dag.nodes_of_type(node_class)) == {node for node in dag.nodes if isinstance(node, node_class)}
+    for node in dag.nodes:
+        assert set(dag.nodes_named(node.name)) == {other for other in dag.nodes if other.name == node.name}
+        assert set(dag.nodes_in_package(node.package_name())) == {other for other in dag.nodes if other.package_name() == node.package_name()}
+
+def test_queries_after_furcation(make_package):
+    make_package("index_upstream", UPSTREAM_RUNNABLES)
+    make_package("index_furcated", FURCATED_RUNNABLES, bridges=BRIDGES)
+    dag = compile_dag("index_furcated")
+    assert isinstance(dag, IndexedDAG)
+    assert_indexes_match_scan(dag)
+    # One copy of each furcated node per branch, and the original subgraph is no longer indexed
+    assert len(dag.nodes_named("index_furcated.report")) == 2
+    assert len(dag.nodes_at_level("Trial")) == 2
+    assert len(dag.query(node_class=Runnable, package_name="index_furcated")) == 4
+    # The runnable's input and output variables share the name, which the class disambiguates
+    assert len(dag.nodes_named("index_upstream.load_a.value")) == 2
+    assert [node.__class__ for node in dag.query(node_class=OutputVariable, name="index_upstream.load_a.value")] == [OutputVariable]
+    assert dag.query(node_class=HardcodedVariable, level="Trial") == []
+    assert len(dag.query()) == len(dag.nodes)
+
+def test_indexes_follow_removal_and_relabel():
+    dag = IndexedDAG()
+    first = HardcodedVariable("pkg.runnable.first", 1)
+    second = HardcodedVariable("pkg.runnable.second", 2)
+    output = OutputVariable("pkg.runnable.output")
+    dag.add_edge(first, output)
+    dag.add_edge(second, output)
+    replacement = HardcodedVariable("other.runnable.first", 3)
+    dag.relabel_nodes({first: replacement})
+    assert dag.nodes_named("pkg.runnable.first") == []
+    assert dag.nodes_in_package("other") == [replacement]
+    dag.remove_nodes_from([second, output])
+    assert dag.nodes_in_package("pkg") == []
+    assert dag.nodes_of_type(Variable) == [replacement]
+    assert dag.successors(replacement) == []
+
+STEPS = '''
+def load(value):
+    return value + 1
+
+def analyze(value):
+    return value * 10
+
+def report(result):
+    return result + 1
+'''
+
+def test_plain_dag_is_scanned(make_package, make_module):
+    """The helpers fall back to scanning a DAG without indexes, e.g. a compiled graph copied into a base_dag DAG."""
+    make_module("index_steps", STEPS)
+    make_package("index_upstream", UPSTREAM_RUNNABLES)
+    make_package("index_furcated", FURCATED_RUNNABLES, bridges=BRIDGES)
+    plain_dag = DAG()
+    plain_dag.dag_dict = {node: list(successors) for node, successors in compile_dag("index_furcated").dag_dict.items()}
+    assert len(get_nodes_of_type(plain_dag, Process)) == 6
+    assert len(get_nodes_named(plain_dag, "index_furcated.report")) == 2
+    result = execute_dag(plain_dag)
+    assert sorted(value for output_variable, value in result.outputs.items() if output_variable.name == "index_furcated.report.report") == [21, 31]
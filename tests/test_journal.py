@@ -0,0 +1,77 @@
+import pytest
+
+from dagpiler import compile_dag, execute_dag
+from dagpiler.execution.artifact_store import ArtifactStore
+from dagpiler.execution.journal import RunJournal
+
+STEPS = '''
+import os
+
+FOLDER = os.path.dirname(__file__)
+
+def step(value, name):
+    with open(os.path.join(FOLDER, "calls.txt"), "a") as f:
+        f.write(name + "\\n")
+    if os.path.exists(os.path.join(FOLDER, f"fail_{name}")):
+        raise RuntimeError(f"{name} failed")
+    return value + 1
+'''
+
+RUNNABLES = {
+    "first": {"type": "process", "exec": "journal_steps::step", "inputs": {"value": 0, "name": "first"}, "outputs": ["value"]},
+    "second": {"type": "process", "exec": "journal_steps::step", "inputs": {"value": "first.value", "name": "second"}, "outputs": ["value"]},
+    "third": {"type": "process", "exec": "journal_steps::step", "inputs": {"value": "second.value", "name": "third"}, "outputs": ["value"]},
+    "fourth": {"type": "process", "exec": "journal_steps::step", "inputs": {"value": "third.value", "name": "fourth"}, "outputs": ["value"]},
+}
+
+def get_calls(tmp_path) -> list:
+    calls_file = tmp_path / "modules" / "calls.txt"
+    calls = calls_file.read_text().split() if calls_file.exists() else []
+    calls_file.write_text("")
+    return calls
+
+def test_journal_batches_writes(tmp_path):
+    journal = RunJournal(str(tmp_path / "journal.log"), batch_size=3, flush_seconds=3600)
+    journal.record("a", "Subject1")
+    journal.record("b")
+    assert journal.read_completed() == set()
+    journal.record("c")
+    assert journal.read_completed() == {("a", "Subject1"), ("b", None), ("c", None)}
+    # A partially written last entry is ignored
+    with open(journal.path, "a") as f:
+        f.write("d\t")
+    assert ("d", None) not in journal.read_completed()
+
+@pytest.mark.parametrize("workers", [None, 2])
+def test_resume_after_failure(make_package, make_module, tmp_path, workers):
+    make_module("journal_steps", STEPS)
+    make_package("pkg", RUNNABLES)
+    artifact_store = ArtifactStore(str(tmp_path / "artifacts"))
+    journal_path = str(tmp_path / "run" / "journal.log")
+    run_folder = str(tmp_path / "run")
+    (tmp_path / "modules" / "fail_third").write_text("")
+    with pytest.raises(RuntimeError):
+        execute_dag(compile_dag("pkg"), artifact_store=artifact_store, journal=RunJournal(journal_path), run_folder=run_folder, workers=workers)
+    assert get_calls(tmp_path) == ["first", "second", "third"]
+
+    (tmp_path / "modules" / "fail_third").unlink()
+    result = execute_dag(compile_dag("pkg"), journal=RunJournal(journal_path), artifact_store=artifact_store, resume=True, run_folder=run_folder, workers=workers)
+    assert get_calls(tmp_path) == ["third", "fourth"]
+    assert sorted(runnable.name for runnable in result.resumed_runnables) == ["pkg.first", "pkg.second"]
+    assert result.get("pkg.fourth.value") == 4
+
+def test_completed_runnables_rerun_if_outputs_unavailable(make_package, make_module, tmp_path):
+    make_module("journal_steps", STEPS)
+    make_package("pkg", RUNNABLES)
+    journal_path = str(tmp_path / "run" / "journal.log")
+    (tmp_path / "modules" / "fail_third").write_text("")
+    with pytest.raises(RuntimeError):
+        execute_dag(compile_dag("pkg"), journal=RunJournal(journal_path))
+    get_calls(tmp_path)
+
+    # Without an artifact store, second's output is lost, so second is rerun, and so is first to provide its input.
+    (tmp_path / "modules" / "fail_third").unlink()
+    result = execute_dag(compile_dag("pkg"), journal=RunJournal(journal_path), resume=True)
+    assert get_calls(tmp_path) == ["first", "second", "third", "fourth"]
+    assert result.resumed_runnables == []
+    assert result.get("pkg.fourth.value") == 4
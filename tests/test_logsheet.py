@@ -0,0 +1,67 @@
+import os
+import shutil
+
+import numpy as np
+
+from dagpiler.logsheet.logsheet_reader import LogsheetSettings, read_logsheet_columns
+from dagpiler.logsheet.data_object_index import load_data_object_index, load_package_data_object_index
+
+LOGSHEET_PATH = os.path.join(os.path.dirname(__file__), "fixtures", "logsheet.csv")
+
+LOGSHEET_SETTINGS = {
+    "dataset_schema": ["Temperature", "Pressure", "Humidity"],
+    "logsheet": {
+        "path": "logsheet.csv",
+        "num_header_rows": 1,
+        "class_column_names": {"Temperature": "Temperature (deg F)", "Pressure": "Pressure (psi)", "Humidity": "Humidity"},
+        "headers": {
+            "Temperature (deg F)": ["Temperature", "num"],
+            "Pressure (psi)": ["Pressure", "num"],
+            "Humidity": ["Humidity", "num"],
+            "Notes": ["Pressure", "str"],
+        },
+    },
+}
+
+def get_settings(folder) -> LogsheetSettings:
+    shutil.copy(LOGSHEET_PATH, folder / "logsheet.csv")
+    return LogsheetSettings.from_dict(LOGSHEET_SETTINGS, str(folder))
+
+def test_read_logsheet_columns_in_chunks(tmp_path):
+    settings = get_settings(tmp_path)
+    columns = read_logsheet_columns(settings, chunk_size=5)
+    assert columns["Temperature (deg F)"].dtype == np.float64
+    assert columns["Notes"].tolist() == [f"note{i // 2 + 1}" for i in range(12)]
+    for header_name, column in read_logsheet_columns(settings).items():
+        assert np.array_equal(column, columns[header_name])
+
+def test_data_objects_per_level(tmp_path):
+    data_object_index = load_data_object_index(get_settings(tmp_path), cache_folder=str(tmp_path / "cache"))
+    assert data_object_index.num_rows == 12
+    assert len(data_object_index.get_level("Temperature")) == 3
+    pressure = data_object_index.get_level("Pressure")
+    assert len(pressure) == 6
+    assert pressure.names().tolist()[:2] == ["20.0/1.0", "20.0/1.1"]
+    assert pressure.row_object_ids.tolist() == [0, 0, 1, 1, 2, 2, 3, 3, 4, 4, 5, 5]
+    assert len(data_object_index.get_level("Humidity")) == 12
+
+def test_data_object_index_is_cached_by_file_hash(tmp_path):
+    settings = get_settings(tmp_path)
+    cache_folder = tmp_path / "cache"
+    load_data_object_index(settings, cache_folder=str(cache_folder))
+    assert os.listdir(cache_folder) == [f"{settings.digest()}.npz"]
+    cached_index = load_data_object_index(settings, cache_folder=str(cache_folder))
+    assert cached_index.columns["Notes"].tolist()[-1] == "note6"
+
+    # Changing the logsheet invalidates the cache
+    with open(settings.path, "a") as f:
+        f.write("\n35,1,5,note7")
+    assert load_data_object_index(settings, cache_folder=str(cache_folder)).num_rows == 13
+    assert len(os.listdir(cache_folder)) == 2
+
+def test_load_package_data_object_index(make_package):
+    src_folder = make_package("pkg", {"load": {"type": "process", "exec": "pkg.load::load", "inputs": {"x": 1}, "outputs": ["y"]}}, package_settings=LOGSHEET_SETTINGS)
+    shutil.copy(LOGSHEET_PATH, src_folder / "logsheet.csv")
+    data_object_index = load_package_data_object_index("pkg")
+    assert len(data_object_index.get_level("Pressure")) == 6
+    assert os.path.isdir(os.path.join(".dagpiler", "cache", "logsheets"))
@@ -0,0 +1,72 @@
+from dagpiler import compile_dag, execute_dag
+from dagpiler.dag.merge_duplicates import merge_duplicate_runnables
+from dagpiler.nodes.runnables.process import Process
+
+STEPS = '''
+import os
+
+FOLDER = os.path.dirname(__file__)
+
+def step(value):
+    with open(os.path.join(FOLDER, "calls.txt"), "a") as f:
+        f.write("step\\n")
+    return value + 1
+
+def add(x, y):
+    return x + y
+'''
+
+# Two identical chains, both read by one runnable, and two identical runnables reading it
+RUNNABLES = {
+    "load_a": {"type": "process", "exec": "merge_steps::step", "inputs": {"value": 1}, "outputs": ["value"]},
+    "load_b": {"type": "process", "exec": "merge_steps::step", "inputs": {"value": 1}, "outputs": ["value"]},
+    "use_a": {"type": "process", "exec": "merge_steps::step", "inputs": {"value": "load_a.value"}, "outputs": ["value"]},
+    "use_b": {"type": "process", "exec": "merge_steps::step", "inputs": {"value": "load_b.value"}, "outputs": ["value"]},
+    "combine": {"type": "process", "exec": "merge_steps::add", "inputs": {"x": "use_a.value", "y": "use_b.value"}, "outputs": ["total"]},
+    "report_a": {"type": "process", "exec": "merge_steps::step", "inputs": {"value": "combine.total"}, "outputs": ["value"]},
+    "report_b": {"type": "process", "exec": "merge_steps::step", "inputs": {"value": "combine.total"}, "outputs": ["value"]},
+    "other": {"type": "process", "exec": "merge_steps::step", "inputs": {"value": 2}, "outputs": ["value"]},
+}
+
+UPSTREAM_RUNNABLES = {
+    "load_a": {"type": "process", "exec": "merge_steps::step", "inputs": {"value": 1}, "outputs": ["value"]},
+    "load_b": {"type": "process", "exec": "merge_steps::step", "inputs": {"value": 1}, "outputs": ["value"]},
+}
+
+FURCATED_RUNNABLES = {
+    "analyze": {"type": "process", "exec": "merge_steps::step", "inputs": {"value": "?"}, "outputs": ["value"]},
+}
+
+BRIDGES = {"value": {"sources": ["upstream_pkg.load_a.value", "upstream_pkg.load_b.value"], "targets": ["furcated_pkg.analyze.value"]}}
+
+def get_process_names(dag) -> list:
+    return sorted(node.name for node in dag.nodes if isinstance(node, Process))
+
+def test_duplicates_are_merged(make_package, make_module, tmp_path):
+    make_module("merge_steps", STEPS)
+    make_package("pkg", RUNNABLES)
+    dag = compile_dag("pkg")
+    assert get_process_names(dag) == ["pkg.combine", "pkg.load_a", "pkg.other", "pkg.report_a", "pkg.use_a"]
+    # Both of combine's inputs now read the one remaining output
+    combine = [node for node in dag.nodes if node.name == "pkg.combine"][0]
+    use_a_value = [node for node in dag.nodes if node.name == "pkg.use_a"][0].outputs["value"]
+    assert all(use_a_value in dag.ancestors(input_variable) for input_variable in combine.inputs.values())
+
+    result = execute_dag(dag)
+    assert (tmp_path / "modules" / "calls.txt").read_text().split() == ["step"] * 4
+    assert result.get("pkg.report_a.value") == result.get("pkg.report_b.value") == 7
+
+def test_merge_report(make_package, capsys):
+    make_package("pkg", RUNNABLES)
+    dag = compile_dag("pkg")
+    report = capsys.readouterr().out
+    assert "Merged 3 duplicate runnables" in report
+    assert "pkg.load_a <- pkg.load_b" in report
+    # Compiling merged everything already, so there is nothing left to merge
+    assert merge_duplicate_runnables(dag) == []
+
+def test_furcated_branches_with_equal_inputs_are_merged(make_package):
+    make_package("upstream_pkg", UPSTREAM_RUNNABLES)
+    make_package("furcated_pkg", FURCATED_RUNNABLES, bridges=BRIDGES)
+    dag = compile_dag("furcated_pkg")
+    assert get_process_names(dag) == ["furcated_pkg.analyze", "upstream_pkg.load_a"]
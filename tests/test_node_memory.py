@@ -0,0 +1,72 @@
+import tracemalloc
+
+from dagpiler import compile_dag
+from dagpiler.nodes.node import Node, get_slot_names, intern_name
+from dagpiler.nodes.variables.variables import OutputVariable, DynamicVariable
+
+# Each runnable has a process, an output, a dynamic input and a hard-coded input node
+NUM_RUNNABLES = 5000
+
+def make_runnables(num_runnables: int) -> dict:
+    runnables = {"runnable_0": {"type": "process", "exec": "memory_steps::step", "inputs": {"value": 0, "setting": 0}, "outputs": ["value"]}}
+    for i in range(1, num_runnables):
+        runnables[f"runnable_{i}"] = {"type": "process", "exec": "memory_steps::step", "inputs": {"value": f"runnable_{i - 1}.value", "setting": i}, "outputs": ["value"]}
+    return runnables
+
+class UnslottedNode:
+    """A node as it was before slots and interning: its attributes in an instance dict, and its own copy of each name string."""
+
+def copy_string(value):
+    return value[:1] + value[1:] if isinstance(value, str) and len(value) > 1 else value
+
+def copy_node(node: Node) -> Node:
+    """A copy of the compiled node as it is held in the DAG, i.e. sharing its interned names. Only its UUID is its own."""
+    copied_node = object.__new__(node.__class__)
+    for slot in get_slot_names(node.__class__):
+        try:
+            setattr(copied_node, slot, copy_string(object.__getattribute__(node, slot)) if slot == "_uuid" else object.__getattribute__(node, slot))
+        except AttributeError:
+            pass
+    if node.__dict__:
+        copied_node.__dict__.update(node.__dict__)
+    return copied_node
+
+def copy_unslotted_node(node: Node) -> UnslottedNode:
+    copied_node = UnslottedNode()
+    for slot in get_slot_names(node.__class__):
+        try:
+            setattr(copied_node, slot, copy_string(object.__getattribute__(node, slot)))
+        except AttributeError:
+            pass
+    copied_node.__dict__.update(node.__dict__)
+    return copied_node
+
+def measure_bytes(copy, nodes: list) -> int:
+    tracemalloc.start()
+    copies = [copy(node) for node in nodes]
+    allocated_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    assert len(copies) == len(nodes)
+    return allocated_bytes
+
+def test_nodes_have_no_instance_dict():
+    node = OutputVariable("package_name.runnable.output")
+    assert not node.__dict__
+    assert node.package_name() == "package_name"
+
+def test_names_are_interned():
+    first = OutputVariable("package_name." + "runnable.output")
+    second = DynamicVariable("package_name.consumer.value", "package_name.runnable." + "output")
+    assert first.name is intern_name("package_name.runnable.output")
+    assert second.user_inputted_value is first.name
+    assert first.package_name() is second.package_name()
+
+def test_compiled_dag_bytes_per_node(make_package):
+    make_package("memory_pkg", make_runnables(NUM_RUNNABLES))
+    nodes = list(compile_dag("memory_pkg").nodes)
+    assert len(nodes) == 4 * NUM_RUNNABLES
+    measure_bytes(copy_node, nodes)  # Warm up, so that one-off allocations are not counted
+    compact_bytes = measure_bytes(copy_node, nodes)
+    unslotted_bytes = measure_bytes(copy_unslotted_node, nodes)
+    # Less than half the size, without the instance dicts and the repeated names. Most of what remains is each node's UUID
+    assert compact_bytes < 0.6 * unslotted_bytes
@@ -0,0 +1,27 @@
+import pytest
+
+from dagpiler import compile_dag
+
+UPSTREAM_RUNNABLES = {
+    "load": {"type": "process", "exec": "upstream.load::load", "inputs": {"path": "data_csv"}, "outputs": ["data"]},
+    "clean": {"type": "process", "exec": "upstream.clean::clean", "inputs": {"data": "load.data"}, "outputs": ["cleaned"]},
+}
+
+DOWNSTREAM_RUNNABLES = {
+    "analyze": {"type": "process", "exec": "downstream.analyze::analyze", "inputs": {"data": "?", "order": [1, 2]}, "outputs": ["result"]},
+    "report": {"type": "process", "exec": "downstream.report::report", "inputs": {"result": "analyze.result"}, "outputs": ["report"]},
+}
+
+BRIDGES = {"data": {"sources": ["upstream.load.data", "upstream.clean.cleaned"], "targets": ["downstream.analyze.data"]}}
+
+def get_named_edges(dag) -> list:
+    return sorted((source.name, target.name) for source, target in dag.edges)
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_parallel_compile_matches_serial_compile(make_package, workers):
+    make_package("upstream", UPSTREAM_RUNNABLES)
+    make_package("downstream", DOWNSTREAM_RUNNABLES, bridges=BRIDGES)
+    serial_dag = compile_dag("downstream")
+    parallel_dag = compile_dag("downstream", workers=workers)
+    assert len(parallel_dag.nodes) == len(serial_dag.nodes)
+    assert get_named_edges(parallel_dag) == get_named_edges(serial_dag)
@@ -0,0 +1,84 @@
+import pytest
+
+from dagpiler import compile_dag, execute_dag
+from dagpiler.execution.partition import Partition
+from dagpiler.execution.runtime_history import RuntimeHistory
+from dagpiler.execution.work_queue import WorkQueue
+from dagpiler.nodes.runnables.runnables import Runnable
+
+STEPS = '''
+def step(value):
+    return value + 1
+'''
+
+# Two chains that each pass a large output, joined by a small one
+RUNNABLES = {
+    "load_left": {"type": "process", "exec": "partition_steps::step", "inputs": {"value": 0}, "outputs": ["value"]},
+    "fit_left": {"type": "process", "exec": "partition_steps::step", "inputs": {"value": "load_left.value"}, "outputs": ["value"]},
+    "load_right": {"type": "process", "exec": "partition_steps::step", "inputs": {"value": 100}, "outputs": ["value"]},
+    "fit_right": {"type": "process", "exec": "partition_steps::step", "inputs": {"value": "load_right.value"}, "outputs": ["value"]},
+    "compare": {"type": "process", "exec": "partition_steps::step", "inputs": {"value": "fit_left.value"}, "outputs": ["value"]},
+}
+
+OUTPUT_BYTES = {"load_left": 1000, "load_right": 1000, "fit_left": 10, "fit_right": 10, "compare": 1}
+
+def make_history(dag) -> RuntimeHistory:
+    runtime_history = RuntimeHistory()
+    for node in dag.nodes:
+        if isinstance(node, Runnable):
+            runtime_history.record(node, 1.0)
+            for output_variable in node.outputs.values():
+                runtime_history.record_output(output_variable, OUTPUT_BYTES[node.name.split(".")[-1]])
+    return runtime_history
+
+def get_groups(partition: Partition) -> list:
+    groups = {}
+    for runnable, group in partition.assignments.items():
+        groups.setdefault(group, set()).add(runnable.name.split(".")[-1])
+    return sorted(sorted(group) for group in groups.values())
+
+def test_partition_keeps_large_outputs_local(make_package):
+    make_package("pkg", RUNNABLES)
+    dag = compile_dag("pkg")
+    partition = Partition(dag, 2, make_history(dag), imbalance=0.25)
+    assert get_groups(partition) == [["compare", "fit_left", "load_left"], ["fit_right", "load_right"]]
+    assert partition.total_bytes == 2010
+    assert partition.cross_bytes == 0
+    assert partition.saved_bytes == 1005
+    assert "Saved: 1005.0 B" in partition.report()
+
+def test_partition_respects_load_balance(make_package):
+    make_package("pkg", RUNNABLES)
+    dag = compile_dag("pkg")
+    partition = Partition(dag, 3, make_history(dag), imbalance=0.2)
+    assert max(partition.loads) <= 2.0
+    # Only two runnables fit in each partition, so the smallest edge is cut
+    assert get_groups(partition) == [["compare"], ["fit_left", "load_left"], ["fit_right", "load_right"]]
+    assert partition.cross_bytes == 10
+    with pytest.raises(ValueError):
+        Partition(dag, 0, make_history(dag))
+
+def test_workers_prefer_their_partition(tmp_path):
+    queue = WorkQueue(str(tmp_path / "queue"))
+    queue.reset()
+    queue.publish("first", "pkg.first", (), priority=2.0, partition=0)
+    queue.publish("second", "pkg.second", (), priority=1.0, partition=1)
+    assert queue.claim("worker1", partition=1)[0] == "second"
+    # The affinity is only a preference, so an idle worker takes other partitions' tasks
+    assert queue.claim("worker2", partition=1)[0] == "first"
+
+def test_execution_records_output_sizes(make_package, make_module):
+    make_module("partition_steps", STEPS)
+    make_package("pkg", RUNNABLES)
+    dag = compile_dag("pkg")
+    runtime_history = RuntimeHistory()
+    execute_dag(dag, runtime_history=runtime_history)
+    assert sorted(runtime_history.outputs) == sorted(f"pkg.{name}.value" for name in RUNNABLES)
+    assert all(count == 1 and nbytes > 0 for count, nbytes in runtime_history.outputs.values())
+
+def test_partitions_require_a_queue(make_package, make_module):
+    make_module("partition_steps", STEPS)
+    make_package("pkg", RUNNABLES)
+    dag = compile_dag("pkg")
+    with pytest.raises(ValueError, match="work queue"):
+        execute_dag(dag, partitions=Partition(dag, 2, make_history(dag)).assignments)
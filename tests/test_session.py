@@ -0,0 +1,45 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from dagpiler import compile_dag, CompileSession
+from dagpiler.nodes.variables.variable_factory import VARIABLE_FACTORY
+from dagpiler.session import get_current_session
+
+RUNNABLES = {
+    "load": {"type": "process", "exec": "session_pkg.load::load", "inputs": {"path": "data_csv"}, "outputs": ["data"]},
+    "clean": {"type": "process", "exec": "session_pkg.clean::clean", "inputs": {"data": "load.data"}, "outputs": ["cleaned"]},
+}
+
+FURCATED_RUNNABLES = {
+    "analyze": {"type": "process", "exec": "furcated_pkg.analyze::analyze", "inputs": {"data": "?"}, "outputs": ["result"]},
+}
+
+BRIDGES = {"data": {"sources": ["session_pkg.load.data", "session_pkg.clean.cleaned"], "targets": ["furcated_pkg.analyze.data"]}}
+
+def test_concurrent_compiles_do_not_share_state(make_package):
+    make_package("session_pkg", RUNNABLES)
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        dags = list(executor.map(lambda _: compile_dag("session_pkg"), range(8)))
+    assert all(len(dag.nodes) == 6 for dag in dags)
+    all_nodes = [node for dag in dags for node in dag.nodes]
+    assert len({id(node) for node in all_nodes}) == len(all_nodes)
+
+def test_session_state_does_not_leak_between_compiles(make_package):
+    make_package("session_pkg", RUNNABLES)
+    make_package("furcated_pkg", FURCATED_RUNNABLES, bridges=BRIDGES)
+    session = CompileSession()
+    furcated_dag = compile_dag("furcated_pkg", session=session)
+    assert session.use_singleton is False # Polyfurcation turned the singleton pattern off, but only for its own session.
+    assert VARIABLE_FACTORY.use_singleton is True
+    assert VARIABLE_FACTORY.variable_cache == {}
+    dag = compile_dag("session_pkg")
+    assert len(dag.nodes) == 6
+    assert not set(id(node) for node in dag.nodes) & set(id(node) for node in furcated_dag.nodes)
+
+def test_no_state_is_kept_outside_of_a_session(make_package):
+    make_package("session_pkg", RUNNABLES)
+    VARIABLE_FACTORY.variable_cache["key"] = "value"
+    get_current_session().index_file_paths["session_pkg"] = "stale_path"
+    # Each call outside of a session gets a new session, so neither cache was kept
+    assert VARIABLE_FACTORY.variable_cache == {}
+    assert get_current_session().index_file_paths == {}
+    assert len(compile_dag("session_pkg").nodes) == 6
@@ -0,0 +1,57 @@
+import os
+
+import numpy as np
+
+from dagpiler import compile_dag, execute_dag
+from dagpiler.execution.shared_memory_store import SharedMemoryOutputStore, write_output
+
+STEPS = '''
+import os
+import numpy as np
+
+def make(size):
+    return np.ones(size)
+
+def consume(data, scale):
+    # Report whether the input was attached from a file rather than unpickled into this process
+    return (isinstance(data, np.memmap) or not data.flags.owndata, float(data.sum()) * scale)
+
+def summarize(a, b, c):
+    return a[1] + b[1] + c[1]
+'''
+
+RUNNABLES = {
+    "make": {"type": "process", "exec": "shared_steps::make", "inputs": {"size": 1000000}, "outputs": ["data"]},
+    "consume1": {"type": "process", "exec": "shared_steps::consume", "inputs": {"data": "make.data", "scale": 1}, "outputs": ["result"]},
+    "consume2": {"type": "process", "exec": "shared_steps::consume", "inputs": {"data": "make.data", "scale": 2}, "outputs": ["result"]},
+    "consume3": {"type": "process", "exec": "shared_steps::consume", "inputs": {"data": "make.data[:10]", "scale": 3}, "outputs": ["result"]},
+    "summarize": {"type": "process", "exec": "shared_steps::summarize", "inputs": {"a": "consume1.result", "b": "consume2.result", "c": "consume3.result"}, "outputs": ["total"]},
+}
+
+def test_write_output_handles(tmp_path):
+    large_handle = write_output(str(tmp_path), "large", np.arange(100000))
+    assert os.path.exists(large_handle.path)
+    assert isinstance(large_handle.attach(), np.memmap)
+    small_handle = write_output(str(tmp_path), "small", np.arange(3))
+    assert small_handle.path is None
+    assert small_handle.attach().tolist() == [0, 1, 2]
+
+def test_outputs_shared_between_workers(make_package, make_module, tmp_path):
+    make_module("shared_steps", STEPS)
+    make_package("pkg", RUNNABLES)
+    dag = compile_dag("pkg")
+    run_folder = tmp_path / "run"
+    store = SharedMemoryOutputStore(str(run_folder))
+    result = execute_dag(dag, store=store, workers=2)
+    assert result.get("pkg.summarize.total") == 1000000 * 3 + 30
+    # The large output was attached by each consumer, and deleted after its last consumer
+    assert os.listdir(run_folder / "outputs") == []
+    assert result.memory_report.num_released == 4
+
+def test_workers_attach_zero_copy(make_package, make_module, tmp_path):
+    make_module("shared_steps", STEPS)
+    runnables = {name: runnable for name, runnable in RUNNABLES.items() if name in ("make", "consume1", "consume3")}
+    make_package("pkg", runnables)
+    result = execute_dag(compile_dag("pkg"), run_folder=str(tmp_path / "run"), workers=2)
+    assert result.get("pkg.consume1.result") == (True, 1000000.0)
+    assert result.get("pkg.consume3.result") == (True, 30.0)
@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+
+from dagpiler import compile_dag, execute_dag
+from dagpiler.nodes.variables.slices import SliceIndex, apply_slices
+from dagpiler.nodes.variables.variables import DynamicVariable
+
+STEPS = '''
+import numpy as np
+
+def make():
+    return np.arange(1000000, dtype=np.float64).reshape(1000, 1000)
+
+def is_view(data):
+    return (not data.flags.owndata, data.shape, float(data[0, 0]))
+
+def first(data):
+    return float(data[0])
+'''
+
+RUNNABLES = {
+    "make": {"type": "process", "exec": "steps::make", "inputs": {}, "outputs": ["data"]},
+    "rows": {"type": "process", "exec": "steps::is_view", "inputs": {"data": "make.data[10:20]"}, "outputs": ["rows"]},
+    "column": {"type": "process", "exec": "steps::first", "inputs": {"data": "make.data[..., 5]"}, "outputs": ["first"]},
+    "strided": {"type": "process", "exec": "steps::is_view", "inputs": {"data": "make.data[::2][1:, 3:]"}, "outputs": ["strided"]},
+}
+
+@pytest.mark.parametrize("expression, key", [
+    ("0", 0),
+    ("-1", -1),
+    ("1:10:2", slice(1, 10, 2)),
+    (":5", slice(None, 5)),
+    ("..., 0", (Ellipsis, 0)),
+    ("None, 1:", (None, slice(1, None))),
+    ("'name'", "name"),
+    ('"name"', "name"),
+])
+def test_parse_slices(expression, key):
+    assert SliceIndex(expression).key == key
+
+def test_invalid_slice_raises():
+    with pytest.raises(ValueError):
+        SliceIndex("a:b")
+
+def test_slices_parsed_at_compile_time():
+    variable = DynamicVariable("pkg.runnable.input", "runnable.output[0:10][..., 2]")
+    assert [slice_index.key for slice_index in variable.slices] == [slice(0, 10), (Ellipsis, 2)]
+
+def test_slices_are_views():
+    data = np.zeros((10, 10))
+    view = apply_slices(data, [SliceIndex("2:4"), SliceIndex("..., 1")])
+    assert np.shares_memory(view, data)
+    assert apply_slices(b"abcdef", [SliceIndex("1:3")]).tobytes() == b"bc"
+    assert apply_slices({"key": 1}, [SliceIndex("'key'")]) == 1
+
+def test_sliced_inputs_are_zero_copy(make_package, make_module):
+    make_module("slice_steps", STEPS)
+    make_package("pkg", {name: {**runnable, "exec": runnable["exec"].replace("steps", "slice_steps")} for name, runnable in RUNNABLES.items()})
+    result = execute_dag(compile_dag("pkg"))
+    assert result.get("pkg.rows.rows") == (True, (10, 1000), 10000.0)
+    assert result.get("pkg.column.first") == 5.0
+    assert result.get("pkg.strided.strided") == (True, (499, 997), 2003.0)
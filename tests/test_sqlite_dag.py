@@ -0,0 +1,83 @@
+import pytest
+
+from dagpiler import compile_dag, print_dag
+from dagpiler.dag.organizer import topological_sort
+from dagpiler.dag.sqlite_dag import SqliteDag
+from dagpiler.nodes.runnables.process import Process
+from dagpiler.nodes.runnables.runnables import Runnable
+from dagpiler.nodes.variables.variables import OutputVariable, Variable
+
+UPSTREAM_RUNNABLES = {
+    "load_a": {"type": "process", "exec": "sqlite_steps::load", "inputs": {"value": 1}, "outputs": ["value"]},
+    "load_b": {"type": "process", "exec": "sqlite_steps::load", "inputs": {"value": 2}, "outputs": ["value"]},
+}
+
+FURCATED_RUNNABLES = {
+    "analyze": {"type": "process", "exec": "sqlite_steps::analyze", "inputs": {"value": "?"}, "outputs": ["result"], "level": "Trial"},
+    "report": {"type": "process", "exec": "sqlite_steps::report", "inputs": {"result": "analyze.result[0]"}, "outputs": ["report"]},
+}
+
+BRIDGES = {"value": {"sources": ["sqlite_upstream.load_a.value", "sqlite_upstream.load_b.value"], "targets": ["sqlite_furcated.analyze.value"]}}
+
+@pytest.fixture
+def stored_dag(make_package, tmp_path):
+    make_package("sqlite_upstream", UPSTREAM_RUNNABLES)
+    make_package("sqlite_furcated", FURCATED_RUNNABLES, bridges=BRIDGES)
+    dag = compile_dag("sqlite_furcated")
+    path = str(tmp_path / "dag.sqlite")
+    print_dag(dag, path)
+    with SqliteDag(path, cache_size=4) as stored_dag:
+        yield dag, stored_dag
+
+def test_same_nodes_and_edges(stored_dag):
+    dag, stored_dag = stored_dag
+    assert len(stored_dag) == len(dag.nodes)
+    assert stored_dag.num_edges == len(dag.edges)
+    nodes_by_uuid = {node._uuid: node for node in dag.nodes}
+    for stored_node in stored_dag.topological_sort():
+        node = nodes_by_uuid[stored_node.uuid]
+        assert stored_node.name == node.name and stored_node.class_name == node.__class__.__name__
+        assert {successor.uuid for successor in stored_dag.successors(stored_node)} == {successor._uuid for successor in dag.successors(node)}
+        assert {predecessor.uuid for predecessor in stored_dag.predecessors(stored_node)} == {predecessor._uuid for predecessor in dag.predecessors(node)}
+
+def test_topological_order(stored_dag):
+    dag, stored_dag = stored_dag
+    positions = {node.uuid: position for position, node in enumerate(stored_dag.topological_sort())}
+    for source, target in dag.edges:
+        assert positions[source._uuid] < positions[target._uuid]
+    generations = list(stored_dag.topological_generations())
+    assert sum(len(generation) for generation in generations) == len(dag.nodes)
+    assert [node._uuid for node in topological_sort(dag)] == [node.uuid for generation in generations for node in generation]
+
+def test_lookups_and_attributes(stored_dag):
+    dag, stored_dag = stored_dag
+    reports = stored_dag.nodes_named("sqlite_furcated.report")
+    assert len(reports) == 2
+    assert len(stored_dag.nodes_in_package("sqlite_upstream")) == 6
+    # The same nodes as the IndexedDAG's lookups, including the subclasses' nodes unless `exact`
+    for node_class, exact in [(Process, False), (Runnable, False), (Runnable, True), (Variable, False), (OutputVariable, True)]:
+        stored_nodes = stored_dag.nodes_of_type(node_class, exact)
+        assert isinstance(stored_nodes, list)
+        assert sorted(node.uuid for node in stored_nodes) == sorted(node._uuid for node in dag.nodes_of_type(node_class, exact))
+    assert len(stored_dag.nodes_of_type(Runnable)) == 6
+    assert stored_dag.nodes_of_type(Runnable, exact=True) == []
+    analyze = stored_dag.nodes_named("sqlite_furcated.analyze")[0]
+    assert analyze.level == "Trial"
+    assert analyze["exec"] == "sqlite_steps::analyze"
+    # The runnable's variables are referred to by UUID, and the branch copies' attributes are stored in full
+    result = stored_dag.get_node_by_uuid(analyze["outputs"]["result"])
+    assert result.name == "sqlite_furcated.analyze.result"
+    assert result in stored_dag.successors(analyze)
+    report_input = stored_dag.get_node_by_uuid(reports[1]["inputs"]["result"])
+    assert report_input["user_inputted_value"] == "analyze.result[0]"
+
+def test_lru_cache(stored_dag):
+    dag, stored_dag = stored_dag
+    node_ids = list(range(6))
+    stored_dag.get_nodes(node_ids)
+    assert stored_dag.cache_misses == 6 and len(stored_dag._cache) == 4
+    # The four most recently used nodes are cached
+    stored_dag.get_nodes(node_ids[2:])
+    assert stored_dag.cache_hits == 4
+    stored_dag.get_node(0)
+    assert stored_dag.cache_misses == 7
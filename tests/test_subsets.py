@@ -0,0 +1,79 @@
+import shutil
+
+import numpy as np
+import pytest
+
+from dagpiler import compile_dag, CompileSession
+from dagpiler.logsheet.data_object_index import DataObjectIndex
+from dagpiler.logsheet.subsets import SubsetEngine, get_runnable_data_object_masks
+
+from tests.test_logsheet import LOGSHEET_PATH, LOGSHEET_SETTINGS
+
+SUBSETS = {
+    "warm": {"header": "Temperature (deg F)", "operator": ">=", "value": 25},
+    "warm_high_pressure": [{"subset": "warm"}, {"header": "Pressure (psi)", "operator": "==", "value": 1.1}],
+    "odd_notes": {"or": [{"header": "Notes", "operator": "in", "value": ["note1", "note3"]}, {"header": "Notes", "operator": "contains", "value": "5"}]},
+    "not_warm": {"not": {"subset": "warm"}},
+}
+
+def get_data_object_index() -> DataObjectIndex:
+    columns = {
+        "Temperature (deg F)": np.repeat([20.0, 25.0, 30.0], 4),
+        "Pressure (psi)": np.tile(np.repeat([1.0, 1.1], 2), 3),
+        "Notes": np.repeat([f"note{i}" for i in range(1, 7)], 2),
+    }
+    return DataObjectIndex(columns, {"Temperature": "Temperature (deg F)", "Pressure": "Pressure (psi)"})
+
+def test_subset_row_masks():
+    subset_engine = SubsetEngine(get_data_object_index(), SUBSETS)
+    assert subset_engine.get_row_mask("warm").sum() == 8
+    assert subset_engine.get_row_mask("warm_high_pressure").tolist() == [False] * 6 + [True, True] + [False] * 2 + [True, True]
+    assert subset_engine.get_row_mask("odd_notes").sum() == 6
+    assert subset_engine.get_row_mask("not_warm").sum() == 4
+    # Cached per subset name
+    assert subset_engine.get_row_mask("warm") is subset_engine.get_row_mask("warm")
+
+def test_subset_data_object_masks():
+    subset_engine = SubsetEngine(get_data_object_index(), SUBSETS)
+    assert subset_engine.get_data_object_mask("warm", "Temperature").tolist() == [False, True, True]
+    assert subset_engine.get_data_object_mask("warm_high_pressure", "Pressure").tolist() == [False, False, False, True, False, True]
+    assert subset_engine.get_data_object_mask("", "Pressure").all()
+
+@pytest.mark.parametrize("subsets", [
+    {"bad": {"header": "Missing", "operator": "==", "value": 1}},
+    {"bad": {"header": "Notes", "operator": "~", "value": 1}},
+    {"bad": {"subset": "missing_subset"}},
+    {"a": {"subset": "b"}, "b": {"subset": "a"}},
+])
+def test_invalid_subsets_raise(subsets):
+    with pytest.raises(ValueError):
+        SubsetEngine(get_data_object_index(), subsets)
+
+def test_runnables_share_subset_masks(make_package):
+    runnables = {
+        "first": {"type": "process", "exec": "pkg.first::first", "inputs": {"x": 1}, "outputs": ["y"], "level": "Pressure", "subset": "warm"},
+        "second": {"type": "process", "exec": "pkg.second::second", "inputs": {"y": "first.y"}, "outputs": ["z"], "level": "Pressure", "subset": "warm"},
+        "third": {"type": "process", "exec": "pkg.third::third", "inputs": {"z": "second.z"}, "outputs": ["w"]},
+    }
+    src_folder = make_package("pkg", runnables, package_settings={**LOGSHEET_SETTINGS, "subsets": SUBSETS})
+    shutil.copy(LOGSHEET_PATH, src_folder / "logsheet.csv")
+    with CompileSession() as session:
+        dag = compile_dag("pkg", session=session)
+        data_object_masks = get_runnable_data_object_masks(dag)
+    assert sorted(runnable.name for runnable in data_object_masks) == ["pkg.first", "pkg.second"]
+    first_mask, second_mask = data_object_masks.values()
+    assert first_mask is second_mask
+    assert first_mask.sum() == 4
+
+def test_subset_masks_are_evaluated_once_per_compile(make_package):
+    runnables = {
+        "first": {"type": "process", "exec": "pkg.first::first", "inputs": {"x": 1}, "outputs": ["y"], "level": "Pressure", "subset": "warm"},
+    }
+    src_folder = make_package("pkg", runnables, package_settings={**LOGSHEET_SETTINGS, "subsets": SUBSETS})
+    shutil.copy(LOGSHEET_PATH, src_folder / "logsheet.csv")
+    dag = compile_dag("pkg")
+    # Without a session of the caller's, the DAG's own session keeps the subset engines between calls
+    first_masks = get_runnable_data_object_masks(dag)
+    second_masks = get_runnable_data_object_masks(dag)
+    assert list(first_masks.values())[0] is list(second_masks.values())[0]
+    assert dag.session.subset_engines["pkg"].get_data_object_mask("warm", "Pressure") is list(first_masks.values())[0]
@@ -0,0 +1,47 @@
+import pytest
+
+from dagpiler import compile_dag
+from dagpiler.dag.sweep import SweepGrid
+from dagpiler.nodes.runnables.process import Process
+from dagpiler.nodes.variables.variables import HardcodedVariable, SweepVariable
+
+RUNNABLES = {
+    "load": {"type": "process", "exec": "sweep_pkg.load::load", "inputs": {"path": "data_csv"}, "outputs": ["data"]},
+    "filt": {"type": "process", "exec": "sweep_pkg.filt::filt", "inputs": {"data": "load.data", "order": [2, 4, 6], "cutoff": [10, 20]}, "outputs": ["filtered"]},
+    "stats": {"type": "process", "exec": "sweep_pkg.stats::stats", "inputs": {"filtered": "filt.filtered"}, "outputs": ["summary"]},
+}
+
+def get_processes(dag, name: str) -> list:
+    return [n for n in dag.nodes if isinstance(n, Process) and n.name == name]
+
+def test_sweep_grid_is_lazy():
+    grid = SweepGrid({"a": list(range(10)), "b": list(range(10)), "c": list(range(10))})
+    assert len(grid) == 1000
+    assert grid[0] == {"a": 0, "b": 0, "c": 0}
+    assert grid[123] == {"a": 1, "b": 2, "c": 3}
+    assert grid[123] == list(grid)[123]
+    assert len(list(grid.filter(lambda c: c["a"] == c["b"] == c["c"]))) == 10
+    assert len(list(grid.sample(5, seed=0))) == 5
+
+def test_sweep_expands_downstream_and_shares_upstream(make_package):
+    make_package("sweep_pkg", RUNNABLES)
+    dag = compile_dag("sweep_pkg")
+    assert not [n for n in dag.nodes if isinstance(n, SweepVariable)]
+    assert len(get_processes(dag, "sweep_pkg.load")) == 1
+    assert len(get_processes(dag, "sweep_pkg.filt")) == 6
+    assert len(get_processes(dag, "sweep_pkg.stats")) == 6
+    combinations = set()
+    for filt in get_processes(dag, "sweep_pkg.filt"):
+        assert isinstance(filt.inputs["order"], HardcodedVariable)
+        combinations.add((filt.inputs["order"].value_for_hashing, filt.inputs["cutoff"].value_for_hashing))
+    assert len(combinations) == 6
+
+@pytest.mark.parametrize("sweep, num_branches", [
+    (lambda grid: grid.filter(lambda c: c["sweep_pkg.filt.order"] == 4), 2),
+    (lambda grid: grid.sample(3, seed=1), 3),
+])
+def test_sweep_selection(make_package, sweep, num_branches):
+    make_package("sweep_pkg", RUNNABLES)
+    dag = compile_dag("sweep_pkg", sweep=sweep)
+    assert len(get_processes(dag, "sweep_pkg.filt")) == num_branches
+    assert len(get_processes(dag, "sweep_pkg.stats")) == num_branches
@@ -0,0 +1,32 @@
+from dagpiler import compile_dag
+from dagpiler.nodes.runnables.process import Process
+
+UPSTREAM_RUNNABLES = {
+    "load": {"type": "process", "exec": "upstream.load::load", "inputs": {"path": "data_csv"}, "outputs": ["data"]},
+    "clean": {"type": "process", "exec": "upstream.clean::clean", "inputs": {"data": "load.data"}, "outputs": ["cleaned"]},
+    "unrelated": {"type": "process", "exec": "upstream.unrelated::unrelated", "inputs": {"x": 1}, "outputs": ["y"]},
+}
+
+DOWNSTREAM_RUNNABLES = {
+    "analyze": {"type": "process", "exec": "downstream.analyze::analyze", "inputs": {"data": "?"}, "outputs": ["result"]},
+    "report": {"type": "process", "exec": "downstream.report::report", "inputs": {"result": "analyze.result"}, "outputs": ["report"]},
+    "other": {"type": "process", "exec": "downstream.other::other", "inputs": {"x": 2}, "outputs": ["y"]},
+}
+
+BRIDGES = {"cleaned_data": {"sources": ["upstream.clean.cleaned"], "targets": ["downstream.analyze.data"]}}
+
+def get_runnable_names(dag) -> set:
+    return {n.name for n in dag.nodes if isinstance(n, Process)}
+
+def test_compile_targets_only_loads_dependency_cone(make_package):
+    # Never read, so its invalid contents do not matter.
+    make_package("upstream", UPSTREAM_RUNNABLES, extra_runnables_files={"unused.toml": "not valid toml ["})
+    make_package("downstream", DOWNSTREAM_RUNNABLES, bridges=BRIDGES)
+    dag = compile_dag("downstream", targets=["downstream.analyze.result"])
+    assert get_runnable_names(dag) == {"upstream.load", "upstream.clean", "downstream.analyze"}
+
+def test_compile_without_targets_compiles_everything(make_package):
+    make_package("upstream", UPSTREAM_RUNNABLES)
+    make_package("downstream", DOWNSTREAM_RUNNABLES, bridges=BRIDGES)
+    dag = compile_dag("downstream")
+    assert get_runnable_names(dag) == {"upstream.load", "upstream.clean", "upstream.unrelated", "downstream.analyze", "downstream.report", "downstream.other"}
@@ -0,0 +1,50 @@
+import shutil
+
+from dagpiler import compile_dag, CompileSession
+from dagpiler.dag.tasks import expand_tasks
+
+from tests.test_logsheet import LOGSHEET_PATH, LOGSHEET_SETTINGS
+
+RUNNABLES = {
+    "per_pressure": {"type": "process", "exec": "pkg.a::a", "inputs": {"x": 1}, "outputs": ["y"], "level": "Pressure"},
+    "per_temperature_batch": {"type": "process", "exec": "pkg.b::b", "inputs": {"y": "per_pressure.y"}, "outputs": ["z"], "level": "Humidity", "batch": ["Temperature"]},
+    "warm_per_humidity": {"type": "process", "exec": "pkg.c::c", "inputs": {"z": "per_temperature_batch.z"}, "outputs": ["w"], "subset": "warm"},
+}
+
+def get_task_groups(make_package) -> dict:
+    package_settings = {**LOGSHEET_SETTINGS, "subsets": {"warm": {"header": "Temperature (deg F)", "operator": ">=", "value": 25}}}
+    src_folder = make_package("pkg", RUNNABLES, package_settings=package_settings)
+    shutil.copy(LOGSHEET_PATH, src_folder / "logsheet.csv")
+    with CompileSession() as session:
+        dag = compile_dag("pkg", session=session)
+        return {task_group.runnable.name: task_group for task_group in expand_tasks(dag)}
+
+def test_task_counts(make_package):
+    task_groups = get_task_groups(make_package)
+    assert list(task_groups) == ["pkg.per_pressure", "pkg.per_temperature_batch", "pkg.warm_per_humidity"]
+    assert len(task_groups["pkg.per_pressure"]) == 6
+    # One task per batch, rather than one per data object
+    assert len(task_groups["pkg.per_temperature_batch"]) == 3
+    assert task_groups["pkg.per_temperature_batch"].num_data_objects == 12
+    assert len(task_groups["pkg.warm_per_humidity"]) == 8
+
+def test_tasks(make_package):
+    task_groups = get_task_groups(make_package)
+    first_task = next(iter(task_groups["pkg.per_temperature_batch"]))
+    assert first_task.data_objects == ("20.0/1.0/5.0", "20.0/1.0/10.0", "20.0/1.1/5.0", "20.0/1.1/10.0")
+    assert [task.data_objects for task in task_groups["pkg.warm_per_humidity"]][0] == ("25.0/1.0/5.0",)
+
+def test_task_preview(make_package):
+    task_group = get_task_groups(make_package)["pkg.per_pressure"]
+    preview = task_group.preview(k=2, seed=0)
+    assert len(preview) == 2
+    all_data_objects = [task.data_objects for task in task_group]
+    assert all(task.data_objects in all_data_objects for task in preview)
+    assert len(task_group.preview(k=100)) == 6
+
+def test_folded_runnable_has_one_task(make_package):
+    task_group = get_task_groups(make_package)["pkg.per_pressure"]
+    task_group.runnable.folded = True
+    assert len(task_group) == 1
+    assert task_group.num_data_objects == 0
+    assert next(iter(task_group)).data_objects == ()
@@ -0,0 +1,123 @@
+import multiprocessing
+import sqlite3
+import time
+
+import numpy as np
+import pytest
+
+from dagpiler import compile_dag, execute_dag
+from dagpiler.execution.executor import run_queue_worker
+from dagpiler.execution.work_queue import WorkQueue
+
+STEPS = '''
+import numpy as np
+
+def make(size):
+    return np.arange(size, dtype=float)
+
+def total(values):
+    return float(values.sum())
+
+def fail(values):
+    raise RuntimeError("fail")
+'''
+
+RUNNABLES = {
+    "make": {"type": "process", "exec": "queue_steps::make", "inputs": {"size": 100000}, "outputs": ["values"]},
+    "total": {"type": "process", "exec": "queue_steps::total", "inputs": {"values": "make.values"}, "outputs": ["total"]},
+    "head": {"type": "process", "exec": "queue_steps::total", "inputs": {"values": "make.values[:10]"}, "outputs": ["total"]},
+}
+
+def start_workers(folder: str, num_workers: int) -> list:
+    # Local processes stand in for the workers on other hosts
+    workers = [multiprocessing.get_context("fork").Process(target=run_queue_worker, args=(folder,), kwargs={"poll_seconds": 0.05}) for _ in range(num_workers)]
+    for worker in workers:
+        worker.start()
+    return workers
+
+def test_claims_by_priority_and_expired_leases(tmp_path):
+    queue = WorkQueue(str(tmp_path / "queue"))
+    queue.reset()
+    queue.publish("low", "pkg.low", ("payload",), priority=1.0)
+    queue.publish("high", "pkg.high", ("payload",), priority=2.0)
+    assert queue.claim("worker1")[:2] == ("high", 1)
+    # worker2 dies holding a short lease on the other task
+    assert queue.claim("worker2", lease_seconds=0.05)[:2] == ("low", 1)
+    assert queue.claim("worker3") is None
+    time.sleep(0.1)
+    assert queue.claim("worker3")[:2] == ("low", 2)
+    # A result published under the expired claim is rejected
+    assert not queue.complete("low", 1, "stale")
+    assert not queue.renew("low", 1)
+    assert queue.complete("low", 2, "result")
+    assert queue.collect() == [("low", "worker3", "result", None)]
+    assert queue.collect() == []
+
+def test_queue_created_without_partitions(tmp_path):
+    folder = tmp_path / "queue"
+    folder.mkdir()
+    connection = sqlite3.connect(str(folder / "queue.sqlite"))
+    connection.execute("CREATE TABLE tasks (task_id TEXT PRIMARY KEY, runnable_name TEXT, payload BLOB, priority REAL, state TEXT, worker TEXT, attempt INTEGER, lease_expires REAL, result BLOB, error TEXT)")
+    connection.commit()
+    connection.close()
+    queue = WorkQueue(str(folder))
+    queue.reset()
+    queue.publish("task", "pkg.task", ("payload",), partition=1)
+    assert queue.claim("worker1", partition=1)[:2] == ("task", 1)
+
+def test_cancel(tmp_path):
+    queue = WorkQueue(str(tmp_path / "queue"))
+    queue.reset()
+    queue.publish("claimed", "pkg.claimed", ("payload",), priority=2.0)
+    queue.publish("ready", "pkg.ready", ("payload",), priority=1.0)
+    assert queue.claim("worker1")[:2] == ("claimed", 1)
+    queue.cancel()
+    # Neither task can be claimed, and the running task's result is rejected
+    assert queue.claim("worker2") is None
+    assert not queue.complete("claimed", 1, "result")
+    assert queue.collect() == []
+
+def test_run_with_local_workers(make_package, make_module, tmp_path):
+    make_module("queue_steps", STEPS)
+    make_package("pkg", RUNNABLES)
+    folder = str(tmp_path / "queue")
+    workers = start_workers(folder, 2)
+    result = execute_dag(compile_dag("pkg"), queue=WorkQueue(folder))
+    for worker in workers:
+        worker.join(timeout=30)
+        assert worker.exitcode == 0
+    assert result.get("pkg.total.total") == float(np.arange(100000).sum())
+    assert result.get("pkg.head.total") == 45.0
+
+def test_worker_errors_fail_the_run(make_package, make_module, tmp_path):
+    make_module("queue_steps", STEPS)
+    runnables = dict(RUNNABLES)
+    runnables["total"] = {"type": "process", "exec": "queue_steps::fail", "inputs": {"values": "make.values"}, "outputs": ["total"]}
+    make_package("pkg", runnables)
+    folder = str(tmp_path / "queue")
+    workers = start_workers(folder, 1)
+    with pytest.raises(RuntimeError, match="pkg.total failed"):
+        execute_dag(compile_dag("pkg"), queue=WorkQueue(folder))
+    for worker in workers:
+        worker.join(timeout=30)
+        assert worker.exitcode == 0
+    queue = WorkQueue(folder)
+    assert queue.connection.execute("SELECT COUNT(*) FROM tasks WHERE state IN ('ready', 'claimed')").fetchone()[0] == 0
+
+def test_worker_started_before_the_run(make_package, make_module, tmp_path):
+    make_module("queue_steps", STEPS)
+    make_package("pkg", RUNNABLES)
+    folder = str(tmp_path / "queue")
+    # A previous run has finished, leaving its state in the shared folder
+    previous_run = WorkQueue(folder)
+    previous_run.reset()
+    previous_run.finish()
+    previous_run.close()
+    workers = start_workers(folder, 1)
+    time.sleep(0.3)
+    # The worker waits for the next run, rather than exiting because the previous run has finished
+    assert workers[0].is_alive()
+    result = execute_dag(compile_dag("pkg"), queue=WorkQueue(folder))
+    workers[0].join(timeout=30)
+    assert workers[0].exitcode == 0
+    assert result.get("pkg.head.total") == 45.0